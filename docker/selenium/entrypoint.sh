@@ -5,8 +5,11 @@ echo "🖥️  Starting Xvfb for headless Chrome..."
 Xvfb :99 -screen 0 1920x1080x24 -ac +extension GLX +render -noreset &
 export DISPLAY=:99
 
-# Wait for Xvfb to start
-sleep 2
+# Wait for Xvfb's display socket instead of a fixed sleep
+if ! PYTHONPATH=/app/tests python -m harness.ready --check xvfb --timeout 30; then
+    echo "❌ Xvfb did not start"
+    exit 1
+fi
 
 # Check if required environment variables are set
 if [ -z "$APP_URL" ]; then
@@ -14,6 +17,12 @@ if [ -z "$APP_URL" ]; then
     export APP_URL="http://localhost:8080"
 fi
 
+# Wait for the target application to serve the login form
+if ! PYTHONPATH=/app/tests python -m harness.ready --check app --app-url "$APP_URL" --timeout "${READY_TIMEOUT:-120}"; then
+    echo "❌ Application at $APP_URL is not ready"
+    exit 1
+fi
+
 echo "🧪 Starting Selenium tests..."
 echo "📍 Target application: $APP_URL"
 echo "🌐 Chrome version: $(google-chrome --version)"
@@ -10,6 +10,15 @@ if [ -n "$NEW_RELIC_APP_NAME" ]; then
     echo "newrelic.appname = \"$NEW_RELIC_APP_NAME\"" >> /usr/local/etc/php/conf.d/newrelic.ini
 fi
 
+# ダミーコレクターなど、接続先を差し替える場合（docker-compose.nrbench.yml）
+if [ -n "$NEW_RELIC_COLLECTOR_HOST" ]; then
+    echo "newrelic.daemon.collector_host = \"$NEW_RELIC_COLLECTOR_HOST\"" >> /usr/local/etc/php/conf.d/newrelic.ini
+fi
+
+if [ -n "$NEW_RELIC_CA_BUNDLE" ]; then
+    echo "newrelic.daemon.ssl_ca_bundle = \"$NEW_RELIC_CA_BUNDLE\"" >> /usr/local/etc/php/conf.d/newrelic.ini
+fi
+
 echo "newrelic.attributes.include = \"request.parameters.*\"" >> /usr/local/etc/php/conf.d/newrelic.ini
 echo "newrelic.error_collector.attributes.include = \"request.parameters.*\"" >> /usr/local/etc/php/conf.d/newrelic.ini
 echo "newrelic.transaction_events.attributes.include = \"request.parameters.*\"" >> /usr/local/etc/php/conf.d/newrelic.ini
@@ -17,7 +17,7 @@ fi
 
 # Install required Python packages
 echo "📦 Installing required Python packages..."
-pip3 install selenium pytest --user --quiet
+pip3 install selenium pytest requests PyMySQL --user --quiet
 
 # Check if Chrome is available (optional for headless mode)
 if command -v google-chrome &> /dev/null || command -v chrome &> /dev/null || command -v chromium-browser &> /dev/null; then
@@ -41,11 +41,9 @@ else
     echo "   Starting docker-compose services..."
     docker-compose up -d
     
-    # Wait for services to start
-    echo "⏳ Waiting for services to start (30 seconds)..."
-    sleep 30
-    
-    if curl -s http://localhost:8080 > /dev/null; then
+    # Wait until the login form, the database and the Selenium hub actually respond
+    echo "⏳ Waiting for services to become ready..."
+    if (cd "$(dirname "$0")/tests" && python3 -m harness.ready --check app --check db --check hub --timeout "${READY_TIMEOUT:-180}"); then
         echo "✅ Application is now running"
     else
         echo "❌ Could not start application. Please check docker-compose logs."
@@ -61,6 +59,13 @@ else
     echo "⚠️  Selenium Grid not detected - tests will use local Chrome if available"
 fi
 
+# Warm up opcache, compiled views and the buffer pool before measuring
+if [ "${HARNESS_WARMUP:-1}" != "0" ]; then
+    echo "🔥 Warming up the application..."
+    (cd "$(dirname "$0")/tests" && python3 -m harness.warmup --output ../warmup.json) \
+        || echo "⚠️  Warm-up did not complete - results may include cold-start latency"
+fi
+
 echo ""
 echo "🧪 Starting Selenium Tests..."
 echo "=============================="
@@ -12,17 +12,21 @@ Test Flow:
 6. ログアウト
 """
 
+import argparse
+import os
+import sys
 import time
-import random
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import Select
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness import lookup, seeding
+from harness.driver import chrome_service
+
 class ApprovalWorkflowE2ETest:
     def __init__(self):
         self.driver = None
@@ -54,9 +58,10 @@ class ApprovalWorkflowE2ETest:
         chrome_options.add_argument("--window-size=1200,800")
         
         try:
-            service = Service(ChromeDriverManager().install())
+            service = chrome_service()
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.implicitly_wait(10)
+            # implicit wait は使わず、必要な場所だけ明示的に待つ
+            lookup.explicit_only(self.driver)
             self.wait = WebDriverWait(self.driver, 15)
             print("✅ Chrome driver ready")
         except Exception as e:
@@ -102,15 +107,13 @@ class ApprovalWorkflowE2ETest:
             ]
             
             logout_clicked = False
+            # 候補を順に待たずに確認する（ない候補で止まらない）
             for selector in logout_elements:
-                try:
-                    element = self.driver.find_element(By.XPATH, selector)
-                    if element.is_displayed():
-                        element.click()
-                        logout_clicked = True
-                        break
-                except:
-                    continue
+                element = lookup.first(self.driver, By.XPATH, selector)
+                if element and element.is_displayed():
+                    element.click()
+                    logout_clicked = True
+                    break
             
             if not logout_clicked:
                 # Try to find any logout form and submit it
@@ -150,17 +153,17 @@ class ApprovalWorkflowE2ETest:
         description_field.send_keys(description)
         
         # Select application type
-        try:
-            type_select = Select(self.driver.find_element(By.NAME, "type"))
-            type_select.select_by_value("other")
-        except:
+        type_field = lookup.first(self.driver, By.NAME, "type")
+        if type_field and type_field.tag_name == 'select':
+            Select(type_field).select_by_value("other")
+        else:
             print("⚠️ Type field not found or not a select")
         
         # Set priority
-        try:
-            priority_select = Select(self.driver.find_element(By.NAME, "priority"))
-            priority_select.select_by_value("medium")
-        except:
+        priority_field = lookup.first(self.driver, By.NAME, "priority")
+        if priority_field and priority_field.tag_name == 'select':
+            Select(priority_field).select_by_value("medium")
+        else:
             print("⚠️ Priority field not found or not a select")
         
         # Submit the application
@@ -192,12 +195,13 @@ class ApprovalWorkflowE2ETest:
         self.driver.get(f"{self.base_url}/applications/my-approvals")
         
         # Wait for page to load
-        time.sleep(3)
+        lookup.wait_for(self.driver, By.TAG_NAME, "h2")
         
         try:
             # Look for the application in approval cards
             application_found = False
-            approval_cards = self.driver.find_elements(By.CSS_SELECTOR, ".card")
+            # 承認待ちがなければカードはないので、待たずに確認する
+            approval_cards = lookup.all_now(self.driver, By.CSS_SELECTOR, ".card")
             
             if approval_cards:
                 print(f"📋 Found {len(approval_cards)} approval item(s)")
@@ -211,7 +215,7 @@ class ApprovalWorkflowE2ETest:
                             application_found = True
                             
                             # Look for approve button in this card
-                            approve_buttons = card.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+                            approve_buttons = lookup.all_now(card, By.CSS_SELECTOR, "button[onclick*='approve']")
                             if approve_buttons:
                                 approve_buttons[0].click()
                                 print("✅ Clicked approve button")
@@ -249,7 +253,7 @@ class ApprovalWorkflowE2ETest:
                 
                 # Try to find any approvable item for demonstration
                 print("🔍 Looking for any approvable item...")
-                approve_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+                approve_buttons = lookup.all_now(self.driver, By.CSS_SELECTOR, "button[onclick*='approve']")
                 if approve_buttons:
                     print(f"Found {len(approve_buttons)} approve button(s)")
                     approve_buttons[0].click()
@@ -280,8 +284,8 @@ class ApprovalWorkflowE2ETest:
             self.setup_driver()
             
             # Step 1: Select random applicant
-            selected_applicant = random.choice(self.applicants)
-            selected_approver = random.choice(self.approvers)
+            selected_applicant = seeding.derive('applicant').choice(self.applicants)
+            selected_approver = seeding.derive('approver').choice(self.approvers)
             
             print(f"🎲 Selected applicant: {selected_applicant['name']}")
             print(f"🎲 Selected approver: {selected_approver['name']}")
@@ -318,5 +322,10 @@ class ApprovalWorkflowE2ETest:
                 print("🏁 Browser closed")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Approval Workflow E2E Test")
+    seeding.add_argument(parser)
+    args = parser.parse_args()
+    seeding.init(args.seed)
+
     test = ApprovalWorkflowE2ETest()
     test.run_test()
\ No newline at end of file
@@ -4,17 +4,21 @@ Complete UI Flow Test - Admin → Logout → Approver Login → Approve
 完全なUIフロー - 管理者で申請作成 → ログアウト → 承認者でログイン → 承認
 """
 
+import argparse
+import os
+import sys
 import time
-import random
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import Select
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness import lookup, seeding
+from harness.driver import chrome_service
+
 class CompleteUIFlowTest:
     def __init__(self):
         self.driver = None
@@ -41,9 +45,10 @@ class CompleteUIFlowTest:
         chrome_options.add_argument("--window-size=1200,800")
         
         try:
-            service = Service(ChromeDriverManager().install())
+            service = chrome_service()
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.implicitly_wait(5)
+            # implicit wait は使わず、必要な場所だけ明示的に待つ
+            lookup.explicit_only(self.driver)
             self.wait = WebDriverWait(self.driver, 15)
             print("✅ Chrome driver ready")
         except Exception as e:
@@ -108,14 +113,12 @@ class CompleteUIFlowTest:
                 
                 description_field = self.driver.find_element(By.NAME, "description")
                 description_field.clear()
-                description_field.send_keys(f"申請{i+1}\\n\\nUIテスト用申請\\n予算: {random.randint(50, 200)}万円")
+                description_field.send_keys(f"申請{i+1}\\n\\nUIテスト用申請\\n予算: {seeding.derive('application', i).randint(50, 200)}万円")
                 
                 # Select type
-                try:
-                    type_select = Select(self.driver.find_element(By.NAME, "type"))
-                    type_select.select_by_value("other")
-                except:
-                    pass
+                type_field = lookup.first(self.driver, By.NAME, "type")
+                if type_field:
+                    Select(type_field).select_by_value("other")
                 
                 # Submit
                 submit_button = self.driver.find_element(By.XPATH, "//button[@type='submit']")
@@ -140,10 +143,10 @@ class CompleteUIFlowTest:
         try:
             # Navigate to approvals page
             self.driver.get(f"{self.base_url}/applications/my-approvals")
-            time.sleep(3)
+            lookup.wait_for(self.driver, By.TAG_NAME, "h2")
             
-            # Find approve buttons
-            approve_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+            # Find approve buttons（承認待ちがなければボタンはないので、待たずに確認する）
+            approve_buttons = lookup.all_now(self.driver, By.CSS_SELECTOR, "button[onclick*='approve']")
             button_count = len(approve_buttons)
             
             print(f"   📋 Found {button_count} pending approvals")
@@ -157,7 +160,7 @@ class CompleteUIFlowTest:
             for i in range(min(3, button_count)):  # Limit to 3 for safety
                 try:
                     # Re-find buttons as DOM changes
-                    current_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+                    current_buttons = lookup.all_now(self.driver, By.CSS_SELECTOR, "button[onclick*='approve']")
                     
                     if i < len(current_buttons):
                         button = current_buttons[i]
@@ -248,5 +251,10 @@ class CompleteUIFlowTest:
                 print("🏁 Browser closed")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Complete UI Flow Test")
+    seeding.add_argument(parser)
+    args = parser.parse_args()
+    seeding.init(args.seed)
+
     test = CompleteUIFlowTest()
     test.run_complete_flow()
\ No newline at end of file
@@ -10,17 +10,21 @@ Final Multi-Organization Bulk Approval Test
 4. 申請が上がっていれば全て承認
 """
 
+import argparse
+import os
+import sys
 import time
-import random
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import Select
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness import lookup, seeding
+from harness.driver import chrome_service
+
 class FinalBulkApprovalTest:
     def __init__(self):
         self.driver = None
@@ -129,9 +133,10 @@ class FinalBulkApprovalTest:
         chrome_options.add_argument("--disable-web-security")
         
         try:
-            service = Service(ChromeDriverManager().install())
+            service = chrome_service()
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.implicitly_wait(5)
+            # implicit wait は使わず、必要な場所だけ明示的に待つ
+            lookup.explicit_only(self.driver)
             self.wait = WebDriverWait(self.driver, 20)
             print("✅ Chrome driver ready")
         except Exception as e:
@@ -195,18 +200,16 @@ class FinalBulkApprovalTest:
             title_field.clear()
             title_field.send_keys(app_title)
             
-            description = f"組織: {org_name}\\n申請者: {applicant_name}\\n\\n自動テスト申請\\n予算: {random.randint(30, 100)}万円"
+            description = f"組織: {org_name}\\n申請者: {applicant_name}\\n\\n自動テスト申請\\n予算: {seeding.derive('application', org_name, applicant_name).randint(30, 100)}万円"
             
             description_field = self.driver.find_element(By.NAME, "description")
             description_field.clear()
             description_field.send_keys(description)
             
             # Select type if available
-            try:
-                type_select = Select(self.driver.find_element(By.NAME, "type"))
-                type_select.select_by_value("other")
-            except:
-                pass
+            type_field = lookup.first(self.driver, By.NAME, "type")
+            if type_field:
+                Select(type_field).select_by_value("other")
             
             # Submit using JavaScript
             submit_button = self.driver.find_element(By.XPATH, "//button[@type='submit']")
@@ -226,10 +229,10 @@ class FinalBulkApprovalTest:
         
         try:
             self.driver.get(f"{self.base_url}/applications/my-approvals")
-            time.sleep(3)
+            lookup.wait_for(self.driver, By.TAG_NAME, "h2")
             
-            # Count and process approve buttons
-            approve_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+            # Count and process approve buttons（承認待ちがなければボタンはないので、待たずに確認する）
+            approve_buttons = lookup.all_now(self.driver, By.CSS_SELECTOR, "button[onclick*='approve']")
             total_buttons = len(approve_buttons)
             
             if total_buttons > 0:
@@ -239,7 +242,7 @@ class FinalBulkApprovalTest:
                 for i in range(total_buttons):
                     try:
                         # Re-find buttons as DOM may have changed
-                        current_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+                        current_buttons = lookup.all_now(self.driver, By.CSS_SELECTOR, "button[onclick*='approve']")
                         if i < len(current_buttons):
                             current_buttons[i].click()
                             time.sleep(2)
@@ -274,7 +277,7 @@ class FinalBulkApprovalTest:
             self.setup_driver()
             
             # Step 1: Select 3 random organizations
-            selected_orgs = random.sample(self.organizations, 3)
+            selected_orgs = seeding.derive('orgs').sample(self.organizations, 3)
             print(f"\\n📊 Selected Organizations:")
             for org in selected_orgs:
                 print(f"   - {org['name']}")
@@ -292,8 +295,9 @@ class FinalBulkApprovalTest:
                 print(f"\\n🏢 {org['name']}")
                 
                 # Select 3-5 applicants
-                num_applicants = random.randint(3, min(5, len(org['applicants'])))
-                selected_applicants = random.sample(org['applicants'], num_applicants)
+                rng = seeding.derive('org', org['name'])
+                num_applicants = rng.randint(3, min(5, len(org['applicants'])))
+                selected_applicants = rng.sample(org['applicants'], num_applicants)
                 
                 print(f"   Creating {num_applicants} applications...")
                 
@@ -325,5 +329,10 @@ class FinalBulkApprovalTest:
                 self.driver.quit()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Final Multi-Organization Bulk Approval Test")
+    seeding.add_argument(parser)
+    args = parser.parse_args()
+    seeding.init(args.seed)
+
     test = FinalBulkApprovalTest()
     test.run_final_test()
\ No newline at end of file
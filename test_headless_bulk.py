@@ -4,6 +4,8 @@ Headless Multi-Organization Bulk Approval Test
 ヘッドレスモードでの一括承認テスト
 """
 
+import os
+import sys
 import time
 import random
 from selenium import webdriver
@@ -11,10 +13,12 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import Select
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness import lookup
+from harness.driver import chrome_service
+
 class HeadlessBulkTest:
     def __init__(self):
         self.driver = None
@@ -34,9 +38,10 @@ class HeadlessBulkTest:
         chrome_options.add_argument("--disable-gpu")
         
         try:
-            service = Service(ChromeDriverManager().install())
+            service = chrome_service()
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.implicitly_wait(10)
+            # implicit wait は使わず、必要な場所だけ明示的に待つ
+            lookup.explicit_only(self.driver)
             self.wait = WebDriverWait(self.driver, 15)
             print("✅ Headless Chrome driver ready")
         except Exception as e:
@@ -86,11 +91,9 @@ class HeadlessBulkTest:
             description_field.send_keys(f"テスト申請: {app_title}\\n\\n自動生成された申請です。")
             
             # Select type
-            try:
-                type_select = Select(self.driver.find_element(By.NAME, "type"))
-                type_select.select_by_value("other")
-            except:
-                pass
+            type_field = lookup.first(self.driver, By.NAME, "type")
+            if type_field:
+                Select(type_field).select_by_value("other")
             
             # Submit
             submit_button = self.driver.find_element(By.XPATH, "//button[@type='submit']")
@@ -110,9 +113,10 @@ class HeadlessBulkTest:
         
         try:
             self.driver.get(f"{self.base_url}/applications/my-approvals")
-            time.sleep(3)
+            lookup.wait_for(self.driver, By.TAG_NAME, "h2")
             
-            approve_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+            # 承認待ちがなければボタンはないので、待たずに確認する
+            approve_buttons = lookup.all_now(self.driver, By.CSS_SELECTOR, "button[onclick*='approve']")
             pending_count = len(approve_buttons)
             
             print(f"📋 Found {pending_count} pending approvals")
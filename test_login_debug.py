@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 
+import os
+import sys
 import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness.driver import chrome_service
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness import lookup
 
 def debug_login():
     print("🔍 Debug Login Test")
@@ -20,7 +26,7 @@ def debug_login():
     chrome_options.add_argument("--disable-dev-shm-usage")
     
     try:
-        service = Service(ChromeDriverManager().install())
+        service = chrome_service()
         driver = webdriver.Chrome(service=service, options=chrome_options)
         print("✓ Chrome driver initialized")
     except Exception as e:
@@ -28,7 +34,8 @@ def debug_login():
         return
     
     try:
-        driver.implicitly_wait(10)
+        # implicit wait は使わず、必要な場所だけ明示的に待つ
+        lookup.explicit_only(driver)
         wait = WebDriverWait(driver, 10)
         
         # Navigate to login page
@@ -79,7 +86,7 @@ def debug_login():
             
             # Check for error messages
             try:
-                error_messages = driver.find_elements(By.CSS_SELECTOR, ".alert, .error, .invalid-feedback")
+                error_messages = lookup.all_now(driver, By.CSS_SELECTOR, ".alert, .error, .invalid-feedback")
                 if error_messages:
                     for msg in error_messages:
                         if msg.text.strip():
@@ -4,17 +4,20 @@ Multi-Browser Approval Test
 ユーザーごとに別々のブラウザを使用する一括承認テスト
 """
 
+import argparse
+import os
+import sys
 import time
-import random
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import Select
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness import flow_recorder, launch, locators, lookup, seeding
+from harness.driver import chrome_service
+
 class MultiBrowserApprovalTest:
     def __init__(self):
         self.base_url = "http://localhost:8080"
@@ -28,25 +31,47 @@ class MultiBrowserApprovalTest:
         ]
         
         self.created_applications = []
+        # HARNESS_FLOW_RECORD 指定時、ブラウザごとのリクエスト記録
+        self.flows = {}
 
-    def create_driver(self):
-        """新しいChromeドライバーインスタンスを作成"""
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--window-size=1200,800")
-        chrome_options.add_argument(f"--window-position={random.randint(0, 200)},{random.randint(0, 200)}")
+    def create_driver(self, name=None):
+        """新しいChromeドライバーインスタンスを作成（ウィンドウ位置は name ごとにシードから決める）"""
+        rng = seeding.derive('window', name)
+        chrome_options = launch.chrome_options(
+            'debug-visible', window_size="1200,800",
+            extra=[f"--window-position={rng.randint(0, 200)},{rng.randint(0, 200)}"])
+        if flow_recorder.record_dir():
+            flow_recorder.enable(chrome_options)
         
-        service = Service(ChromeDriverManager().install())
+        service = chrome_service()
         driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.implicitly_wait(5)
+        # implicit wait は使わず、必要な場所だけ明示的に待つ
+        lookup.explicit_only(driver)
+        if flow_recorder.record_dir():
+            self.flows[id(driver)] = flow_recorder.FlowRecorder(driver, name or f"browser_{len(self.flows)}")
         return driver
 
+    def record(self, driver):
+        """記録中なら、ページ遷移で本文が消える前にリクエストを取り込む"""
+        if id(driver) in self.flows:
+            self.flows[id(driver)].poll()
+
+    def close_driver(self, driver):
+        """記録中ならフローを保存してからブラウザを閉じる"""
+        flow = self.flows.pop(id(driver), None)
+        if flow:
+            try:
+                flow.save(flow_recorder.record_dir())
+            except Exception as e:
+                print(f"⚠️ Failed to save recorded flow: {e}")
+            flow.detach()
+        driver.quit()
+
     def login_user(self, user):
         """指定ユーザーで新しいブラウザを起動してログイン"""
         print(f"🔐 Starting new browser for {user['name']}...")
         
-        driver = self.create_driver()
+        driver = self.create_driver(user['email'].split('@')[0])
         wait = WebDriverWait(driver, 15)
         
         try:
@@ -64,6 +89,7 @@ class MultiBrowserApprovalTest:
             login_button.click()
             
             wait.until(EC.url_contains("/dashboard"))
+            self.record(driver)
             print(f"✅ {user['name']} logged in successfully")
             time.sleep(2)
             
@@ -71,6 +97,7 @@ class MultiBrowserApprovalTest:
             
         except Exception as e:
             print(f"❌ Login failed for {user['name']}: {e}")
+            self.flows.pop(id(driver), None)
             driver.quit()
             return None, None
 
@@ -96,18 +123,17 @@ class MultiBrowserApprovalTest:
                     
                     description_field = driver.find_element(By.NAME, "description")
                     description_field.clear()
-                    description_field.send_keys(f"申請{i+1}\\n\\nマルチブラウザテスト\\n予算: {random.randint(100, 500)}万円")
+                    description_field.send_keys(f"申請{i+1}\\n\\nマルチブラウザテスト\\n予算: {seeding.derive('application', i).randint(100, 500)}万円")
                     
-                    try:
-                        type_select = Select(driver.find_element(By.NAME, "type"))
-                        type_select.select_by_value("other")
-                    except:
-                        pass
+                    type_field = lookup.first(driver, By.NAME, "type")
+                    if type_field:
+                        Select(type_field).select_by_value("other")
                     
                     submit_button = driver.find_element(By.XPATH, "//button[@type='submit']")
                     driver.execute_script("arguments[0].click();", submit_button)
                     
                     time.sleep(3)
+                    self.record(driver)
                     print(f"   ✅ Created: {app_title}")
                     self.created_applications.append(app_title)
                     created += 1
@@ -117,7 +143,7 @@ class MultiBrowserApprovalTest:
                     
         finally:
             print(f"🚪 Closing admin browser...")
-            driver.quit()
+            self.close_driver(driver)
             
         return created
 
@@ -132,9 +158,10 @@ class MultiBrowserApprovalTest:
         approved = 0
         try:
             driver.get(f"{self.base_url}/applications/my-approvals")
-            time.sleep(3)
+            lookup.wait_for(driver, By.TAG_NAME, "h2")
+            self.record(driver)
             
-            approve_buttons = driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+            approve_buttons = locators.find_all(driver, 'approve_button')
             button_count = len(approve_buttons)
             
             print(f"   📋 {approver['name']} found {button_count} pending approvals")
@@ -143,7 +170,7 @@ class MultiBrowserApprovalTest:
                 # Process up to 3 approvals
                 for i in range(min(3, button_count)):
                     try:
-                        current_buttons = driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+                        current_buttons = locators.find_all(driver, 'approve_button')
                         
                         if i < len(current_buttons):
                             button = current_buttons[i]
@@ -162,6 +189,7 @@ class MultiBrowserApprovalTest:
                                 
                                 approved += 1
                                 time.sleep(2)
+                                self.record(driver)
                                 print(f"     ✅ {approver['name']} approved item {i+1}")
                                 
                             except Exception as modal_e:
@@ -175,7 +203,7 @@ class MultiBrowserApprovalTest:
             
         finally:
             print(f"🚪 Closing {approver['name']}'s browser...")
-            driver.quit()
+            self.close_driver(driver)
             
         return approved
 
@@ -221,10 +249,16 @@ class MultiBrowserApprovalTest:
             print(f"📊 Applications created: {created_count}")
             print(f"📊 Total approvals processed: {total_approved}")
             print(f"📊 Browsers used: {1 + len(self.approvers)} (1 admin + {len(self.approvers)} approvers)")
+            locators.print_report(locators.registry().report())
             
         except Exception as e:
             print(f"❌ Multi-browser test failed: {e}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-Browser Approval Test")
+    seeding.add_argument(parser)
+    args = parser.parse_args()
+    seeding.init(args.seed)
+
     test = MultiBrowserApprovalTest()
     test.run_multi_browser_test()
\ No newline at end of file
@@ -10,17 +10,21 @@ Test Flow:
 4. 承認待ち申請を全て承認
 """
 
+import argparse
+import os
+import sys
 import time
-import random
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import Select
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness import locators, lookup, preflight, seeding
+from harness.driver import chrome_service
+
 class MultiOrgApprovalTest:
     def __init__(self):
         self.driver = None
@@ -159,6 +163,17 @@ class MultiOrgApprovalTest:
         # 作成された申請を記録
         self.created_applications = []
 
+    def preflight_users(self):
+        """ブラウザ起動前に名簿の全ユーザーのログインを確認し、使えない申請者・承認者を外す"""
+        if not preflight.filter_users([self.admin], 'admin', self.base_url):
+            raise RuntimeError(f"Admin account {self.admin['email']} failed preflight")
+
+        for kind, key in (('applicant', 'applicants'), ('approver', 'approvers')):
+            users = [u for org in self.organizations for u in org[key]]
+            usable = {u['email'] for u in preflight.filter_users(users, kind, self.base_url)}
+            for org in self.organizations:
+                org[key] = [u for u in org[key] if u['email'] in usable]
+
     def setup_driver(self):
         """Chrome driver setup"""
         print("🚀 Setting up Chrome driver...")
@@ -170,9 +185,10 @@ class MultiOrgApprovalTest:
         chrome_options.add_argument("--window-size=1400,900")
         
         try:
-            service = Service(ChromeDriverManager().install())
+            service = chrome_service()
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.implicitly_wait(10)
+            # implicit wait は使わず、必要な場所だけ明示的に待つ
+            lookup.explicit_only(self.driver)
             self.wait = WebDriverWait(self.driver, 15)
             print("✅ Chrome driver ready")
         except Exception as e:
@@ -239,14 +255,15 @@ class MultiOrgApprovalTest:
                     time.sleep(3)
             
             # Fill in application details
+            rng = seeding.derive('application', org_name, applicant_name)
             description = f"""
             組織: {org_name}
             申請者: {applicant_name}
             
             申請内容:
             - 新規プロジェクト承認申請
-            - 予算: {random.randint(10, 100)}万円
-            - 期間: {random.randint(1, 6)}ヶ月
+            - 予算: {rng.randint(10, 100)}万円
+            - 期間: {rng.randint(1, 6)}ヶ月
             
             自動テスト申請
             """
@@ -259,11 +276,9 @@ class MultiOrgApprovalTest:
             description_field.send_keys(description)
             
             # Select application type
-            try:
-                type_select = Select(self.driver.find_element(By.NAME, "type"))
-                type_select.select_by_value("other")
-            except:
-                pass
+            type_field = lookup.first(self.driver, By.NAME, "type")
+            if type_field:
+                Select(type_field).select_by_value("other")
             
             # Submit the application
             try:
@@ -297,13 +312,13 @@ class MultiOrgApprovalTest:
         
         # Navigate to my approvals page
         self.driver.get(f"{self.base_url}/applications/my-approvals")
-        time.sleep(2)
+        lookup.wait_for(self.driver, By.TAG_NAME, "h2")
         
         approved_count = 0
         
         try:
-            # Find all approval cards
-            approval_cards = self.driver.find_elements(By.CSS_SELECTOR, ".card")
+            # Find all approval cards（承認待ちがなければカードはないので、待たずに確認する）
+            approval_cards = lookup.all_now(self.driver, By.CSS_SELECTOR, ".card")
             
             if approval_cards:
                 print(f"📋 Found {len(approval_cards)} approval item(s)")
@@ -312,7 +327,7 @@ class MultiOrgApprovalTest:
                 for i in range(len(approval_cards)):
                     try:
                         # Re-find cards after each approval
-                        cards = self.driver.find_elements(By.CSS_SELECTOR, ".card")
+                        cards = lookup.all_now(self.driver, By.CSS_SELECTOR, ".card")
                         if i >= len(cards):
                             break
                             
@@ -320,10 +335,10 @@ class MultiOrgApprovalTest:
                         card_text = card.text[:100]  # First 100 chars for logging
                         
                         # Look for approve button
-                        approve_buttons = card.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
-                        if approve_buttons:
+                        approve_button = locators.find(card, 'approve_button')
+                        if approve_button:
                             print(f"   ⏳ Approving item {i+1}...")
-                            approve_buttons[0].click()
+                            approve_button.click()
                             
                             # Handle approval modal
                             try:
@@ -340,7 +355,7 @@ class MultiOrgApprovalTest:
                                 
                                 # Refresh page for next approval
                                 self.driver.get(f"{self.base_url}/applications/my-approvals")
-                                time.sleep(2)
+                                lookup.wait_for(self.driver, By.TAG_NAME, "h2")
                                 
                             except Exception as modal_e:
                                 print(f"   ⚠️ Modal issue for item {i+1}: {modal_e}")
@@ -361,10 +376,11 @@ class MultiOrgApprovalTest:
         print("=" * 60)
         
         try:
+            self.preflight_users()
             self.setup_driver()
             
             # Step 1: Select 3 random organizations
-            selected_orgs = random.sample(self.organizations, 3)
+            selected_orgs = seeding.derive('orgs').sample(self.organizations, 3)
             print(f"\n📊 Selected Organizations:")
             for org in selected_orgs:
                 print(f"   - {org['name']}")
@@ -377,9 +393,11 @@ class MultiOrgApprovalTest:
             for org in selected_orgs:
                 print(f"\n🏢 Organization: {org['name']}")
                 
-                # Select 3-5 random applicants from this org
-                num_applicants = random.randint(3, min(5, len(org['applicants'])))
-                selected_applicants = random.sample(org['applicants'], num_applicants)
+                # Select 3-5 random applicants from this org（事前チェックで外れた分だけ少なくなることがある）
+                rng = seeding.derive('org', org['name'])
+                available = len(org['applicants'])
+                num_applicants = rng.randint(min(3, available), min(5, available))
+                selected_applicants = rng.sample(org['applicants'], num_applicants)
                 
                 print(f"   Selected {num_applicants} applicants")
                 
@@ -392,7 +410,8 @@ class MultiOrgApprovalTest:
                         self.created_applications.append({
                             'org': org['name'],
                             'applicant': applicant['name'],
-                            'title': app_title
+                            'title': app_title,
+                            'seed': seeding.current()
                         })
                     else:
                         print(f"   ⚠️ Skipping failed application for {applicant['name']}")
@@ -412,7 +431,7 @@ class MultiOrgApprovalTest:
                 
                 # Select one approver from each organization
                 if org['approvers']:
-                    approver = random.choice(org['approvers'])
+                    approver = seeding.derive('approver', org['name']).choice(org['approvers'])
                     print(f"   Selected approver: {approver['name']}")
                     
                     # Login as approver
@@ -430,7 +449,9 @@ class MultiOrgApprovalTest:
             print("🎉 Multi-Organization Test Completed Successfully!")
             print(f"   📝 Applications created: {len(self.created_applications)}")
             print(f"   🏢 Organizations tested: {len(selected_orgs)}")
+            print(f"   🎲 Seed: {seeding.current()}")
             print("=" * 60)
+            locators.print_report(locators.registry().report())
             
         except Exception as e:
             print(f"❌ Test failed with error: {e}")
@@ -444,5 +465,10 @@ class MultiOrgApprovalTest:
                 print("🏁 Browser closed")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-Organization Bulk Approval Test")
+    seeding.add_argument(parser)
+    args = parser.parse_args()
+    seeding.init(args.seed)
+
     test = MultiOrgApprovalTest()
     test.run_test()
\ No newline at end of file
@@ -9,17 +9,21 @@ Test Flow:
 3. 全ての承認者でログイン・一括承認
 """
 
+import argparse
+import os
+import sys
 import time
-import random
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import Select
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness import lookup, seeding
+from harness.driver import chrome_service
+
 class SimpleBulkApprovalTest:
     def __init__(self):
         self.driver = None
@@ -62,9 +66,10 @@ class SimpleBulkApprovalTest:
         chrome_options.add_argument("--window-size=1200,800")
         
         try:
-            service = Service(ChromeDriverManager().install())
+            service = chrome_service()
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.implicitly_wait(10)
+            # implicit wait は使わず、必要な場所だけ明示的に待つ
+            lookup.explicit_only(self.driver)
             self.wait = WebDriverWait(self.driver, 30)
             print("✅ Chrome driver ready")
         except Exception as e:
@@ -116,7 +121,7 @@ class SimpleBulkApprovalTest:
             
             title_field = self.wait.until(EC.presence_of_element_located((By.NAME, "title")))
             
-            description = f"組織: {org_name}\\n申請者: {applicant_name}\\n\\n自動テスト申請\\n予算: {random.randint(50, 200)}万円"
+            description = f"組織: {org_name}\\n申請者: {applicant_name}\\n\\n自動テスト申請\\n予算: {seeding.derive('application', org_name, applicant_name).randint(50, 200)}万円"
             
             title_field.clear()
             title_field.send_keys(application_title)
@@ -126,11 +131,9 @@ class SimpleBulkApprovalTest:
             description_field.send_keys(description)
             
             # Select type
-            try:
-                type_select = Select(self.driver.find_element(By.NAME, "type"))
-                type_select.select_by_value("other")
-            except:
-                pass
+            type_field = lookup.first(self.driver, By.NAME, "type")
+            if type_field:
+                Select(type_field).select_by_value("other")
             
             # Submit
             submit_button = self.driver.find_element(By.XPATH, "//button[@type='submit']")
@@ -150,10 +153,10 @@ class SimpleBulkApprovalTest:
         
         try:
             self.driver.get(f"{self.base_url}/applications/my-approvals")
-            time.sleep(3)
+            lookup.wait_for(self.driver, By.TAG_NAME, "h2")
             
-            # Find approve buttons
-            approve_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+            # Find approve buttons（承認待ちがなければボタンはないので、待たずに確認する）
+            approve_buttons = lookup.all_now(self.driver, By.CSS_SELECTOR, "button[onclick*='approve']")
             
             if approve_buttons:
                 approved_count = 0
@@ -200,7 +203,7 @@ class SimpleBulkApprovalTest:
             # Create 2-3 applications per organization
             for org in self.test_orgs:
                 print(f"\\n🏢 {org['name']}")
-                num_apps = random.randint(2, 3)
+                num_apps = seeding.derive('org', org['name']).randint(2, 3)
                 
                 for i in range(num_apps):
                     applicant_name = f"テスト申請者{i+1}"
@@ -233,5 +236,10 @@ class SimpleBulkApprovalTest:
                 self.driver.quit()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simple Bulk Approval Test")
+    seeding.add_argument(parser)
+    args = parser.parse_args()
+    seeding.init(args.seed)
+
     test = SimpleBulkApprovalTest()
     test.run_test()
\ No newline at end of file
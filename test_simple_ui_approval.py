@@ -4,6 +4,8 @@ Simple UI-based Approval Test
 シンプルなUI承認テスト - 管理者のみで動作確認
 """
 
+import os
+import sys
 import time
 import random
 from selenium import webdriver
@@ -11,10 +13,12 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import Select
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness import lookup
+from harness.driver import chrome_service
+
 class SimpleUIApprovalTest:
     def __init__(self):
         self.driver = None
@@ -33,9 +37,10 @@ class SimpleUIApprovalTest:
         chrome_options.add_argument("--disable-blink-features=AutomationControlled")
         
         try:
-            service = Service(ChromeDriverManager().install())
+            service = chrome_service()
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.implicitly_wait(5)
+            # implicit wait は使わず、必要な場所だけ明示的に待つ
+            lookup.explicit_only(self.driver)
             self.wait = WebDriverWait(self.driver, 15)
             print("✅ Chrome driver ready")
         except Exception as e:
@@ -104,12 +109,12 @@ class SimpleUIApprovalTest:
             
             # Select type
             print("   Setting type...")
-            try:
-                type_select = Select(self.driver.find_element(By.NAME, "type"))
-                type_select.select_by_value("other")
+            type_field = lookup.first(self.driver, By.NAME, "type")
+            if type_field:
+                Select(type_field).select_by_value("other")
                 print("   ✓ Type selected: other")
-            except Exception as e:
-                print(f"   ⚠️ Type selection failed: {e}")
+            else:
+                print("   ⚠️ Type select not found")
             
             # Try to find and click submit
             print("   Looking for submit button...")
@@ -145,10 +150,11 @@ class SimpleUIApprovalTest:
             self.driver.get(approval_url)
             
             print(f"   Current URL: {self.driver.current_url}")
-            time.sleep(3)
+            lookup.wait_for(self.driver, By.TAG_NAME, "h2")
             
             # Look for approve buttons
-            approve_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+            # 承認待ちがなければボタンはないので、待たずに確認する
+            approve_buttons = lookup.all_now(self.driver, By.CSS_SELECTOR, "button[onclick*='approve']")
             button_count = len(approve_buttons)
             
             print(f"   Found {button_count} approve buttons")
@@ -4,16 +4,20 @@ Single Application Flow Test
 1件の申請を作成してすぐに承認フローをテストする
 """
 
+import os
+import sys
 import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import Select
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness import locators, lookup
+from harness.driver import chrome_service
+
 class SingleAppFlowTest:
     def __init__(self):
         self.base_url = "http://localhost:8080"
@@ -29,9 +33,10 @@ class SingleAppFlowTest:
         chrome_options.add_argument("--window-size=1000,700")
         chrome_options.add_argument(f"--window-position={window_position[0]},{window_position[1]}")
         
-        service = Service(ChromeDriverManager().install())
+        service = chrome_service()
         driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.implicitly_wait(5)
+        # implicit wait は使わず、必要な場所だけ明示的に待つ
+        lookup.explicit_only(driver)
         return driver
 
     def login_user(self, user, driver):
@@ -91,7 +96,7 @@ class SingleAppFlowTest:
         print(f"🔍 {user['name']} checking approvals...")
         
         driver.get(f"{self.base_url}/applications/my-approvals")
-        time.sleep(3)
+        lookup.wait_for(driver, By.TAG_NAME, "h2")
         
         # ページソースを少し表示してデバッグ
         page_text = driver.find_element(By.TAG_NAME, "body").text
@@ -100,14 +105,13 @@ class SingleAppFlowTest:
         else:
             print("   ⚠️ Page does not contain '承認' text")
         
-        approve_buttons = driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
-        button_count = len(approve_buttons)
+        # 承認待ちがなければボタンはないので、待たずに確認する（各行の承認ボタン。「全て承認」は含まない）
+        button = locators.find(driver, 'approve_button')
         
-        print(f"   📋 Found {button_count} approve buttons")
+        print(f"   📋 Approve button {'found' if button is not None else 'not found'}")
         
-        if button_count > 0:
+        if button is not None:
             print("   🎯 Trying to approve first item...")
-            button = approve_buttons[0]
             
             driver.execute_script("arguments[0].scrollIntoView(true);", button)
             time.sleep(1)
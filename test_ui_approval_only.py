@@ -4,6 +4,8 @@ UI Approval Only Test
 Artisanで申請を作成してからUIで承認をテストする
 """
 
+import os
+import sys
 import time
 import subprocess
 from selenium import webdriver
@@ -11,8 +13,12 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness.driver import chrome_service
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness import lookup
 
 class UIApprovalOnlyTest:
     def __init__(self):
@@ -27,9 +33,10 @@ class UIApprovalOnlyTest:
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--window-size=1200,800")
         
-        service = Service(ChromeDriverManager().install())
+        service = chrome_service()
         driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.implicitly_wait(5)
+        # implicit wait は使わず、必要な場所だけ明示的に待つ
+        lookup.explicit_only(driver)
         return driver
 
     def create_application_via_artisan(self):
@@ -111,7 +118,7 @@ class UIApprovalOnlyTest:
             
             # Check approvals
             driver.get(f"{self.base_url}/applications/my-approvals")
-            time.sleep(3)
+            lookup.wait_for(driver, By.TAG_NAME, "h2")
             
             # Debug: Show page content
             page_text = driver.find_element(By.TAG_NAME, "body").text
@@ -122,7 +129,8 @@ class UIApprovalOnlyTest:
                 print(f"   Page title: {driver.title}")
                 print(f"   Current URL: {driver.current_url}")
             
-            approve_buttons = driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+            # 承認待ちがなければボタンはないので、待たずに確認する
+            approve_buttons = lookup.all_now(driver, By.CSS_SELECTOR, "button[onclick*='approve']")
             button_count = len(approve_buttons)
             
             print(f"   📋 Found {button_count} approve buttons")
@@ -10,17 +10,21 @@ SeleniumによるUIテスト版マルチ組織一括承認テスト
 4. 申請が上がっていれば全て承認
 """
 
+import argparse
+import os
+import sys
 import time
-import random
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import Select
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from harness import lookup, seeding
+from harness.driver import chrome_service
+
 class UIBulkApprovalTest:
     def __init__(self):
         self.driver = None
@@ -65,9 +69,10 @@ class UIBulkApprovalTest:
         chrome_options.add_argument("--window-size=1200,800")
         
         try:
-            service = Service(ChromeDriverManager().install())
+            service = chrome_service()
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.implicitly_wait(8)
+            # implicit wait は使わず、必要な場所だけ明示的に待つ
+            lookup.explicit_only(self.driver)
             self.wait = WebDriverWait(self.driver, 20)
             print("✅ Chrome driver ready for UI test")
         except Exception as e:
@@ -131,18 +136,16 @@ class UIBulkApprovalTest:
             title_field.clear()
             title_field.send_keys(app_title)
             
-            description = f"UI経由申請\\n組織: {org_name}\\n申請者: {applicant_name}\\n\\n予算: {random.randint(50, 300)}万円\\nSeleniumテスト申請"
+            description = f"UI経由申請\\n組織: {org_name}\\n申請者: {applicant_name}\\n\\n予算: {seeding.derive('application', org_name, applicant_name).randint(50, 300)}万円\\nSeleniumテスト申請"
             
             description_field = self.driver.find_element(By.NAME, "description")
             description_field.clear()
             description_field.send_keys(description)
             
             # Select type if available
-            try:
-                type_select = Select(self.driver.find_element(By.NAME, "type"))
-                type_select.select_by_value("other")
-            except:
-                pass
+            type_field = lookup.first(self.driver, By.NAME, "type")
+            if type_field:
+                Select(type_field).select_by_value("other")
             
             # Submit form
             submit_button = self.driver.find_element(By.XPATH, "//button[@type='submit']")
@@ -168,10 +171,10 @@ class UIBulkApprovalTest:
         try:
             # Navigate to approvals page
             self.driver.get(f"{self.base_url}/applications/my-approvals")
-            time.sleep(3)
+            lookup.wait_for(self.driver, By.TAG_NAME, "h2")
             
-            # Find approve buttons
-            approve_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+            # Find approve buttons（承認待ちがなければボタンはないので、待たずに確認する）
+            approve_buttons = lookup.all_now(self.driver, By.CSS_SELECTOR, "button[onclick*='approve']")
             button_count = len(approve_buttons)
             
             print(f"   📋 Found {button_count} approve buttons")
@@ -183,7 +186,7 @@ class UIBulkApprovalTest:
                 for i in range(button_count):
                     try:
                         # Re-find buttons as DOM changes after each approval
-                        current_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
+                        current_buttons = lookup.all_now(self.driver, By.CSS_SELECTOR, "button[onclick*='approve']")
                         
                         if i < len(current_buttons):
                             button = current_buttons[i]
@@ -247,7 +250,7 @@ class UIBulkApprovalTest:
                 print(f"\\n🏢 {org['name']}")
                 
                 # Create 2-3 applications per org
-                num_apps = random.randint(2, 3)
+                num_apps = seeding.derive('org', org['name']).randint(2, 3)
                 print(f"   Creating {num_apps} applications via UI...")
                 
                 for i in range(num_apps):
@@ -296,5 +299,10 @@ class UIBulkApprovalTest:
                 print("🏁 Browser closed")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Bulk Approval Test")
+    seeding.add_argument(parser)
+    args = parser.parse_args()
+    seeding.init(args.seed)
+
     test = UIBulkApprovalTest()
     test.run_ui_test()
\ No newline at end of file
@@ -0,0 +1,6 @@
+"""
+承認ワークフロー UI テスト用の共通ハーネス
+
+tests/ 配下のテストスクリプトから共通で使うユーティリティをまとめたパッケージ。
+selenium などの重い依存は、各モジュールの中で必要になった時点で読み込む。
+"""
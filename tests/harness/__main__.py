@@ -0,0 +1,108 @@
+"""
+ハーネスの CLI（python -m harness <サブコマンド>）
+
+ブラウザを使うサブコマンド（create / approve / multi-org / bulk）は、実行するときに初めて
+スクリプトを読み込むため、selenium や webdriver-manager の読み込みはそのサブコマンドでしか発生しない。
+preflight・report と bench（launch 以外）はブラウザを使わず、HTTP と標準ライブラリだけで動く。
+
+cd tests && python -m harness create --seed 42
+cd tests && python -m harness preflight applicant0_0@wf.nrkk.technology
+cd tests && python -m harness report create_steps.json approve_steps.json
+cd tests && python -m harness bench notifications
+
+起動時間の確認: python -X importtime -m harness preflight ... 2> importtime.log
+"""
+
+import argparse
+import importlib
+import os
+import runpy
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(TESTS_DIR)
+
+# サブコマンド → (実行するスクリプト, 説明)
+SCRIPTS = {
+    'create': (os.path.join(TESTS_DIR, 'test_create_applications.py'), "申請作成テスト"),
+    'approve': (os.path.join(TESTS_DIR, 'test_approve_applications.py'), "承認処理テスト"),
+    'multi-org': (os.path.join(ROOT_DIR, 'test_multi_org_approval.py'), "複数組織の作成と一括承認"),
+    'bulk': (os.path.join(TESTS_DIR, 'test_multi_browser_approval.py'), "ユーザーごとのブラウザでの一括承認"),
+}
+
+# bench のサブコマンド → main を持つモジュール
+BENCHMARKS = {
+    'newrelic': 'harness.bench_newrelic',
+    'notifications': 'harness.bench_notifications',
+    'mail': 'harness.bench_mail',
+    'launch': 'harness.launch',
+}
+
+DEFAULT_REPORTS = ['create_steps.json', 'approve_steps.json']
+
+
+def run_script(path, argv):
+    """スクリプトを直接実行したときと同じ __main__ として実行する"""
+    sys.argv = [path] + list(argv)
+    sys.path.insert(0, os.path.dirname(path))
+    runpy.run_path(path, run_name='__main__')
+
+
+def preflight(argv):
+    from . import preflight as module
+
+    module.main(argv)
+
+
+def report(argv):
+    from . import steps
+
+    parser = argparse.ArgumentParser(prog='python -m harness report', description="ステップ記録の集計")
+    parser.add_argument('paths', nargs='*', help=f"ステップ記録（省略時は {', '.join(DEFAULT_REPORTS)}）")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or [p for p in DEFAULT_REPORTS if os.path.exists(p)]
+    if not paths:
+        raise SystemExit("❌ No step records found (pass the *_steps.json paths)")
+    for path in paths:
+        meta, records = steps.load(path)
+        print(f"\n📊 {path}: {len(records)} steps")
+        steps.print_summary(steps.summary(records), meta)
+
+
+def bench(argv):
+    if not argv or argv[0] not in BENCHMARKS:
+        raise SystemExit(f"usage: python -m harness bench {{{','.join(BENCHMARKS)}}} [options]")
+    importlib.import_module(BENCHMARKS[argv[0]]).main(argv[1:])
+
+
+COMMANDS = {
+    'preflight': (preflight, "ログイン情報の事前チェック（HTTP のみ）"),
+    'report': (report, "ステップ記録の集計（ブラウザ不要）"),
+    'bench': (bench, f"ベンチマーク（{' / '.join(BENCHMARKS)}）"),
+}
+
+
+def usage():
+    lines = ["usage: python -m harness <command> [options]", "", "commands:"]
+    for name, (_, description) in list(SCRIPTS.items()) + list(COMMANDS.items()):
+        lines.append(f"  {name:<12}{description}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return
+    command, rest = argv[0], argv[1:]
+    if command in SCRIPTS:
+        run_script(SCRIPTS[command][0], rest)
+    elif command in COMMANDS:
+        COMMANDS[command][0](rest)
+    else:
+        raise SystemExit(f"❌ Unknown command: {command}\n\n{usage()}")
+
+
+if __name__ == '__main__':
+    main()
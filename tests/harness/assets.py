@@ -0,0 +1,260 @@
+"""
+静的アセットのローカル配信とブロック（オプトイン）
+
+画面は毎回 CDN（cdn.jsdelivr.net の Bootstrap、cdnjs の Font Awesome）から CSS・JS を取得する。
+k8s の Pod などで CDN が遅い・届かない環境では、ページの読み込み時間の大半がアプリと無関係になる。
+
+HARNESS_STATIC_ASSETS=local              CDN のアセットを CDP の Fetch で横取りし、キャッシュディレクトリから返す
+HARNESS_STATIC_ASSETS=block-media        画像・フォントを Network.setBlockedURLs でブロック（負荷目的の実行向け）
+HARNESS_STATIC_ASSETS=local,block-media  両方
+
+キャッシュは HARNESS_ASSET_DIR（既定 .harness_state/assets）に <ホスト>/<パス> で置く。
+キャッシュにないアセットはそのまま CDN に取りに行き、miss として数える。
+どのモードで計測したかはステップ記録の meta（static_assets）と各フェーズに残る。
+
+python -m harness.assets fetch    既知のアセット（CSS が参照するフォントを含む）をキャッシュに取得
+python -m harness.assets          キャッシュの状態を表示
+"""
+
+import argparse
+import base64
+import collections
+import mimetypes
+import os
+import re
+import threading
+import urllib.request
+from urllib.parse import urljoin, urlparse
+
+from .checkpoint import DEFAULT_STATE_DIR
+
+DEFAULT_DIR = os.path.join(DEFAULT_STATE_DIR, 'assets')
+
+# resources/views/layouts/app.blade.php が読み込む CDN のアセット
+KNOWN_ASSETS = [
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css',
+]
+ASSET_HOSTS = sorted({urlparse(u).netloc for u in KNOWN_ASSETS})
+
+MEDIA_PATTERNS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.webp', '*.ico',
+                  '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot']
+MODES = ('local', 'block-media')
+
+_CSS_URL = re.compile(r'url\(\s*["\']?([^"\')]+)["\']?\s*\)')
+
+_totals = collections.Counter()
+_totals_lock = threading.Lock()
+
+
+def modes():
+    """有効なモードの集合（未指定なら空）"""
+    value = os.getenv("HARNESS_STATIC_ASSETS", "")
+    selected = {m.strip() for m in value.split(',') if m.strip()}
+    unknown = selected - set(MODES)
+    if unknown:
+        raise ValueError(f"Unknown HARNESS_STATIC_ASSETS mode(s): {', '.join(sorted(unknown))}")
+    return selected
+
+
+def is_enabled():
+    return bool(modes())
+
+
+def asset_dir():
+    return os.getenv("HARNESS_ASSET_DIR", DEFAULT_DIR)
+
+
+def cache_path(url, directory=None):
+    parsed = urlparse(url)
+    return os.path.join(directory or asset_dir(), parsed.netloc, parsed.path.lstrip('/'))
+
+
+def _count(key, n=1):
+    with _totals_lock:
+        _totals[key] += n
+
+
+class AssetInterceptor:
+    """1つのブラウザの CDN リクエストをキャッシュから返す
+
+    CDP のイベントは非同期でしか受け取れないため、selenium の bidi_connection を
+    バックグラウンドのスレッド（trio）で動かす。ブラウザを閉じると接続が切れてスレッドも終わる。
+    """
+
+    def __init__(self, driver, directory=None, hosts=None):
+        self.driver = driver
+        self.directory = directory or asset_dir()
+        self.hosts = hosts or ASSET_HOSTS
+        self.error = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='asset-interceptor', daemon=True)
+
+    def start(self, timeout=10):
+        """Fetch を有効にしてから返す（最初のページ遷移より前に横取りを始めるため）"""
+        self._thread.start()
+        self._ready.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def _run(self):
+        import trio
+
+        try:
+            trio.run(self._serve)
+        except Exception as e:
+            # ブラウザを閉じたときの切断もここに来る
+            self.error = e
+        finally:
+            self._ready.set()
+
+    async def _serve(self):
+        async with self.driver.bidi_connection() as connection:
+            session, devtools = connection.session, connection.devtools
+            patterns = [devtools.fetch.RequestPattern(url_pattern=f"*://{host}/*") for host in self.hosts]
+            await session.execute(devtools.fetch.enable(patterns=patterns))
+            listener = session.listen(devtools.fetch.RequestPaused)
+            self._ready.set()
+            async for event in listener:
+                await self._handle(session, devtools, event)
+
+    async def _handle(self, session, devtools, event):
+        path = cache_path(event.request.url, self.directory)
+        if not os.path.isfile(path):
+            _count('missed')
+            await session.execute(devtools.fetch.continue_request(request_id=event.request_id))
+            return
+        with open(path, 'rb') as f:
+            body = base64.b64encode(f.read()).decode('ascii')
+        headers = [
+            devtools.fetch.HeaderEntry(name='Content-Type', value=mimetypes.guess_type(path)[0] or 'application/octet-stream'),
+            devtools.fetch.HeaderEntry(name='Access-Control-Allow-Origin', value='*'),
+            devtools.fetch.HeaderEntry(name='Cache-Control', value='max-age=86400'),
+        ]
+        await session.execute(devtools.fetch.fulfill_request(
+            request_id=event.request_id, response_code=200, response_headers=headers, body=body))
+        _count('served')
+
+
+def block_media(driver, patterns=None):
+    """画像・フォントの読み込みをブロック"""
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns or MEDIA_PATTERNS})
+
+
+def intercept(driver):
+    """作成直後のドライバーに、有効なモードを適用する（無効なら何もしない）"""
+    selected = modes()
+    if 'block-media' in selected:
+        block_media(driver)
+    if 'local' in selected:
+        try:
+            AssetInterceptor(driver).start()
+        except Exception as e:
+            # 横取りできなくてもテストは CDN から読み込んで続行する（meta に残す）
+            _count('intercept_errors')
+            print(f"    ⚠️ Static asset interception disabled: {type(e).__name__}: {e}")
+    return driver
+
+
+class _PhaseMarker:
+    """最上位ステップにアセットのモードと、そのフェーズ中の配信数を付ける"""
+
+    def __init__(self, selected):
+        self.mode = ','.join(sorted(selected))
+        self._started = {}
+
+    def on_step_start(self, step):
+        if step.parent is None:
+            with _totals_lock:
+                self._started[id(step)] = dict(_totals)
+
+    def on_step_end(self, step):
+        if step.parent is not None:
+            return
+        before = self._started.pop(id(step), {})
+        with _totals_lock:
+            delta = {k: v - before.get(k, 0) for k, v in _totals.items()}
+        step.data['static_assets'] = {'mode': self.mode, **delta}
+
+
+def attach(recorder):
+    """実行の開始時に呼ぶ。モードを meta に記録する（未指定でも 'off' を残す）"""
+    selected = modes()
+    recorder.meta['static_assets'] = {
+        'mode': ','.join(sorted(selected)) or 'off',
+        'blocked': MEDIA_PATTERNS if 'block-media' in selected else [],
+    }
+    if not selected:
+        return None
+    marker = _PhaseMarker(selected)
+    recorder.add_listener(marker)
+    print(f"🧱 Static assets: {marker.mode} (cache {asset_dir()})")
+    return marker
+
+
+def finish(marker, recorder):
+    """配信数・ミス数を meta に書き、表示する"""
+    if marker is None:
+        return None
+    recorder.remove_listener(marker)
+    with _totals_lock:
+        totals = dict(_totals)
+    recorder.meta['static_assets'].update(totals)
+    print(f"🧱 Static assets ({marker.mode}): served {totals.get('served', 0)} from cache, "
+          f"{totals.get('missed', 0)} fetched from CDN, {totals.get('intercept_errors', 0)} interception error(s)")
+    return totals
+
+
+def _download(url, directory):
+    path = cache_path(url, directory)
+    with urllib.request.urlopen(url, timeout=30) as response:
+        body = response.read()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(body)
+    return body
+
+
+def fetch(urls=None, directory=None):
+    """アセットをキャッシュに取得する。CSS が url() で参照するファイル（フォントなど）も取得する"""
+    directory = directory or asset_dir()
+    fetched = []
+    for url in urls or KNOWN_ASSETS:
+        body = _download(url, directory)
+        fetched.append(url)
+        if url.endswith('.css'):
+            for ref in sorted(set(_CSS_URL.findall(body.decode('utf-8', 'replace')))):
+                if ref.startswith('data:'):
+                    continue
+                target = urljoin(url, ref.split('?')[0].split('#')[0])
+                try:
+                    _download(target, directory)
+                    fetched.append(target)
+                except Exception as e:
+                    print(f"   ⚠️ {target}: {e}")
+    return fetched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="静的アセットのキャッシュ")
+    parser.add_argument('command', nargs='?', choices=['fetch', 'status'], default='status')
+    parser.add_argument('--dir', default=None, help=f"キャッシュディレクトリ（既定 {DEFAULT_DIR}）")
+    args = parser.parse_args(argv)
+
+    directory = args.dir or asset_dir()
+    if args.command == 'fetch':
+        fetched = fetch(directory=directory)
+        print(f"📦 Cached {len(fetched)} asset(s) in {directory}")
+        return
+    print(f"📦 Asset cache: {directory}")
+    for url in KNOWN_ASSETS:
+        path = cache_path(url, directory)
+        state = f"{os.path.getsize(path) / 1024:.0f} KB" if os.path.isfile(path) else 'missing'
+        print(f"   {state:>10}  {url}")
+
+
+if __name__ == '__main__':
+    main()
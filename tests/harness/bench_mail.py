@@ -0,0 +1,95 @@
+"""
+メール通知スループットのベンチマーク
+
+アプリのメーラーを SmtpSink に向けた状態で一括承認を実行し、
+リクエストの応答時間・送信されたメール数・操作開始からメール到着までの遅延を測定する。
+応答後に届いたメールの件数は、キュー経由で送られている（QUEUE_CONNECTION != sync）場合の滞留量の目安になる。
+
+アプリ側は docker-compose.sinks.yml を重ねて起動しておくこと:
+docker-compose -f docker-compose.yml -f docker-compose.sinks.yml up -d
+
+python -m harness.bench_mail --delays 0,100,500 --count 5
+"""
+
+import argparse
+import json
+import time
+
+from .bench_notifications import DEFAULT_APPLICANT, DEFAULT_APPROVER, prepare_pending
+from .http_client import AppClient
+from .smtp_sink import SmtpSink
+from .stats import summarize
+from . import warmup
+
+
+def run_scenario(sink, applicant, approver, delay_ms, count):
+    """SMTP の応答遅延を1つ決めて一括承認を測定"""
+    sink.delay_ms = delay_ms
+    ids = prepare_pending(applicant, approver, count, f"mail_{delay_ms:.0f}ms")
+
+    started = time.time()
+    if ids:
+        approver.bulk_approve(ids, comment=f"メールベンチ {delay_ms:.0f}ms")
+    responded = time.time()
+    mails = sink.wait_for_quiet(started)
+
+    delays = [(m['received_at'] - started) * 1000 for m in mails]
+    last = max((m['received_at'] for m in mails), default=responded)
+    return {
+        'smtp_delay_ms': delay_ms,
+        'bulk_items': len(ids),
+        'request_ms': (responded - started) * 1000,
+        'mails': len(mails),
+        'mails_per_item': len(mails) / len(ids) if ids else 0,
+        'mails_after_response': sum(1 for m in mails if m['received_at'] > responded),
+        'arrival_delay_ms': summarize(delays),
+        'mails_per_sec': len(mails) / (last - started) if mails and last > started else 0,
+    }
+
+
+def print_results(results):
+    print("\n📊 Mail fan-out on bulk approval")
+    print(f"   {'smtp delay':>10}{'items':>7}{'request ms':>12}{'mails':>7}{'after resp':>12}{'arrival p95':>13}{'mails/s':>9}")
+    for r in results:
+        p95 = r['arrival_delay_ms']['p95']
+        print(f"   {r['smtp_delay_ms']:>10.0f}{r['bulk_items']:>7}{r['request_ms']:>12.0f}{r['mails']:>7}"
+              f"{r['mails_after_response']:>12}{(p95 or 0):>13.0f}{r['mails_per_sec']:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="メール通知スループットのベンチマーク")
+    parser.add_argument('--base-url', default=None)
+    parser.add_argument('--applicant', default=DEFAULT_APPLICANT)
+    parser.add_argument('--approver', default=DEFAULT_APPROVER)
+    parser.add_argument('--port', type=int, default=2525)
+    parser.add_argument('--delays', default='0,100,500', help="SMTP の応答遅延（ms, カンマ区切り）")
+    parser.add_argument('--count', type=int, default=5, help="シナリオごとの申請数")
+    parser.add_argument('--output', default='mail_bench.json')
+    warmup.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    warm = warmup.run_from_args(args, args.base_url)
+    sink = SmtpSink(port=args.port).start()
+    applicant = AppClient(args.base_url)
+    approver = AppClient(args.base_url)
+    if not applicant.login(args.applicant) or not approver.login(args.approver):
+        sink.stop()
+        raise SystemExit("❌ Login failed for applicant or approver")
+
+    results = []
+    try:
+        for delay in [float(v) for v in args.delays.split(',') if v]:
+            print(f"🧪 SMTP delay {delay:.0f}ms")
+            results.append(run_scenario(sink, applicant, approver, delay, args.count))
+    finally:
+        sink.stop()
+
+    print_results(results)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'results': results, 'total_messages': len(sink.messages), 'warmup': warm}, f, ensure_ascii=False, indent=2)
+    print(f"\n📁 Results saved to {args.output}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+"""
+New Relic エージェントのオーバーヘッド計測
+
+docker-compose.yml（エージェントなし）と docker-compose.newrelic.yml（エージェントあり）を交互に起動し、
+毎回 DB を初期化したうえで同じシードのシナリオ（ログイン・ダッシュボード・作成・提出・全件承認）を実行する。
+ラウンドを単位にルートごとの平均応答時間と、ラウンド全体のスループット（成功したリクエスト数 / 経過時間）を比べ、
+差の 95% 信頼区間を出す。--clients で同じシナリオを複数のクライアントから同時に流すと、
+1件ずつ順に送る場合（スループットはほぼ応答時間の逆数になる）ではなく、並列時の処理能力の差を測れる。
+エージェントは docker-compose.nrbench.yml でローカルのダミーコレクターに接続させるため、実アカウントは不要。
+
+2つのスタックはポート（8080, 3307）が重なるので、ラウンドごとに片方を停止してから起動する。
+
+シードは harness.seeding で決まり（--seed / HARNESS_SEED / 新規生成）、全ラウンドで同じ値を使う。
+
+python -m harness.bench_newrelic --rounds 3 --iterations 20 --seed 42
+python -m harness.bench_newrelic --rounds 3 --iterations 20 --clients 8
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .bench_notifications import DEFAULT_APPLICANT, DEFAULT_APPROVER
+from .http_client import AppClient, HttpError
+from .ready import check_app, check_db, wait_until_ready
+from .stats import confidence_interval, diff_interval, summarize
+from . import seeding, warmup
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CERT_DIR = os.path.join(ROOT, '.harness_state', 'nr_collector')
+
+STACKS = {
+    'baseline': {
+        'files': ['docker-compose.yml'],
+        'app_container': 'approval-workflow-app',
+    },
+    'newrelic': {
+        'files': ['docker-compose.newrelic.yml', 'docker-compose.nrbench.yml'],
+        'app_container': 'approval-workflow-app-newrelic',
+    },
+}
+ROUTES = ('login', 'dashboard', 'create', 'submit', 'approve-all')
+
+# 同じ組織の申請者と承認者（DatabaseSeeder のユーザー、承認者のいない組織 3 を除く）。
+# 全件承認は承認者の組織の申請をすべて承認するため、--clients では組織ごとに別のクライアントを割り当てる
+CLIENT_USERS = [
+    (DEFAULT_APPLICANT, DEFAULT_APPROVER),
+    ('saito.kazuaki@wf.nrkk.technology', 'kimura.tomoko@wf.nrkk.technology'),
+    ('ishikawa.yuki@wf.nrkk.technology', 'sato.taro@wf.nrkk.technology'),
+    ('ueda.takuya@wf.nrkk.technology', 'suzuki.hanako@wf.nrkk.technology'),
+    ('egawa.mai@wf.nrkk.technology', 'takahashi.ichiro@wf.nrkk.technology'),
+    ('ono.yuichi@wf.nrkk.technology', 'tanaka.miki@wf.nrkk.technology'),
+    ('okada.saori@wf.nrkk.technology', 'ito.kenta@wf.nrkk.technology'),
+    ('katayama.kenji@wf.nrkk.technology', 'watanabe.yumi@wf.nrkk.technology'),
+    ('kawaguchi.miho@wf.nrkk.technology', 'yamamoto.naoki@wf.nrkk.technology'),
+]
+TYPES = ('leave', 'expense', 'purchase', 'other')
+PRIORITIES = ('low', 'medium', 'high')
+
+
+def ensure_certificate(directory=CERT_DIR):
+    """ダミーコレクター用の自己署名証明書（CN/SAN は nr-collector）を用意"""
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    if os.path.exists(cert) and os.path.exists(key):
+        return cert
+    os.makedirs(directory, exist_ok=True)
+    subprocess.run([
+        'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '30',
+        '-keyout', key, '-out', cert,
+        '-subj', '/CN=nr-collector', '-addext', 'subjectAltName=DNS:nr-collector',
+    ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # コンテナ内の別ユーザーからも読めるようにする
+    os.chmod(key, 0o644)
+    print(f"🔐 Generated collector certificate in {directory}")
+    return cert
+
+
+def compose(stack, *args):
+    command = [os.getenv("HARNESS_COMPOSE", "docker-compose")]
+    for path in STACKS[stack]['files']:
+        command += ['-f', path]
+    subprocess.run(command + list(args), cwd=ROOT, check=True)
+
+
+def wait_for_app(base_url, timeout=180):
+    """ログイン画面がフォームを返し、DB が応答するまで待つ"""
+    failed = wait_until_ready({'app': lambda: check_app(base_url), 'db': check_db}, timeout=timeout)
+    if failed:
+        raise SystemExit(f"❌ Application did not become ready within {timeout}s: {failed}")
+
+
+def switch_to(stack, base_url, build=False):
+    """もう一方のスタックを止めて起動し、DB を初期データに戻す"""
+    for other in STACKS:
+        if other != stack:
+            compose(other, 'down')
+    compose(stack, 'up', '-d', *(['--build'] if build else []))
+    wait_for_app(base_url)
+    subprocess.run(['docker', 'exec', STACKS[stack]['app_container'],
+                    'php', 'artisan', 'migrate:fresh', '--seed', '--force'],
+                   check=True, stdout=subprocess.DEVNULL)
+    wait_for_app(base_url)
+
+
+def timed(samples, route, action):
+    """1回の操作の所要時間（ms）を記録する"""
+    started = time.perf_counter()
+    try:
+        result = action()
+    except HttpError as e:
+        samples.setdefault('errors', []).append({'route': route, 'error': str(e)})
+        return None
+    samples.setdefault(route, []).append((time.perf_counter() - started) * 1000)
+    return result
+
+
+def run_scenario(base_url, seed, iterations, batch, applicant_email, approver_email, client=0):
+    """シードから決まる同じ操作列を実行し、ルートごとの所要時間を返す"""
+    # クライアントごとにシードから派生させた別の操作列を使う（どのラウンドでも同じ）
+    rng = seeding.derive('bench_newrelic', client)
+    samples = {}
+    started = time.perf_counter()
+
+    for i in range(iterations):
+        applicant = AppClient(base_url)
+        if not timed(samples, 'login', lambda: applicant.login(applicant_email)):
+            raise SystemExit(f"❌ Login failed for {applicant_email}")
+        timed(samples, 'dashboard', lambda: applicant.get('/dashboard'))
+        type_ = rng.choice(TYPES)
+        amount = rng.randint(1, 50) * 1000 if type_ in ('expense', 'purchase') else None
+        application_id = timed(samples, 'create', lambda: applicant.create_application(
+            f"NR計測_{seed}_{client}_{i}", type_=type_, priority=rng.choice(PRIORITIES), amount=amount))
+        if application_id:
+            timed(samples, 'submit', lambda: applicant.submit_application(application_id))
+
+        if (i + 1) % batch == 0 or i == iterations - 1:
+            approver = AppClient(base_url)
+            if not timed(samples, 'login', lambda: approver.login(approver_email)):
+                raise SystemExit(f"❌ Login failed for {approver_email}")
+            timed(samples, 'dashboard', lambda: approver.get('/dashboard'))
+            timed(samples, 'approve-all', lambda: approver.approve_all(comment=f"NR計測 {seed}"))
+
+    samples['wall_seconds'] = time.perf_counter() - started
+    return samples
+
+
+def client_users(applicant_email, approver_email, clients):
+    """クライアントごとの (申請者, 承認者)。最初のクライアントは指定されたユーザーで、残りは別の組織のユーザー"""
+    pairs = [(applicant_email, approver_email)]
+    pairs += [pair for pair in CLIENT_USERS if applicant_email not in pair and approver_email not in pair]
+    if clients > len(pairs):
+        raise SystemExit(f"❌ --clients {clients}: only {len(pairs)} applicant/approver pairs in separate organizations")
+    return pairs[:clients]
+
+
+def run_round(base_url, seed, iterations, batch, applicant_email, approver_email, clients=1):
+    """clients 個のシナリオを同時に実行し、所要時間をまとめる（wall_seconds は全体の経過時間）
+
+    あるクライアントの全件承認が他のクライアントの申請を承認しないよう、クライアントごとに別の組織のユーザーを使う。
+    """
+    users = client_users(applicant_email, approver_email, clients)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        futures = [executor.submit(run_scenario, base_url, seed, iterations, batch,
+                                   applicant, approver, client)
+                   for client, (applicant, approver) in enumerate(users)]
+        results = [f.result() for f in futures]
+    merged = {'clients': clients}
+    for result in results:
+        for key, values in result.items():
+            if isinstance(values, list):
+                merged.setdefault(key, []).extend(values)
+    merged['wall_seconds'] = time.perf_counter() - started
+    return merged
+
+
+def round_throughput(samples):
+    """ラウンド全体で成功したリクエスト数 / 経過時間（失敗したリクエストは数えない）"""
+    completed = sum(len(samples.get(route, [])) for route in ROUTES)
+    wall = samples.get('wall_seconds')
+    return completed / wall if wall else None
+
+
+def round_order(rounds):
+    """ABBA の順で交互に実行し、時間とともに変わる要因を両方に均等に割り振る"""
+    order = []
+    for i in range(rounds):
+        pair = ['baseline', 'newrelic'] if i % 2 == 0 else ['newrelic', 'baseline']
+        order.extend(pair)
+    return order
+
+
+def compare(rounds):
+    """ラウンドごとの平均を単位にして、ルートごとの差と信頼区間を出す"""
+    report = {}
+    for route in ROUTES:
+        per_stack = {}
+        for stack in STACKS:
+            runs = [r['samples'].get(route, []) for r in rounds if r['stack'] == stack]
+            latency = [sum(v) / len(v) for v in runs if v]
+            per_stack[stack] = {
+                'latency_ms': latency,
+                'all_ms': [x for v in runs for x in v],
+            }
+
+        base, agent = per_stack['baseline'], per_stack['newrelic']
+        diff, low, high = diff_interval(base['latency_ms'], agent['latency_ms'])
+        base_mean = confidence_interval(base['latency_ms'])[0]
+        report[route] = {
+            'baseline': {'latency_ci': confidence_interval(base['latency_ms']),
+                         'summary': summarize(base['all_ms'])},
+            'newrelic': {'latency_ci': confidence_interval(agent['latency_ms']),
+                         'summary': summarize(agent['all_ms'])},
+            'latency_diff_ms': {'mean': diff, 'low': low, 'high': high},
+            'latency_overhead_pct': diff / base_mean * 100 if diff is not None and base_mean else None,
+        }
+    return report
+
+
+def compare_throughput(rounds):
+    """ラウンドごとのスループット（req/s）を単位にした差と信頼区間"""
+    per_stack = {stack: [t for t in (round_throughput(r['samples']) for r in rounds if r['stack'] == stack)
+                         if t is not None]
+                 for stack in STACKS}
+    diff, low, high = diff_interval(per_stack['baseline'], per_stack['newrelic'])
+    base_mean = confidence_interval(per_stack['baseline'])[0]
+    return {
+        'clients': rounds[0]['samples'].get('clients', 1) if rounds else None,
+        'baseline': {'rounds_rps': per_stack['baseline'], 'ci': confidence_interval(per_stack['baseline'])},
+        'newrelic': {'rounds_rps': per_stack['newrelic'], 'ci': confidence_interval(per_stack['newrelic'])},
+        'diff_rps': {'mean': diff, 'low': low, 'high': high},
+        'diff_pct': diff / base_mean * 100 if diff is not None and base_mean else None,
+    }
+
+
+def _fmt(value, spec='.1f'):
+    return format(value, spec) if value is not None else '-'
+
+
+def print_report(report, throughput=None):
+    print("\n📊 New Relic agent overhead (newrelic - baseline, 95% CI over rounds)")
+    print(f"   {'route':<13}{'base ms':>9}{'agent ms':>10}{'diff ms':>9}{'95% CI':>20}{'overhead':>10}")
+    for route, r in report.items():
+        d = r['latency_diff_ms']
+        ci = f"[{_fmt(d['low'])}, {_fmt(d['high'])}]"
+        overhead = f"{r['latency_overhead_pct']:+.1f}%" if r['latency_overhead_pct'] is not None else '-'
+        print(f"   {route:<13}{_fmt(r['baseline']['latency_ci'][0]):>9}{_fmt(r['newrelic']['latency_ci'][0]):>10}"
+              f"{_fmt(d['mean']):>9}{ci:>20}{overhead:>10}")
+    if throughput:
+        d = throughput['diff_rps']
+        pct = f"{throughput['diff_pct']:+.1f}%" if throughput['diff_pct'] is not None else '-'
+        print(f"   throughput ({throughput['clients']} client(s)): {_fmt(throughput['baseline']['ci'][0], '.2f')} → "
+              f"{_fmt(throughput['newrelic']['ci'][0], '.2f')} req/s, diff {_fmt(d['mean'], '+.2f')} "
+              f"[{_fmt(d['low'], '.2f')}, {_fmt(d['high'], '.2f')}] ({pct})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="New Relic エージェントのオーバーヘッド計測")
+    parser.add_argument('--base-url', default=None)
+    parser.add_argument('--applicant', default=DEFAULT_APPLICANT)
+    parser.add_argument('--approver', default=DEFAULT_APPROVER)
+    parser.add_argument('--rounds', type=int, default=3, help="各スタックの実行回数")
+    parser.add_argument('--iterations', type=int, default=20, help="1ラウンドあたりの申請数")
+    parser.add_argument('--batch', type=int, default=5, help="全件承認を行う間隔（申請数）")
+    parser.add_argument('--clients', type=int, default=1,
+                        help=f"同時に実行するシナリオの数（スループットの計測用、組織ごとに最大 {len(CLIENT_USERS)}）")
+    seeding.add_argument(parser)
+    parser.add_argument('--no-build', action='store_true', help="初回の --build を省略する")
+    parser.add_argument('--output', default='newrelic_overhead.json')
+    warmup.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    base_url = args.base_url or AppClient().base_url
+    seed = seeding.init(args.seed)
+    # ユーザーが足りなければスタックを起動する前に止める
+    client_users(args.applicant, args.approver, max(1, args.clients))
+    ensure_certificate()
+
+    rounds = []
+    built = set()
+    for index, stack in enumerate(round_order(args.rounds), 1):
+        print(f"🧪 Round {index}: {stack}")
+        switch_to(stack, base_url, build=not args.no_build and stack not in built)
+        built.add(stack)
+        # 再起動と DB 初期化のたびにキャッシュが冷えるので、ラウンドごとに温めてから計測する
+        warm = warmup.run_from_args(args, base_url)
+        samples = run_round(base_url, seed, args.iterations, args.batch, args.applicant, args.approver,
+                            max(1, args.clients))
+        rounds.append({'round': index, 'stack': stack, 'warmup': warm, 'samples': samples})
+
+    report = compare(rounds)
+    throughput = compare_throughput(rounds)
+    print_report(report, throughput)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'seed': seed, 'iterations': args.iterations, 'clients': args.clients, 'rounds': rounds,
+                   'routes': report, 'throughput': throughput},
+                  f, ensure_ascii=False, indent=2)
+    print(f"\n📁 Results saved to {args.output}")
+    return report
+
+
+if __name__ == '__main__':
+    main()
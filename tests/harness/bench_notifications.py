@@ -0,0 +1,128 @@
+"""
+Slack 通知コストのベンチマーク
+
+承認者・申請者の Slack Webhook URL をローカルの WebhookSink に向け、
+Webhook の応答遅延を変えながら「個別承認」と「一括承認」の応答時間を測定する。
+Webhook 未設定（baseline）との差が、同期的な通知配信が承認処理に上乗せしている時間になる。
+
+アプリ（コンテナ）から到達できるホスト名を --sink-host に指定すること。
+
+python -m harness.bench_notifications --latencies 0,200,1000 --count 5
+"""
+
+import argparse
+import json
+import time
+
+from .http_client import AppClient
+from .stats import summarize
+from .webhook_sink import WebhookSink
+from . import seeding, warmup
+
+DEFAULT_APPLICANT = 'hoshino.kazuko@wf.nrkk.technology'
+DEFAULT_APPROVER = 'nakamura.keiko@wf.nrkk.technology'
+
+
+def prepare_pending(applicant, approver, count, label):
+    """申請を作成・提出し、承認者の承認待ちに新しく増えた承認IDを返す"""
+    before = set(approver.pending_approval_ids())
+    for i in range(count):
+        application_id = applicant.create_application(f"通知ベンチ_{label}_{i}_{int(time.time())}")
+        applicant.submit_application(application_id)
+    return [i for i in approver.pending_approval_ids() if i not in before]
+
+
+def run_scenario(sink, applicant, approver, label, latency_ms, configured, count):
+    """1つの設定（遅延・Webhook 有無）で個別承認と一括承認を測定"""
+    sink.latency_ms = latency_ms
+    for key, client in (('applicant', applicant), ('approver', approver)):
+        client.set_slack_webhook(sink.url_for(key) if configured else None)
+
+    # 個別承認
+    single = []
+    webhooks_single = []
+    for approval_id in prepare_pending(applicant, approver, count, f"{label}_single"):
+        started = time.time()
+        approver.approve(approval_id, comment=f"通知ベンチ {label}")
+        ended = time.time()
+        single.append((ended - started) * 1000)
+        webhooks_single.append(len(sink.between(started, ended)))
+
+    # 一括承認
+    ids = prepare_pending(applicant, approver, count, f"{label}_bulk")
+    started = time.time()
+    if ids:
+        approver.bulk_approve(ids, comment=f"通知ベンチ一括 {label}")
+    ended = time.time()
+    bulk_ms = (ended - started) * 1000
+
+    return {
+        'label': label,
+        'webhook_configured': configured,
+        'sink_latency_ms': latency_ms,
+        'approve_ms': summarize(single),
+        'webhooks_per_approve': sum(webhooks_single) / len(webhooks_single) if webhooks_single else 0,
+        'bulk_items': len(ids),
+        'bulk_approve_ms': bulk_ms,
+        'webhooks_during_bulk': len(sink.between(started, ended)),
+    }
+
+
+def print_results(results):
+    print("\n📊 Notification cost on the approval path")
+    print(f"   {'scenario':<16}{'approve p50':>13}{'approve p95':>13}{'hooks/req':>11}{'bulk ms':>11}{'bulk hooks':>12}")
+    for r in results:
+        a = r['approve_ms']
+        p50 = f"{a['p50']:.0f}" if a['p50'] is not None else '-'
+        p95 = f"{a['p95']:.0f}" if a['p95'] is not None else '-'
+        print(f"   {r['label']:<16}{p50:>13}{p95:>13}{r['webhooks_per_approve']:>11.1f}"
+              f"{r['bulk_approve_ms']:>11.0f}{r['webhooks_during_bulk']:>12}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Slack 通知コストのベンチマーク")
+    parser.add_argument('--base-url', default=None)
+    parser.add_argument('--applicant', default=DEFAULT_APPLICANT)
+    parser.add_argument('--approver', default=DEFAULT_APPROVER)
+    parser.add_argument('--sink-host', default='host.docker.internal', help="アプリから見たシンクのホスト名")
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--latencies', default='0,200,1000', help="Webhook 応答遅延（ms, カンマ区切り）")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--count', type=int, default=5, help="シナリオごとの申請数")
+    parser.add_argument('--output', default='notification_bench.json')
+    warmup.add_arguments(parser)
+    seeding.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    seed = seeding.init(args.seed)
+    warm = warmup.run_from_args(args, args.base_url)
+    sink = WebhookSink(port=args.port, public_host=args.sink_host, error_rate=args.error_rate,
+                       seed=seeding.derive_seed('webhook_sink')).start()
+    applicant = AppClient(args.base_url)
+    approver = AppClient(args.base_url)
+    if not applicant.login(args.applicant) or not approver.login(args.approver):
+        sink.stop()
+        raise SystemExit("❌ Login failed for applicant or approver")
+
+    results = []
+    try:
+        print("🧪 Baseline (webhook not configured)")
+        results.append(run_scenario(sink, applicant, approver, 'baseline', 0, False, args.count))
+        for latency in [float(v) for v in args.latencies.split(',') if v]:
+            print(f"🧪 Webhook latency {latency:.0f}ms")
+            results.append(run_scenario(sink, applicant, approver, f"hook_{latency:.0f}ms", latency, True, args.count))
+    finally:
+        # 後続のテストに影響しないよう Webhook 設定を外す
+        for client in (applicant, approver):
+            client.set_slack_webhook(None)
+        sink.stop()
+
+    print_results(results)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'seed': seed, 'results': results, 'sink': sink.summary(), 'warmup': warm}, f, ensure_ascii=False, indent=2)
+    print(f"\n📁 Results saved to {args.output}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+事前に温めたブラウザプロファイルと共有ディスクキャッシュ（オプトイン）
+
+chromedriver が起動する Chrome は毎回空のプロファイルで始まり、初回起動の初期化を行い、
+CDN のアセットをすべてダウンロードし直す。
+
+HARNESS_BROWSER_PROFILE=template      アセットをキャッシュ済み・初回起動済みのテンプレートを
+                                      ブラウザごとの一時ディレクトリに複製して使う（並列でも安全）
+HARNESS_BROWSER_PROFILE=shared-cache  プロファイルは新規のまま、ディスクキャッシュだけ共有ディレクトリを使う
+                                      （Chrome のキャッシュは複数プロセスでの同時使用を想定していないため、
+                                      ブラウザを1台ずつ使うスクリプト向け）
+
+テンプレートとキャッシュは HARNESS_PROFILE_DIR（既定 .harness_state/chrome_profile）に置く。
+テンプレートがなければ最初に使うときに作る（APP_URL の /login を1回開いて閉じる）。
+複製したプロファイルは、ブラウザを quit_driver(driver) で閉じたときに削除する
+（ユーザーごとにブラウザを開くスクリプトで /tmp に溜まらないように。残った分は終了時に削除）。
+
+python -m harness.browser_profile build     テンプレートを作り直す
+python -m harness.browser_profile bench     cold / template / shared-cache の起動時間と最初のページ読み込みを比較
+"""
+
+import argparse
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from .checkpoint import DEFAULT_STATE_DIR
+from .stats import summarize
+
+DEFAULT_DIR = os.path.join(DEFAULT_STATE_DIR, 'chrome_profile')
+MODES = ('template', 'shared-cache')
+FIRST_RUN_FLAGS = ['--no-first-run', '--no-default-browser-check']
+# 複製しないもの（起動中のロックやクラッシュレポート）
+_IGNORE = shutil.ignore_patterns('Singleton*', 'lockfile', 'Crashpad', 'Crash Reports', '*.tmp')
+_BASE_OPTIONS = ['--headless=new', '--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu',
+                 '--window-size=1920,1080']
+
+_sessions = []
+_lock = threading.Lock()
+
+
+def mode():
+    value = os.getenv("HARNESS_BROWSER_PROFILE", "").strip()
+    if value and value not in MODES:
+        raise ValueError(f"Unknown HARNESS_BROWSER_PROFILE: {value} (use {' / '.join(MODES)})")
+    return value or None
+
+
+def profile_dir():
+    return os.getenv("HARNESS_PROFILE_DIR", DEFAULT_DIR)
+
+
+def template_dir():
+    return os.path.join(profile_dir(), 'template')
+
+
+def cache_dir():
+    return os.path.join(profile_dir(), 'cache')
+
+
+def _base_url():
+    return os.getenv("APP_URL", "http://localhost:8080")
+
+
+def _new_driver(chrome_options):
+    from selenium import webdriver
+
+    from .driver import chrome_service
+
+    return webdriver.Chrome(service=chrome_service(), options=chrome_options)
+
+
+def _options(*arguments):
+    from selenium import webdriver
+
+    chrome_options = webdriver.ChromeOptions()
+    for argument in _BASE_OPTIONS + list(arguments):
+        chrome_options.add_argument(argument)
+    return chrome_options
+
+
+def build_template(base_url=None, path=None):
+    """/login を1回開いて閉じたプロファイルをテンプレートとして保存"""
+    path = path or template_dir()
+    base_url = base_url or _base_url()
+    staging = f"{path}.building"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    print(f"🧰 Building browser profile template from {base_url}/login ...")
+    driver = _new_driver(_options(f'--user-data-dir={os.path.abspath(staging)}', *FIRST_RUN_FLAGS))
+    try:
+        driver.get(f"{base_url}/login")
+        time.sleep(1)
+    finally:
+        driver.quit()
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(staging, path)
+    print(f"🧰 Browser profile template saved to {path}")
+    return path
+
+
+def clone_template():
+    """テンプレートを一時ディレクトリに複製して返す（remove か quit_driver で削除）"""
+    template = template_dir()
+    with _lock:
+        if not os.path.isdir(template):
+            build_template()
+    session = os.path.realpath(tempfile.mkdtemp(prefix='chrome-profile-'))
+    shutil.copytree(template, session, ignore=_IGNORE, dirs_exist_ok=True)
+    with _lock:
+        _sessions.append(session)
+    return session
+
+
+def remove(session):
+    """clone_template で作ったプロファイルを削除する（ブラウザを閉じた後に呼ぶ）。それ以外のパスは消さない"""
+    session = os.path.realpath(session)
+    with _lock:
+        if session not in _sessions:
+            return False
+        _sessions.remove(session)
+    shutil.rmtree(session, ignore_errors=True)
+    return True
+
+
+def quit_driver(driver):
+    """ドライバーを終了し、テンプレートから複製したプロファイルで起動していればそれも削除する"""
+    try:
+        # chromedriver は起動に使った --user-data-dir を capabilities に返す
+        session = (driver.capabilities.get('chrome') or {}).get('userDataDir')
+    except Exception:
+        session = None
+    try:
+        driver.quit()
+    finally:
+        if session:
+            remove(session)
+
+
+def _cleanup():
+    with _lock:
+        sessions, _sessions[:] = list(_sessions), []
+    for session in sessions:
+        shutil.rmtree(session, ignore_errors=True)
+
+
+atexit.register(_cleanup)
+
+
+def apply(chrome_options, selected=None):
+    """ChromeOptions にプロファイルの設定を加える（HARNESS_BROWSER_PROFILE 未指定なら何もしない）"""
+    selected = selected if selected is not None else mode()
+    if selected == 'template':
+        started = time.perf_counter()
+        session = clone_template()
+        chrome_options.add_argument(f'--user-data-dir={session}')
+        print(f"    ✓ Browser profile cloned from template ({(time.perf_counter() - started) * 1000:.0f} ms)")
+    elif selected == 'shared-cache':
+        os.makedirs(cache_dir(), exist_ok=True)
+        chrome_options.add_argument(f'--disk-cache-dir={os.path.abspath(cache_dir())}')
+    if selected:
+        for flag in FIRST_RUN_FLAGS:
+            chrome_options.add_argument(flag)
+    return chrome_options
+
+
+def measure(chrome_options, url):
+    """Chrome の起動時間と最初のページ読み込み時間を1回計測"""
+    started = time.perf_counter()
+    driver = _new_driver(chrome_options)
+    startup = time.perf_counter() - started
+    try:
+        started = time.perf_counter()
+        driver.get(url)
+        navigation = time.perf_counter() - started
+        timing = driver.execute_script(
+            "const n = performance.getEntriesByType('navigation')[0];"
+            "return {load: n ? n.loadEventEnd : null,"
+            " transferred: performance.getEntriesByType('resource').reduce((a, r) => a + (r.transferSize || 0), 0)};")
+    finally:
+        quit_driver(driver)
+    return {
+        'startup_s': startup,
+        'first_navigation_s': navigation,
+        'load_event_ms': timing.get('load'),
+        'resource_bytes': timing.get('transferred'),
+    }
+
+
+def bench(runs=3, base_url=None):
+    """cold（空のプロファイル）・template・shared-cache を交互に計測"""
+    base_url = base_url or _base_url()
+    url = f"{base_url}/login"
+    if not os.path.isdir(template_dir()):
+        build_template(base_url)
+    # shared-cache は1回温めてから計測する
+    measure(apply(_options(), 'shared-cache'), url)
+    samples = {name: [] for name in ('cold', 'template', 'shared-cache')}
+    for index in range(runs):
+        for name in samples:
+            options = _options() if name == 'cold' else apply(_options(), name)
+            samples[name].append(measure(options, url))
+            print(f"   run {index + 1} {name:<13} startup {samples[name][-1]['startup_s']:.2f}s  "
+                  f"first page {samples[name][-1]['first_navigation_s']:.2f}s")
+    return samples
+
+
+def print_bench(samples):
+    print("\n🧰 Browser profile: cold vs warm (p50 of runs)")
+    print(f"   {'profile':<15}{'startup s':>11}{'first page s':>14}{'load ms':>10}{'downloaded KB':>15}")
+    for name, runs in samples.items():
+        s = {key: summarize([r[key] for r in runs if r[key] is not None])['p50']
+             for key in ('startup_s', 'first_navigation_s', 'load_event_ms', 'resource_bytes')}
+        print(f"   {name:<15}{s['startup_s']:>11.2f}{s['first_navigation_s']:>14.2f}"
+              f"{(s['load_event_ms'] or 0):>10.0f}{(s['resource_bytes'] or 0) / 1024:>15.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="事前に温めたブラウザプロファイル")
+    parser.add_argument('command', choices=['build', 'bench'])
+    parser.add_argument('--base-url', default=None)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--output', default='browser_profile_bench.json')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        build_template(args.base_url)
+        return
+    samples = bench(args.runs, args.base_url)
+    print_bench(samples)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(samples, f, ensure_ascii=False, indent=2)
+    print(f"📁 Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
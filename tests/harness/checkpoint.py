@@ -0,0 +1,85 @@
+"""
+チェックポイント管理
+
+長時間のシナリオ実行中にブラウザがクラッシュしても途中から再開できるよう、
+完了したユーザー・作成した申請ID・承認結果をローカルの状態ファイルに保存する。
+再実行時に --resume を指定すると、完了済みの単位をスキップして続きから実行する。
+"""
+
+import json
+import os
+import time
+
+# 状態ファイルの保存先（K8s Job のリトライでも残るよう、永続ボリュームを指定できる）
+DEFAULT_STATE_DIR = os.getenv("HARNESS_STATE_DIR", ".harness_state")
+
+
+class Checkpoint:
+    """シナリオ単位の進捗を状態ファイルに保存・復元する"""
+
+    def __init__(self, name, path=None, resume=False):
+        self.name = name
+        self.path = path or os.path.join(DEFAULT_STATE_DIR, f"{name}.json")
+        self.resumed = False
+        self.state = {
+            'name': name,
+            'started_at': time.time(),
+            'updated_at': None,
+            'completed': {},
+            'created_ids': [],
+            'data': {},
+        }
+
+        if resume and os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                self.state.update(json.load(f))
+            self.resumed = True
+            print(f"♻️ Resuming from checkpoint: {self.path} "
+                  f"({len(self.state['completed'])} units completed)")
+
+    def is_done(self, unit):
+        """指定した単位が完了済みかどうか"""
+        return unit in self.state['completed']
+
+    def outcome(self, unit):
+        """完了済み単位の結果を取得"""
+        return self.state['completed'].get(unit)
+
+    def mark_done(self, unit, outcome=None):
+        """単位の完了を記録して即座に保存"""
+        self.state['completed'][unit] = outcome
+        self.save()
+
+    def add_created(self, record):
+        """作成した申請などの記録を追加して即座に保存"""
+        self.state['created_ids'].append(record)
+        self.save()
+
+    @property
+    def created(self):
+        return list(self.state['created_ids'])
+
+    def get(self, key, default=None):
+        """任意の補助データを取得（ユーザーごとの作成予定件数など）"""
+        return self.state['data'].get(key, default)
+
+    def set(self, key, value):
+        """任意の補助データを保存"""
+        self.state['data'][key] = value
+        self.save()
+
+    def save(self):
+        """一時ファイル経由で書き込み、途中で落ちても状態ファイルを壊さない"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.state['updated_at'] = time.time()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """シナリオ完了後に状態ファイルを削除"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,214 @@
+"""
+MariaDB ステータスカウンターのサンプリング
+
+ステップの開始・終了時に SHOW GLOBAL STATUS を取得し、差分（クエリ数・読み取り行数・ディスク一時テーブルなど）を
+各ステップに添付する。フェーズ（approve_all, selective_approve など）ごとに集計し、
+1承認あたりのクエリ数・行数をリリースをまたいで追跡できるよう履歴ファイルに追記する。
+
+HARNESS_DB_STATUS=1 で有効化（接続先は docker-compose の database サービス、ポート 3307）。
+
+サンプラー自身の SHOW GLOBAL STATUS もグローバルカウンターを増やすため、接続時に1回あたりの増分を測っておき、
+区間内で実行した回数分を差し引く。ハーネスの接続から流した他のクエリ（query_log の目印など）も
+note_own_query で申告された分を差し引く。ハーネスの接続の CONNECTION_ID() は own_thread_ids() で参照でき、
+ログの集計ではアプリのクエリから除く。
+"""
+
+import collections
+import json
+import os
+import subprocess
+import threading
+import time
+
+# 差分を取るカウンター（前方一致）
+COUNTER_PREFIXES = (
+    'Questions',
+    'Com_select', 'Com_insert', 'Com_update', 'Com_delete',
+    'Handler_read_',
+    'Innodb_rows_',
+    'Created_tmp_tables', 'Created_tmp_disk_tables',
+)
+
+# ハーネスの接続の CONNECTION_ID() と、それらの接続から流したクエリによるカウンターの増分
+_own_threads = set()
+_own_counters = collections.Counter()
+_own_lock = threading.Lock()
+
+
+def is_enabled():
+    return os.getenv("HARNESS_DB_STATUS", "0").lower() in ("1", "true", "yes")
+
+
+def connect_from_env():
+    """環境変数の接続情報で MariaDB に接続（PyMySQL が必要）"""
+    import pymysql
+
+    connection = pymysql.connect(
+        host=os.getenv("HARNESS_DB_HOST", "127.0.0.1"),
+        port=int(os.getenv("HARNESS_DB_PORT", "3307")),
+        user=os.getenv("HARNESS_DB_USER", "root"),
+        password=os.getenv("HARNESS_DB_PASSWORD", "rootpassword"),
+        database=os.getenv("HARNESS_DB_NAME", "approval_workflow"),
+        autocommit=True,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT CONNECTION_ID()")
+        thread_id = cursor.fetchall()[0][0]
+    with _own_lock:
+        _own_threads.add(thread_id)
+    return connection
+
+
+def own_thread_ids():
+    """ハーネスが開いた接続の CONNECTION_ID()（ログのアプリのクエリから除く）"""
+    with _own_lock:
+        return set(_own_threads)
+
+
+def note_own_query(counters):
+    """ハーネスの接続から流したクエリによるカウンターの増分を申告する（サンプラーが差し引く）"""
+    with _own_lock:
+        _own_counters.update(counters)
+
+
+def _own_counters_now():
+    with _own_lock:
+        return dict(_own_counters)
+
+
+def release_label():
+    """結果を紐付けるリリース（COMMIT_SHA か git のコミット）"""
+    label = os.getenv("COMMIT_SHA")
+    if label:
+        return label
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+class DbStatusSampler:
+    """ステップ境界で SHOW GLOBAL STATUS を取得して差分を添付するリスナー"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._snapshots = {}
+        self._taken = 0
+        # SHOW GLOBAL STATUS 1回あたりのカウンターの増分（calibrate で測り直す）
+        self.overhead = {'Questions': 1}
+
+    @classmethod
+    def from_env(cls):
+        sampler = cls(connect_from_env())
+        sampler.calibrate()
+        return sampler
+
+    def calibrate(self, samples=3):
+        """続けて取得したスナップショットの差分の最小値を、1回あたりの自身の増分とする"""
+        snapshots = [self.snapshot() for _ in range(samples + 1)]
+        deltas = [{name: b[name] - a.get(name, 0) for name in b} for a, b in zip(snapshots, snapshots[1:])]
+        self.overhead = {name: min(d.get(name, 0) for d in deltas) for name in deltas[0]}
+        self.overhead = {name: value for name, value in self.overhead.items() if value > 0}
+        return self.overhead
+
+    def snapshot(self):
+        self._taken += 1
+        with self.connection.cursor() as cursor:
+            cursor.execute("SHOW GLOBAL STATUS")
+            rows = cursor.fetchall()
+        return {
+            name: int(value) for name, value in rows
+            if name.startswith(COUNTER_PREFIXES) and str(value).isdigit()
+        }
+
+    def on_step_start(self, step):
+        self._snapshots[id(step)] = (self.snapshot(), self._taken, _own_counters_now())
+
+    def on_step_end(self, step):
+        started = self._snapshots.pop(id(step), None)
+        if started is None:
+            return
+        before, taken_before, own_before = started
+        own_after = _own_counters_now()
+        after = self.snapshot()
+        delta = {name: after[name] - before.get(name, 0) for name in after}
+        # 区間内で実行したサンプラー自身の SHOW GLOBAL STATUS（入れ子のステップ分も含む）と、
+        # ハーネスの他の接続から流したクエリの分を除く
+        taken = self._taken - taken_before
+        for name in delta:
+            own = self.overhead.get(name, 0) * taken + own_after.get(name, 0) - own_before.get(name, 0)
+            delta[name] = max(delta[name] - own, 0)
+        step.data['db'] = {k: v for k, v in delta.items() if v}
+
+    def close(self):
+        self.connection.close()
+
+
+def attach(recorder):
+    """HARNESS_DB_STATUS=1 のときサンプラーをレコーダーに接続（接続できなければ無効のまま続行）"""
+    if not is_enabled():
+        return None
+    try:
+        sampler = DbStatusSampler.from_env()
+    except Exception as e:
+        print(f"⚠️ DB status sampling disabled: {e}")
+        return None
+    recorder.add_listener(sampler)
+    print("📈 DB status sampling enabled")
+    return sampler
+
+
+def finish(sampler, recorder):
+    """サンプラーを切り離し、フェーズごとの集計を表示・保存"""
+    if sampler is None:
+        return None
+    recorder.remove_listener(sampler)
+    sampler.close()
+    report = phase_report(recorder.steps)
+    print_report(report)
+    save_report(report, meta=recorder.meta)
+    return report
+
+
+def phase_report(steps):
+    """最上位ステップ（フェーズ）ごとにカウンター差分を集計し、1件あたりの値も出す"""
+    phases = collections.OrderedDict()
+    for step in steps:
+        if step.parent is not None or step.warmup or 'db' not in step.data:
+            continue
+        phase = phases.setdefault(step.name, {'steps': 0, 'items': 0, 'totals': collections.Counter()})
+        phase['steps'] += 1
+        phase['items'] += step.attrs.get('items', 1) or 0
+        phase['totals'].update(step.data['db'])
+
+    report = {}
+    for name, phase in phases.items():
+        items = phase['items'] or 1
+        report[name] = {
+            'steps': phase['steps'],
+            'items': phase['items'],
+            'totals': dict(phase['totals']),
+            'per_item': {k: round(v / items, 2) for k, v in phase['totals'].items()},
+        }
+    return report
+
+
+def print_report(report):
+    print("\n📊 Database work by phase")
+    print(f"   {'phase':<22}{'items':>7}{'queries/item':>14}{'rows read/item':>16}{'tmp disk':>10}")
+    for name, r in report.items():
+        per_item = r['per_item']
+        print(f"   {name:<22}{r['items']:>7}{per_item.get('Questions', 0):>14}"
+              f"{per_item.get('Innodb_rows_read', 0):>16}{r['totals'].get('Created_tmp_disk_tables', 0):>10}")
+
+
+def save_report(report, path='db_status_report.json', history_path='db_status_history.jsonl', meta=None):
+    """今回の結果を保存し、リリース比較用の履歴に1行追記"""
+    record = {'release': release_label(), 'recorded_at': time.time(), 'phases': report}
+    record.update(meta or {})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+    with open(history_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    print(f"📁 Database status report saved to {path} (history: {history_path})")
@@ -0,0 +1,350 @@
+"""
+コンテナのリソース使用量のサンプリング
+
+ローカルの Docker API（/var/run/docker.sock）から一定間隔で各コンテナの
+CPU・メモリ・ネットワーク・ブロック I/O を取得し、ステップの時間帯に合わせてフェーズごとに集計する。
+アプリ側（app, nginx, db）とクライアント側（chrome コンテナ、ハーネス自身、ハーネスがローカルで起動した
+chromedriver と Chrome のプロセス群）の CPU を並べて、どちらがボトルネックだったかの目安を出す。
+
+HARNESS_DOCKER_STATS=1 で有効化。
+"""
+
+import collections
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+
+from .procfs import process_tree_cpu
+
+DEFAULT_CONTAINERS = (
+    'approval-workflow-app',
+    'approval-workflow-nginx',
+    'approval-workflow-db',
+    'approval-workflow-chrome',
+)
+# サーバー側として扱うコンテナ（それ以外とハーネス自身はクライアント側）
+SERVER_CONTAINERS = ('approval-workflow-app', 'approval-workflow-nginx', 'approval-workflow-db')
+HARNESS = 'harness'
+# ハーネスの子孫プロセス（ローカルで起動した chromedriver と Chrome）
+LOCAL_BROWSERS = 'local-chrome'
+
+
+def is_enabled():
+    return os.getenv("HARNESS_DOCKER_STATS", "0").lower() in ("1", "true", "yes")
+
+
+def socket_path():
+    """DOCKER_HOST=unix://... があればそれを、なければ既定のソケットを使う"""
+    host = os.getenv("DOCKER_HOST", "")
+    if host.startswith("unix://"):
+        return host[len("unix://"):]
+    return "/var/run/docker.sock"
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """Unix ドメインソケット経由の HTTP 接続"""
+
+    def __init__(self, path, timeout=10):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class DockerClient:
+    """stats 取得に必要な分だけの Docker API クライアント"""
+
+    def __init__(self, path=None, timeout=10):
+        self.path = path or socket_path()
+        self.timeout = timeout
+
+    def get(self, url):
+        connection = UnixHTTPConnection(self.path, timeout=self.timeout)
+        try:
+            connection.request('GET', url)
+            response = connection.getresponse()
+            body = response.read()
+        finally:
+            connection.close()
+        if response.status == 404:
+            return None
+        if response.status >= 400:
+            raise RuntimeError(f"Docker API {url}: HTTP {response.status}")
+        return json.loads(body)
+
+    def stats(self, container):
+        """1回分の stats（one-shot なので前回値を待たずにすぐ返る）"""
+        return self.get(f"/containers/{container}/stats?stream=false&one-shot=true")
+
+
+def parse_stats(raw):
+    """API の stats から累積値と現在値を取り出す"""
+    cpu = raw.get('cpu_stats') or {}
+    memory = raw.get('memory_stats') or {}
+    mem_stats = memory.get('stats') or {}
+    # cgroup v1 は total_inactive_file、v2 は inactive_file をキャッシュとして除く
+    cache = mem_stats.get('total_inactive_file', mem_stats.get('inactive_file', 0))
+
+    rx = tx = 0
+    for interface in (raw.get('networks') or {}).values():
+        rx += interface.get('rx_bytes', 0)
+        tx += interface.get('tx_bytes', 0)
+
+    read = write = 0
+    for entry in (raw.get('blkio_stats') or {}).get('io_service_bytes_recursive') or []:
+        op = entry.get('op', '').lower()
+        if op == 'read':
+            read += entry.get('value', 0)
+        elif op == 'write':
+            write += entry.get('value', 0)
+
+    return {
+        'cpu_total': (cpu.get('cpu_usage') or {}).get('total_usage', 0),
+        'system_cpu': cpu.get('system_cpu_usage', 0),
+        'online_cpus': cpu.get('online_cpus') or len((cpu.get('cpu_usage') or {}).get('percpu_usage') or []) or 1,
+        'mem_bytes': max(memory.get('usage', 0) - cache, 0),
+        'mem_limit': memory.get('limit', 0),
+        'net_rx': rx,
+        'net_tx': tx,
+        'blk_read': read,
+        'blk_write': write,
+    }
+
+
+def cpu_percent(previous, current):
+    """docker stats と同じ計算（全 CPU を 100% x コア数とする）"""
+    cpu_delta = current['cpu_total'] - previous['cpu_total']
+    system_delta = current['system_cpu'] - previous['system_cpu']
+    if cpu_delta < 0 or system_delta <= 0:
+        return 0.0
+    return cpu_delta / system_delta * current['online_cpus'] * 100.0
+
+
+class DockerStatsSampler:
+    """バックグラウンドスレッドで一定間隔ごとに各コンテナの使用量を記録する"""
+
+    def __init__(self, client=None, containers=DEFAULT_CONTAINERS, interval=1.0, max_samples=20000):
+        self.client = client or DockerClient()
+        self.containers = list(containers)
+        self.interval = interval
+        self.samples = collections.deque(maxlen=max_samples)
+        self.missing = set()
+        self._previous = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample_container(self, name, now):
+        raw = self.client.stats(name)
+        if raw is None:
+            if name not in self.missing:
+                self.missing.add(name)
+                print(f"⚠️ Container not found, skipping: {name}")
+            return
+        current = parse_stats(raw)
+        previous = self._previous.get(name)
+        self._previous[name] = current
+        self.samples.append({
+            'ts': now,
+            'container': name,
+            'cpu_percent': cpu_percent(previous, current) if previous else None,
+            **{k: current[k] for k in ('mem_bytes', 'mem_limit', 'net_rx', 'net_tx', 'blk_read', 'blk_write')},
+        })
+
+    def _sample_harness(self, now):
+        # ハーネス自身（Python プロセス）の CPU もクライアント側として記録
+        cpu = time.process_time()
+        previous = self._previous.get(HARNESS)
+        self._previous[HARNESS] = (now, cpu)
+        percent = None
+        if previous and now > previous[0]:
+            percent = (cpu - previous[1]) / (now - previous[0]) * 100.0
+        self.samples.append({'ts': now, 'container': HARNESS, 'cpu_percent': percent})
+
+    def _sample_local_browsers(self, now):
+        # create / approve はコンテナではなくローカルで Chrome を起動するため、その CPU もクライアント側に入れる。
+        # ブラウザはユーザーごとに終了・起動するので、合計ではなくプロセスごとの増分を足す
+        times = process_tree_cpu(os.getpid())
+        if times is None:
+            return
+        previous = self._previous.get(LOCAL_BROWSERS)
+        self._previous[LOCAL_BROWSERS] = (now, times)
+        percent = None
+        if previous and now > previous[0]:
+            used = sum(max(t - previous[1].get(pid, 0.0), 0.0) for pid, t in times.items())
+            percent = used / (now - previous[0]) * 100.0
+        self.samples.append({'ts': now, 'container': LOCAL_BROWSERS, 'cpu_percent': percent,
+                             'processes': len(times)})
+
+    def sample(self):
+        now = time.time()
+        for name in self.containers:
+            if name in self.missing:
+                continue
+            try:
+                self._sample_container(name, now)
+            except Exception as e:
+                print(f"⚠️ Docker stats failed for {name}: {e}")
+        self._sample_harness(now)
+        self._sample_local_browsers(now)
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.time()
+            self.sample()
+            self._stop.wait(max(self.interval - (time.time() - started), 0))
+
+    def start(self):
+        # 到達できるか先に確認する（ソケットがなければ例外）
+        self.client.get("/version")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 10)
+
+
+def _window(samples, container, start, end):
+    """区間内のサンプルと、累積値の基準にする区間直前のサンプル"""
+    before = None
+    inside = []
+    for sample in samples:
+        if sample['container'] != container:
+            continue
+        if sample['ts'] < start:
+            before = sample
+        elif sample['ts'] <= end:
+            inside.append(sample)
+    return before, inside
+
+
+def step_usage(samples, step, containers):
+    """1つのステップの時間帯におけるコンテナごとの使用量"""
+    end = step.ended_at if step.ended_at is not None else time.time()
+    usage = {}
+    for name in containers:
+        before, inside = _window(samples, name, step.started_at, end)
+        if not inside:
+            continue
+        cpu = [s['cpu_percent'] for s in inside if s['cpu_percent'] is not None]
+        entry = {
+            'samples': len(inside),
+            'cpu': cpu,
+            'mem_max_bytes': max((s.get('mem_bytes', 0) for s in inside), default=0),
+        }
+        base = before or inside[0]
+        for key in ('net_rx', 'net_tx', 'blk_read', 'blk_write'):
+            if key in inside[-1]:
+                entry[key] = max(inside[-1][key] - base[key], 0)
+        usage[name] = entry
+    return usage
+
+
+def verdict(cpu_by_container):
+    """平均 CPU の合計をサーバー側とクライアント側で比べる"""
+    server = sum(v for k, v in cpu_by_container.items() if k in SERVER_CONTAINERS)
+    client = sum(v for k, v in cpu_by_container.items() if k not in SERVER_CONTAINERS)
+    if not server and not client:
+        return 'unknown'
+    return 'server' if server >= client else 'client'
+
+
+def phase_report(samples, steps, containers):
+    """最上位ステップ（フェーズ）ごとにコンテナの使用量を集計し、各ステップにも添付する"""
+    names = list(containers) + [HARNESS, LOCAL_BROWSERS]
+    phases = collections.OrderedDict()
+    for step in steps:
+        if step.parent is not None or step.warmup:
+            continue
+        usage = step_usage(samples, step, names)
+        step.data['resources'] = {
+            name: {
+                'cpu_avg': round(sum(u['cpu']) / len(u['cpu']), 1) if u['cpu'] else None,
+                **{k: v for k, v in u.items() if k != 'cpu'},
+            }
+            for name, u in usage.items()
+        }
+
+        phase = phases.setdefault(step.name, {'steps': 0, 'duration': 0.0, 'containers': {}})
+        phase['steps'] += 1
+        phase['duration'] += step.duration
+        for name, u in usage.items():
+            c = phase['containers'].setdefault(name, collections.Counter())
+            c['samples'] += u['samples']
+            c['cpu_sum'] += sum(u['cpu'])
+            c['cpu_count'] += len(u['cpu'])
+            c['cpu_max'] = max(c['cpu_max'], max(u['cpu'], default=0))
+            c['mem_max_bytes'] = max(c['mem_max_bytes'], u['mem_max_bytes'])
+            for key in ('net_rx', 'net_tx', 'blk_read', 'blk_write'):
+                c[key] += u.get(key, 0)
+
+    report = {}
+    for name, phase in phases.items():
+        containers_report = {}
+        for container, c in phase['containers'].items():
+            containers_report[container] = {
+                'samples': c['samples'],
+                'cpu_avg': round(c['cpu_sum'] / c['cpu_count'], 1) if c['cpu_count'] else None,
+                'cpu_max': round(c['cpu_max'], 1),
+                'mem_max_mb': round(c['mem_max_bytes'] / 1024 / 1024, 1),
+                **{k: c[k] for k in ('net_rx', 'net_tx', 'blk_read', 'blk_write')},
+            }
+        cpu = {k: v['cpu_avg'] for k, v in containers_report.items() if v['cpu_avg'] is not None}
+        report[name] = {
+            'steps': phase['steps'],
+            'duration': round(phase['duration'], 2),
+            'containers': containers_report,
+            'bottleneck': verdict(cpu),
+        }
+    return report
+
+
+def print_report(report):
+    print("\n📊 Container resources by phase")
+    for name, r in report.items():
+        print(f"   {name} ({r['steps']} steps, {r['duration']:.1f}s) → bottleneck: {r['bottleneck']}")
+        for container, c in r['containers'].items():
+            cpu = f"{c['cpu_avg']:.1f}%" if c['cpu_avg'] is not None else '-'
+            if container in (HARNESS, LOCAL_BROWSERS):
+                print(f"      {container:<28} cpu {cpu:>7} (max {c['cpu_max']:.0f}%)")
+                continue
+            print(f"      {container:<28} cpu {cpu:>7} (max {c['cpu_max']:.0f}%)  mem {c['mem_max_mb']:>7.1f}MB"
+                  f"  net {c['net_rx'] // 1024}/{c['net_tx'] // 1024}KB  blk {c['blk_read'] // 1024}/{c['blk_write'] // 1024}KB")
+
+
+def attach(recorder):
+    """HARNESS_DOCKER_STATS=1 のときサンプリングを開始（Docker に接続できなければ無効のまま続行）"""
+    if not is_enabled():
+        return None
+    containers = [c for c in os.getenv("HARNESS_DOCKER_CONTAINERS", "").split(',') if c] or DEFAULT_CONTAINERS
+    interval = float(os.getenv("HARNESS_DOCKER_STATS_INTERVAL", "1.0"))
+    try:
+        sampler = DockerStatsSampler(containers=containers, interval=interval).start()
+    except Exception as e:
+        print(f"⚠️ Docker stats sampling disabled: {e}")
+        return None
+    print(f"🐳 Docker stats sampling enabled (every {interval}s)")
+    return sampler
+
+
+def finish(sampler, recorder, path='docker_stats_report.json'):
+    """サンプリングを止め、フェーズごとの集計を表示・保存"""
+    if sampler is None:
+        return None
+    sampler.stop()
+    samples = list(sampler.samples)
+    report = phase_report(samples, recorder.steps, sampler.containers)
+    print_report(report)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'interval': sampler.interval, 'phases': report, 'samples': samples},
+                  f, ensure_ascii=False, indent=2)
+    print(f"📁 Docker stats report saved to {path}")
+    return report
@@ -0,0 +1,119 @@
+"""
+ChromeDriver の解決（オフライン・プロセス内で1回）
+
+各スクリプトがドライバーを作るたびに ChromeDriverManager().install() を呼ぶと、
+毎回ネットワーク越しのバージョン確認が走り、オフラインでは起動できない。ここでは次の順に探し、
+結果をプロセス内で使い回す。
+
+1. CHROME_DRIVER_PATH（コンテナなどで配置済みのバイナリ）
+2. ローカルキャッシュ（HARNESS_DRIVER_CACHE、既定 ~/.cache/nrkk-workflow/chromedriver）の
+   インストール済み Chrome のバージョンのディレクトリ
+3. どちらもなければ webdriver-manager で取得し、キャッシュにコピーする
+
+python -m harness.driver            解決結果と所要時間を表示
+python -m harness.driver --clear    キャッシュを削除
+"""
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'nrkk-workflow', 'chromedriver')
+CHROME_BINARIES = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome']
+_VERSION = re.compile(r'(\d+\.\d+\.\d+\.\d+)')
+
+_resolved = None
+_lock = threading.Lock()
+
+
+def cache_dir():
+    return os.getenv("HARNESS_DRIVER_CACHE", DEFAULT_CACHE_DIR)
+
+
+def chrome_version():
+    """インストール済み Chrome のバージョン（例: 126.0.6478.126）。見つからなければ None"""
+    candidates = [os.getenv("CHROME_BIN")] + CHROME_BINARIES
+    for binary in candidates:
+        path = binary and shutil.which(binary)
+        if not path:
+            continue
+        try:
+            output = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = _VERSION.search(output)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _binary_name():
+    return 'chromedriver.exe' if os.name == 'nt' else 'chromedriver'
+
+
+def _resolve():
+    env_path = os.getenv('CHROME_DRIVER_PATH')
+    if env_path and os.path.exists(env_path):
+        return env_path, 'CHROME_DRIVER_PATH'
+
+    version = chrome_version()
+    cached = os.path.join(cache_dir(), version, _binary_name()) if version else None
+    if cached and os.path.exists(cached):
+        return cached, f'cache (Chrome {version})'
+
+    # キャッシュにないときだけ webdriver-manager を使う（ネットワークが必要）
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    print("    ⏳ Installing Chrome driver via webdriver-manager...")
+    installed = ChromeDriverManager().install()
+    if not cached:
+        return installed, 'webdriver-manager'
+    os.makedirs(os.path.dirname(cached), exist_ok=True)
+    tmp = f"{cached}.{os.getpid()}.tmp"
+    shutil.copy2(installed, tmp)
+    os.chmod(tmp, 0o755)
+    os.replace(tmp, cached)
+    return cached, f'webdriver-manager → cache (Chrome {version})'
+
+
+def resolve_chromedriver():
+    """ChromeDriver のパス。プロセス内の2回目以降は何もせずに返す"""
+    global _resolved
+    with _lock:
+        if _resolved is None:
+            path, source = _resolve()
+            print(f"    ✓ Using Chrome driver at: {path} ({source})")
+            _resolved = path
+        return _resolved
+
+
+def chrome_service(**kwargs):
+    """解決したドライバーの Service（webdriver.Chrome(service=...) に渡す）"""
+    from selenium.webdriver.chrome.service import Service
+
+    return Service(resolve_chromedriver(), **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ChromeDriver の解決結果の表示")
+    parser.add_argument('--clear', action='store_true', help="キャッシュしたドライバーを削除する")
+    args = parser.parse_args(argv)
+
+    if args.clear:
+        shutil.rmtree(cache_dir(), ignore_errors=True)
+        print(f"🗑️ Removed {cache_dir()}")
+        return
+    print(f"🌐 Chrome version: {chrome_version() or 'not found'}")
+    print(f"📁 Cache: {cache_dir()}")
+    for attempt in ('first', 'second'):
+        started = time.perf_counter()
+        resolve_chromedriver()
+        print(f"   {attempt} call: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,391 @@
+"""
+遅延・障害注入プロキシ
+
+ハーネスとアプリ（BASE_URL）の間に置くリバースプロキシ。ルートごとに
+- 遅延（固定・一様・正規・対数正規・指数分布）
+- 帯域制限（レスポンス本文を kbps に合わせて少しずつ送る）
+- エラー率（アプリに転送せずに 500/503 などのエラーページを返す）
+を注入し、アプリ自身の応答時間（プロキシ → アプリの往復）をブラウザとは独立に記録する。
+待機のタイムアウトが遅いネットワークや高負荷のバックエンドで持つかの確認に使う。
+
+ルールは JSON で指定し、上から順に最初に一致したもの（なければ default）を使う:
+{
+  "default": {"latency": "lognormal:150:0.5"},
+  "rules": [
+    {"name": "approve", "method": "POST", "path": "^/approvals/", "latency": "uniform:500:3000",
+     "error_rate": 0.05, "error_status": 503},
+    {"name": "pages", "path": "^/(dashboard|my-approvals)", "bandwidth_kbps": 256}
+  ]
+}
+
+HARNESS_FAULT_PROXY=faults.json（または 1 で遅延なし）でテストスクリプトの操作をプロキシ経由にする。
+単体起動:
+python -m harness.fault_proxy --upstream http://localhost:8080 --port 8081 --config faults.json
+"""
+
+import argparse
+import collections
+import http.client
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from .stats import summarize
+from . import seeding
+
+# プロキシが転送しないヘッダー（hop-by-hop）
+HOP_BY_HOP = {'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+              'te', 'trailers', 'transfer-encoding', 'upgrade'}
+# 注入するエラーページのタイトル（waits.ERROR_TITLES で判定される Laravel の標準エラービューと同じ）
+ERROR_PAGES = {
+    419: 'Page Expired',
+    429: 'Too Many Requests',
+    500: 'Server Error',
+    502: 'Server Error',
+    503: 'Service Unavailable',
+    504: 'Server Error',
+}
+# 帯域制限時に1回に送るバイト数
+CHUNK_BYTES = 4096
+
+
+def is_enabled():
+    return bool(os.getenv("HARNESS_FAULT_PROXY"))
+
+
+def parse_latency(spec):
+    """'lognormal:150:0.5' のような指定を (分布, [パラメーター]) にする。単位は ms"""
+    if spec in (None, '', 0):
+        return None
+    if isinstance(spec, (int, float)):
+        return ('fixed', [float(spec)])
+    name, *params = str(spec).split(':')
+    arity = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2, 'exponential': 1}
+    if name not in arity or len(params) != arity[name]:
+        raise ValueError(f"Invalid latency '{spec}' (e.g. fixed:200, uniform:100:500, normal:200:50, "
+                         "lognormal:150:0.5 (median ms, sigma), exponential:200)")
+    return (name, [float(p) for p in params])
+
+
+def sample_latency(latency, rng):
+    """分布から遅延（秒）を1つ引く"""
+    if latency is None:
+        return 0.0
+    name, params = latency
+    if name == 'fixed':
+        ms = params[0]
+    elif name == 'uniform':
+        ms = rng.uniform(params[0], params[1])
+    elif name == 'normal':
+        ms = rng.gauss(params[0], params[1])
+    elif name == 'lognormal':
+        ms = rng.lognormvariate(math.log(params[0]), params[1])
+    else:
+        ms = rng.expovariate(1.0 / params[0])
+    return max(ms, 0.0) / 1000.0
+
+
+class Rule:
+    """ルート（メソッド + パスの正規表現）ごとの注入設定"""
+
+    def __init__(self, name='default', method=None, path=None, latency=None, bandwidth_kbps=None,
+                 error_rate=0.0, error_status=500):
+        self.name = name
+        self.method = method.upper() if method else None
+        self.path = re.compile(path) if path else None
+        self.latency = parse_latency(latency)
+        self.bandwidth_kbps = bandwidth_kbps
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    @classmethod
+    def from_dict(cls, data, name=None):
+        data = dict(data)
+        data.setdefault('name', name or data.get('path') or 'default')
+        return cls(**data)
+
+    def matches(self, method, path):
+        return (self.method is None or self.method == method) and (self.path is None or self.path.search(path))
+
+
+def load_rules(path=None):
+    """ルールファイルを読み込み (rules, default) を返す"""
+    if not path or path in ('1', 'true', 'yes'):
+        return [], Rule()
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    rules = [Rule.from_dict(r, name=f"rule{i}") for i, r in enumerate(config.get('rules', []))]
+    return rules, Rule.from_dict(config.get('default', {}), name='default')
+
+
+class FaultProxy:
+    """アプリの前に置く遅延・障害注入プロキシ"""
+
+    def __init__(self, upstream, host='127.0.0.1', port=0, rules=None, default=None, seed=None,
+                 max_records=100000):
+        parsed = urlparse(upstream)
+        self.upstream = upstream.rstrip('/')
+        self.upstream_host = parsed.hostname
+        self.upstream_port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        self.upstream_https = parsed.scheme == 'https'
+        self.host = host
+        self.port = port
+        self.rules = rules or []
+        self.default = default or Rule()
+        self.records = collections.deque(maxlen=max_records)
+        self._random = seeding.derive('fault_proxy') if seed is None else random.Random(seed)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def rule_for(self, method, path):
+        return next((r for r in self.rules if r.matches(method, path)), self.default)
+
+    def _decide(self, rule):
+        with self._lock:
+            delay = sample_latency(rule.latency, self._random)
+            fail = rule.error_rate and self._random.random() < rule.error_rate
+        return delay, fail
+
+    def _connection(self):
+        """スレッドごとにアプリへの接続を使い回す"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.upstream_https else http.client.HTTPConnection
+            conn = cls(self.upstream_host, self.upstream_port, timeout=120)
+            self._local.conn = conn
+        return conn
+
+    def forward(self, method, path, headers, body):
+        """アプリに転送し、(status, headers, body, アプリの応答時間 秒) を返す"""
+        for attempt in range(2):
+            conn = self._connection()
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+                return response.status, response.getheaders(), payload, time.perf_counter() - started
+            except (http.client.HTTPException, ConnectionError):
+                # 使い回した接続がアプリ側で閉じられていたら1回だけつなぎ直す
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+    def _rewrite_location(self, value):
+        if value.startswith(self.upstream):
+            return self.base_url + value[len(self.upstream):]
+        return value
+
+    def _handler(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _send(self, status, headers, body, bandwidth_kbps):
+                self.send_response(status)
+                for name, value in headers:
+                    if name.lower() in HOP_BY_HOP or name.lower() == 'content-length':
+                        continue
+                    if name.lower() == 'location':
+                        value = proxy._rewrite_location(value)
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if not bandwidth_kbps:
+                    self.wfile.write(body)
+                    return 0.0
+                started = time.perf_counter()
+                bytes_per_second = bandwidth_kbps * 1000 / 8
+                for offset in range(0, len(body), CHUNK_BYTES):
+                    chunk = body[offset:offset + CHUNK_BYTES]
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+                    time.sleep(len(chunk) / bytes_per_second)
+                return time.perf_counter() - started
+
+            def _handle(self):
+                started = time.time()
+                path = urlparse(self.path).path
+                rule = proxy.rule_for(self.command, path)
+                delay, fail = proxy._decide(rule)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else None
+                if delay:
+                    time.sleep(delay)
+
+                record = {
+                    'method': self.command, 'path': path, 'rule': rule.name,
+                    'injected_ms': round(delay * 1000, 1), 'started_at': started,
+                }
+                if fail:
+                    status = rule.error_status
+                    title = ERROR_PAGES.get(status, 'Server Error')
+                    payload = f"<!DOCTYPE html><html><head><title>{title}</title></head><body>{status} | {title}</body></html>"
+                    throttled = self._send(status, [('Content-Type', 'text/html; charset=UTF-8')],
+                                           payload.encode('utf-8'), rule.bandwidth_kbps)
+                    record.update(status=status, injected_error=True, upstream_ms=None, bytes=len(payload))
+                else:
+                    headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_BY_HOP}
+                    try:
+                        status, response_headers, payload, upstream = proxy.forward(self.command, self.path, headers, body)
+                    except Exception as e:
+                        status, response_headers, payload, upstream = 502, [('Content-Type', 'text/plain')], \
+                            f"Bad Gateway: {e}".encode('utf-8'), None
+                    throttled = self._send(status, response_headers, payload, rule.bandwidth_kbps)
+                    record.update(status=status, injected_error=False, bytes=len(payload),
+                                  upstream_ms=round(upstream * 1000, 2) if upstream is not None else None)
+                record.update(throttled_ms=round(throttled * 1000, 1), ended_at=time.time())
+                proxy.records.append(record)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"🌩️ Fault proxy {self.base_url} → {self.upstream} ({len(self.rules)} rule(s))")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def between(self, start, end):
+        return [r for r in list(self.records) if start <= r['started_at'] <= end]
+
+    # StepRecorder のリスナー
+    def on_step_start(self, step):
+        pass
+
+    def on_step_end(self, step):
+        if step.parent is not None:
+            return
+        records = self.between(step.started_at, step.ended_at or time.time())
+        if records:
+            step.data['proxy'] = summarize_records(records)
+
+
+def summarize_records(records):
+    """アプリの応答時間・注入した遅延・エラーの集計"""
+    upstream = [r['upstream_ms'] for r in records if r.get('upstream_ms') is not None]
+    return {
+        'requests': len(records),
+        'injected_errors': sum(1 for r in records if r['injected_error']),
+        'upstream_ms': summarize(upstream),
+        'injected_ms_total': round(sum(r['injected_ms'] for r in records), 1),
+        'throttled_ms_total': round(sum(r['throttled_ms'] for r in records), 1),
+    }
+
+
+def route_report(records):
+    """ルール（ルート）ごとの集計"""
+    by_rule = collections.defaultdict(list)
+    for r in records:
+        by_rule[r['rule']].append(r)
+    return {name: summarize_records(rs) for name, rs in by_rule.items()}
+
+
+def print_report(report):
+    print("\n📊 Fault proxy: true server response time per route")
+    print(f"   {'route':<16}{'requests':>9}{'errors':>8}{'server p50':>12}{'server p99':>12}{'injected':>11}")
+    for name, r in report.items():
+        u = r['upstream_ms']
+        p50 = f"{u['p50']:.0f}ms" if u['p50'] is not None else '-'
+        p99 = f"{u['p99']:.0f}ms" if u['p99'] is not None else '-'
+        print(f"   {name:<16}{r['requests']:>9}{r['injected_errors']:>8}{p50:>12}{p99:>12}"
+              f"{r['injected_ms_total'] / 1000:>10.1f}s")
+
+
+def save_report(report, records, path='fault_proxy_report.json'):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'routes': report, 'requests': records}, f, ensure_ascii=False, indent=2)
+    print(f"📁 Fault proxy report saved to {path}")
+
+
+def attach(recorder, base_url):
+    """HARNESS_FAULT_PROXY が設定されていればプロキシを起動してリスナー登録"""
+    if not is_enabled():
+        return None
+    rules, default = load_rules(os.getenv("HARNESS_FAULT_PROXY"))
+    proxy = FaultProxy(base_url, rules=rules, default=default).start()
+    recorder.add_listener(proxy)
+    return proxy
+
+
+def finish(proxy, recorder, path='fault_proxy_report.json'):
+    """プロキシを止め、ルートごとの集計を表示・保存"""
+    if proxy is None:
+        return None
+    recorder.remove_listener(proxy)
+    proxy.stop()
+    records = list(proxy.records)
+    report = route_report(records)
+    print_report(report)
+    save_report(report, records, path)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="遅延・障害注入プロキシ")
+    parser.add_argument('--upstream', default=os.getenv("APP_URL", "http://localhost:8080"))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--config', help="ルールの JSON ファイル")
+    parser.add_argument('--latency', help="全ルート共通の遅延（ルールファイルの default を上書き）")
+    parser.add_argument('--bandwidth-kbps', type=float, help="全ルート共通の帯域制限")
+    parser.add_argument('--error-rate', type=float, help="全ルート共通のエラー率")
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--output', default='fault_proxy_report.json')
+    seeding.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    seeding.init(args.seed)
+    rules, default = load_rules(args.config)
+    if args.latency:
+        default.latency = parse_latency(args.latency)
+    if args.bandwidth_kbps:
+        default.bandwidth_kbps = args.bandwidth_kbps
+    if args.error_rate is not None:
+        default.error_rate = args.error_rate
+        default.error_status = args.error_status
+
+    proxy = FaultProxy(args.upstream, args.host, args.port, rules, default).start()
+    try:
+        while True:
+            time.sleep(10)
+            print(f"📊 {summarize_records(list(proxy.records)) if proxy.records else 'no requests yet'}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.stop()
+        records = list(proxy.records)
+        report = route_report(records)
+        print_report(report)
+        save_report(report, records, args.output)
+
+
+if __name__ == '__main__':
+    main()
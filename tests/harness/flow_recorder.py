@@ -0,0 +1,267 @@
+"""
+ブラウザ操作の HTTP リクエスト列の記録
+
+Chrome のパフォーマンスログ（CDP の Network イベント）から、1つのブラウザフローが送った
+ドキュメント・XHR リクエスト（メソッド・パス・フォーム項目）を順に記録し、
+harness.load でそのまま再生できるパラメーター付きのフロー定義（JSON）に変換する。
+
+- _token（CSRF トークン）は記録しない。再生時は AppClient が直前のページから引き継ぐ
+- パスやフォームに出てくる数値 ID は、それより前のレスポンス（リダイレクト先 URL か本文）から
+  出どころを探し、capture（正規表現）と {名前} の置き換えにする
+- ログインフォームのメールアドレス・パスワードは {email}・{password} にする
+- 画像・CSS・JS などの静的ファイルは記録しない
+
+HARNESS_FLOW_RECORD=<ディレクトリ> で test_multi_browser_approval.py の各ブラウザのフローを記録する。
+"""
+
+import json
+import os
+import re
+import time
+from urllib.parse import parse_qsl, urlparse
+
+from .network import enable_performance_log, performance_log
+
+RECORDED_TYPES = ('Document', 'XHR', 'Fetch')
+SKIPPED_FIELDS = ('_token',)
+_NUMBER = re.compile(r'^\d+$')
+# 本文から ID の出どころを探すときに、前に付ける文脈の最大文字数
+CONTEXT_CHARS = 24
+
+
+def record_dir():
+    """記録先ディレクトリ（未設定なら記録しない）"""
+    return os.getenv("HARNESS_FLOW_RECORD") or None
+
+
+def enable(chrome_options):
+    """ChromeOptions に記録に必要なパフォーマンスログの設定を追加"""
+    return enable_performance_log(chrome_options)
+
+
+class FlowRecorder:
+    """1つのドライバーが送ったリクエストを順に記録する"""
+
+    def __init__(self, driver, name):
+        self.driver = driver
+        self.name = name
+        self.requests = []
+        self._by_id = {}
+        self._origin = None
+        # パフォーマンスログは NetworkRecorder と同じポンプから受け取る（直接 get_log すると取り合いになる）
+        self._messages = []
+        self.log = performance_log(driver)
+        self.log.subscribe(self._messages.extend)
+        try:
+            # 本文の取得（Network.getResponseBody）に必要
+            driver.execute_cdp_cmd('Network.enable', {})
+        except Exception as e:
+            print(f"⚠️ Response bodies will not be recorded: {e}")
+
+    def poll(self):
+        """溜まったログを読み取る。ページ遷移で本文が消える前に、操作のたびに呼ぶ"""
+        self.log.pump()
+        messages, self._messages[:] = list(self._messages), []
+        for message in messages:
+            method = message.get('method', '')
+            params = message.get('params', {})
+            request_id = params.get('requestId')
+
+            if method == 'Network.requestWillBeSent':
+                self._on_request(request_id, params)
+            elif method == 'Network.responseReceived' and request_id in self._by_id:
+                response = params.get('response', {})
+                entry = self._by_id[request_id]
+                entry['status'] = response.get('status')
+                entry['url'] = response.get('url', entry['url'])
+                entry['mime_type'] = response.get('mimeType')
+            elif method == 'Network.loadingFinished' and request_id in self._by_id:
+                entry = self._by_id.pop(request_id)
+                if (entry.get('mime_type') or '').startswith('text/html'):
+                    entry['body'] = self._body(request_id)
+
+    def detach(self):
+        """ポンプの購読をやめる（ブラウザを閉じる前に呼ぶ）"""
+        self.log.unsubscribe(self._messages.extend)
+
+    def _on_request(self, request_id, params):
+        request = params.get('request', {})
+        url = request.get('url', '')
+        if params.get('type') not in RECORDED_TYPES or not url.startswith('http'):
+            return
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        self._origin = self._origin or origin
+        if origin != self._origin:
+            return
+
+        # リダイレクトは同じ requestId で届く。AppClient は自動で追従するので1件にまとめる
+        if params.get('redirectResponse') and request_id in self._by_id:
+            self._by_id[request_id]['url'] = url
+            return
+
+        headers = {k.lower(): v for k, v in request.get('headers', {}).items()}
+        entry = {
+            'method': request.get('method'),
+            'path': parsed.path + (f"?{parsed.query}" if parsed.query else ''),
+            'type': params.get('type'),
+            'url': url,
+            'status': None,
+        }
+        if request.get('postData') is not None:
+            if 'application/x-www-form-urlencoded' in headers.get('content-type', ''):
+                entry['form'] = [[k, v] for k, v in parse_qsl(request['postData'], keep_blank_values=True)
+                                 if k not in SKIPPED_FIELDS]
+            else:
+                entry['body_raw'] = request['postData']
+                entry['content_type'] = headers.get('content-type')
+        self.requests.append(entry)
+        self._by_id[request_id] = entry
+
+    def _body(self, request_id):
+        try:
+            return self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id}).get('body')
+        except Exception:
+            return None
+
+    def build(self, params=None):
+        """記録したリクエスト列をフロー定義に変換"""
+        self.poll()
+        return build_flow(self.name, self.requests, params)
+
+    def save(self, directory, params=None):
+        flow = self.build(params)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"flow_{self.name}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(flow, f, ensure_ascii=False, indent=2)
+        print(f"📼 Recorded {len(flow['steps'])} requests of '{self.name}' to {path}")
+        return path
+
+
+def _capture_name(context, used):
+    """ID の置き換え名（applications → application_id など）"""
+    base = re.sub(r'[^a-z0-9]+', '_', context.lower()).strip('_') or 'id'
+    base = base[:-1] if base.endswith('s') else base
+    name = base if base.endswith('_id') else f"{base}_id"
+    candidate, n = name, 2
+    while candidate in used:
+        candidate, n = f"{name}{n}", n + 1
+    used.add(candidate)
+    return candidate
+
+
+def _find_source(requests, before, value):
+    """value が初めて出てくる、before より前のレスポンスと抽出用の正規表現を探す"""
+    for index in range(before - 1, -1, -1):
+        entry = requests[index]
+        final_path = urlparse(entry.get('url', '')).path
+        match = re.search(rf'(^|.*/){value}(?=$|/)', final_path)
+        if match and final_path != urlparse(entry['path']).path:
+            prefix = final_path[:match.end() - len(value)]
+            return index, {'from': 'url', 'pattern': re.escape(prefix) + r'(\d+)'}
+
+        body = entry.get('body') or ''
+        for found in re.finditer(rf'(?<!\d){value}(?!\d)', body):
+            context = body[max(0, found.start() - CONTEXT_CHARS):found.start()]
+            # 空白より後ろだけを文脈にする（属性名や関数名 + 区切り文字）
+            context = re.split(r'\s', context)[-1]
+            if not context:
+                continue
+            suffix = body[found.end():found.end() + 1]
+            pattern = re.escape(context) + r'(\d+)' + re.escape(suffix)
+            position = [m.group(1) for m in re.finditer(pattern, body)].index(value)
+            return index, {'from': 'body', 'pattern': pattern, 'index': position}
+    return None, None
+
+
+def build_flow(name, requests, params=None):
+    """リクエスト列から、再生用のステップと capture を組み立てる"""
+    requests = [dict(r) for r in requests]
+    literals = {}
+    for r in requests:
+        if r['method'] == 'POST' and urlparse(r['path']).path == '/login':
+            fields = dict(r.get('form') or [])
+            literals.setdefault(fields.get('email'), 'email')
+            literals.setdefault(fields.get('password'), 'password')
+    for key, value in (params or {}).items():
+        literals[str(value)] = key
+    literals.pop(None, None)
+    literals.pop('', None)
+
+    used = set()
+    captures = {}   # (出どころの index, pattern, index) → 名前
+    steps = []
+    unresolved = []
+
+    def resolve(value, context, index, field=None):
+        if value in literals:
+            return f"{{{literals[value]}}}"
+        if not _NUMBER.match(value):
+            return value
+        source, capture = _find_source(requests, index, value)
+        if source is None:
+            unresolved.append(f"{requests[index]['method']} {requests[index]['path']}: {field or context}={value}")
+            return value
+        key = (source, capture['pattern'], capture.get('index'))
+        if key not in captures:
+            captures[key] = _capture_name(context, used)
+            requests[source].setdefault('capture', {})[captures[key]] = capture
+        return f"{{{captures[key]}}}"
+
+    for index, r in enumerate(requests):
+        segments = r['path'].split('/')
+        path = '/'.join(
+            resolve(segment, segments[i - 1] if i else 'id', index) if _NUMBER.match(segment) else segment
+            for i, segment in enumerate(segments)
+        )
+        step = {'method': r['method'], 'path': path, 'expect_status': r.get('status')}
+        if r.get('form') is not None:
+            form = []
+            list_fields = {}
+            for field, value in r['form']:
+                if field.endswith('[]') and _NUMBER.match(value):
+                    list_fields.setdefault(field, []).append(value)
+                    continue
+                # 数値の項目のうち、ID を表すものだけ出どころを探す（金額などはそのまま）
+                if _NUMBER.match(value) and not field.lower().endswith('id'):
+                    form.append([field, f"{{{literals[value]}}}" if value in literals else value])
+                    continue
+                form.append([field, resolve(value, field, index, field)])
+            for field, values in list_fields.items():
+                form.append([field, _resolve_list(requests, index, field, values, used, unresolved)])
+            step['form'] = form
+        if r.get('body_raw') is not None:
+            step['body'] = r['body_raw']
+            step['content_type'] = r.get('content_type')
+        steps.append(step)
+
+    for step, r in zip(steps, requests):
+        if r.get('capture'):
+            step['capture'] = r['capture']
+
+    if unresolved:
+        print(f"⚠️ {len(unresolved)} value(s) kept as recorded (source not found):")
+        for item in unresolved:
+            print(f"   {item}")
+    return {
+        'name': name,
+        'recorded_at': time.time(),
+        'params': {v: k for k, v in literals.items()},
+        'steps': steps,
+    }
+
+
+def _resolve_list(requests, index, field, values, used, unresolved):
+    """approval_ids[] のような複数値は、同じ正規表現に一致する全件として capture する"""
+    source, capture = _find_source(requests, index, values[0])
+    if source is None:
+        unresolved.append(f"{requests[index]['method']} {requests[index]['path']}: {field}={values}")
+        return values
+    capture = {'from': capture['from'], 'pattern': capture['pattern'], 'all': True}
+    name, n = field[:-2], 2
+    while name in used:
+        name, n = f"{field[:-2]}{n}", n + 1
+    used.add(name)
+    requests[source].setdefault('capture', {})[name] = capture
+    return f"{{{name}}}"
@@ -0,0 +1,128 @@
+"""
+ブラウザを使わない HTTP クライアント
+
+requests.Session でログインし、CSRF トークンを引き継ぎながらアプリの画面・フォームを直接操作する。
+ベンチマーク・事前チェック・負荷生成など、Chrome を起動する必要のない処理で使う。
+"""
+
+import os
+import re
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+DEFAULT_BASE_URL = os.getenv("APP_URL", "http://localhost:8080")
+
+_TOKEN_INPUT = re.compile(r'name="_token"\s+value="([^"]+)"')
+_TOKEN_META = re.compile(r'<meta name="csrf-token" content="([^"]+)"')
+_APPROVAL_CHECKBOX = re.compile(r'id="approval_(\d+)"')
+_APPLICATION_PATH = re.compile(r'/applications/(\d+)(?:$|[/?#])')
+
+
+class HttpError(Exception):
+    """想定外のレスポンスを表す例外"""
+
+    def __init__(self, message, response=None):
+        super().__init__(message)
+        self.response = response
+
+
+class AppClient:
+    """1ユーザー分のセッションを持つクライアント"""
+
+    def __init__(self, base_url=None, timeout=30):
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.csrf_token = None
+        self.last_response = None
+        # (method, path, status, elapsed 秒) の記録
+        self.timings = []
+
+    def _remember_token(self, response):
+        if 'text/html' not in response.headers.get('Content-Type', ''):
+            return
+        match = _TOKEN_META.search(response.text) or _TOKEN_INPUT.search(response.text)
+        if match:
+            self.csrf_token = match.group(1)
+
+    def request(self, method, path, data=None, headers=None, allow_redirects=True):
+        """リクエストを送り、所要時間を記録する"""
+        started = time.perf_counter()
+        response = self.session.request(
+            method, f"{self.base_url}{path}", data=data, headers=headers,
+            timeout=self.timeout, allow_redirects=allow_redirects,
+        )
+        elapsed = time.perf_counter() - started
+        self.timings.append((method, path, response.status_code, elapsed))
+        self.last_response = response
+        self._remember_token(response)
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, data=None, **kwargs):
+        """CSRF トークンを付けてフォームを送信"""
+        if self.csrf_token is None:
+            self.get('/login')
+        payload = list(data.items()) if isinstance(data, dict) else list(data or [])
+        payload.append(('_token', self.csrf_token))
+        return self.request('POST', path, data=payload, **kwargs)
+
+    def login(self, email, password='password'):
+        """ログインしてダッシュボードに到達できたかを返す"""
+        self.get('/login')
+        response = self.post('/login', {'email': email, 'password': password})
+        return response.ok and response.url.rstrip('/').endswith('/dashboard')
+
+    def create_application(self, title, type_='other', priority='medium', amount=None, description=None):
+        """申請を作成して申請IDを返す"""
+        today = datetime.now()
+        data = {
+            'title': title,
+            'description': description or f"{title} の説明",
+            'type': type_,
+            'priority': priority,
+            'requested_date': (today + timedelta(days=2)).strftime('%Y-%m-%d'),
+            'due_date': (today + timedelta(days=7)).strftime('%Y-%m-%d'),
+        }
+        if amount is not None:
+            data['amount'] = str(amount)
+
+        self.get('/applications/create')
+        response = self.post('/applications', data)
+        match = _APPLICATION_PATH.search(response.url)
+        if not response.ok or not match:
+            raise HttpError(f"Application creation failed (HTTP {response.status_code}, {response.url})", response)
+        return match.group(1)
+
+    def submit_application(self, application_id):
+        response = self.post(f"/applications/{application_id}/submit")
+        if not response.ok:
+            raise HttpError(f"Submit failed for application {application_id} (HTTP {response.status_code})", response)
+        return response
+
+    def pending_approval_ids(self):
+        """承認待ち一覧の承認IDを取得"""
+        response = self.get('/my-approvals')
+        return _APPROVAL_CHECKBOX.findall(response.text)
+
+    def approve(self, approval_id, comment=''):
+        return self.post(f"/approvals/{approval_id}/approve", {'comment': comment})
+
+    def bulk_approve(self, approval_ids, comment=''):
+        data = [('approval_ids[]', i) for i in approval_ids] + [('comment', comment)]
+        return self.post('/approvals/bulk-approve', data)
+
+    def approve_all(self, comment=''):
+        return self.post('/approvals/approve-all', {'comment': comment})
+
+    def set_slack_webhook(self, url):
+        """通知設定画面からユーザーの Slack Webhook URL を変更"""
+        self.get('/notifications/settings')
+        return self.post('/notifications/settings', {'slack_webhook_url': url or ''})
+
+    def logout(self):
+        return self.post('/logout')
@@ -0,0 +1,190 @@
+"""
+Chrome の起動オプション（名前つきプロファイル）と起動時間のベンチマーク
+
+スクリプトごとにコピーされていた起動オプションをここにまとめる。
+各スクリプトは自分の既定プロファイルを渡し、HARNESS_LAUNCH_PROFILE を指定するとすべてのスクリプトで上書きできる。
+
+fast-headless  ヘッドレス。バックグラウンド処理やスロットリングを止めた計測・CI 向け
+debug-visible  画面を表示する。動きを目で確認するとき向け
+low-memory     ヘッドレス。レンダラー数・JS ヒープ・キャッシュを絞った、多数のブラウザを並べるとき向け
+
+python -m harness.launch --runs 5     プロファイルごとの起動時間・最初のページ遷移・RSS を比較
+python -m harness.launch --list       プロファイルの内容を表示
+"""
+
+import argparse
+import json
+import os
+import time
+
+from .procfs import process_tree_rss
+from .stats import summarize
+
+# どのプロファイルにも付けるオプション
+COMMON_ARGUMENTS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled',
+    '--no-first-run',
+    '--no-default-browser-check',
+]
+
+PROFILES = {
+    'fast-headless': {
+        'description': "ヘッドレス・バックグラウンド処理なし（計測・CI 向け）",
+        'window_size': '1920,1080',
+        'arguments': [
+            '--headless=new',
+            '--disable-gpu',
+            '--disable-features=VizDisplayCompositor',
+            '--disable-extensions',
+            '--disable-plugins',
+            '--disable-background-networking',
+            '--disable-background-timer-throttling',
+            '--disable-backgrounding-occluded-windows',
+            '--disable-renderer-backgrounding',
+            '--disable-sync',
+            '--mute-audio',
+        ],
+    },
+    'debug-visible': {
+        'description': "画面を表示（目視確認向け）",
+        'window_size': '1920,1080',
+        'arguments': [],
+    },
+    'low-memory': {
+        'description': "ヘッドレス・レンダラー数と JS ヒープを制限（多数のブラウザを並べる向け）",
+        'window_size': '1280,800',
+        'arguments': [
+            '--headless=new',
+            '--disable-gpu',
+            '--disable-extensions',
+            '--disable-background-networking',
+            '--disable-sync',
+            '--mute-audio',
+            '--renderer-process-limit=1',
+            '--disable-features=site-per-process,Translate,OptimizationHints',
+            '--js-flags=--max-old-space-size=256',
+            '--disk-cache-size=1',
+        ],
+    },
+}
+
+
+def profile_name(default='fast-headless'):
+    """使うプロファイル名（HARNESS_LAUNCH_PROFILE がスクリプトの既定より優先）"""
+    name = os.getenv("HARNESS_LAUNCH_PROFILE") or default
+    if name not in PROFILES:
+        raise ValueError(f"Unknown launch profile: {name} (use {' / '.join(PROFILES)})")
+    return name
+
+
+def chrome_options(default='fast-headless', window_size=None, extra=()):
+    """プロファイルの ChromeOptions。window_size・extra はスクリプト固有の指定"""
+    from selenium import webdriver
+
+    profile = PROFILES[profile_name(default)]
+    options = webdriver.ChromeOptions()
+    for argument in COMMON_ARGUMENTS + profile['arguments'] + list(extra):
+        options.add_argument(argument)
+    options.add_argument(f"--window-size={window_size or profile['window_size']}")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    return options
+
+
+def browser_rss(driver):
+    """ドライバーが起動した Chrome のプロセス群の RSS（MB）。chromedriver 自身は含めない"""
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    return process_tree_rss(process.pid if process else None)
+
+
+def measure(name, url):
+    """起動時間・最初のページ遷移・読み込み後の RSS を1回計測"""
+    from selenium import webdriver
+
+    from .driver import chrome_service
+
+    options = chrome_options(name)
+    started = time.perf_counter()
+    driver = webdriver.Chrome(service=chrome_service(), options=options)
+    launch = time.perf_counter() - started
+    try:
+        started = time.perf_counter()
+        driver.get(url)
+        navigation = time.perf_counter() - started
+        rss = browser_rss(driver)
+    finally:
+        driver.quit()
+    return {'launch_s': launch, 'first_navigation_s': navigation, 'rss_mb': rss}
+
+
+def bench(names, runs=3, url=None):
+    """プロファイルを交互に起動して計測（起動できないプロファイルは理由を残して飛ばす）"""
+    url = url or f"{os.getenv('APP_URL', 'http://localhost:8080')}/login"
+    results = {name: {'samples': [], 'error': None} for name in names}
+    for index in range(runs):
+        for name in names:
+            if results[name]['error']:
+                continue
+            try:
+                sample = measure(name, url)
+            except Exception as e:
+                # 画面のない環境の debug-visible など
+                results[name]['error'] = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+                print(f"   ⚠️ {name}: {results[name]['error']}")
+                continue
+            results[name]['samples'].append(sample)
+            print(f"   run {index + 1} {name:<14} launch {sample['launch_s']:.2f}s  "
+                  f"first page {sample['first_navigation_s']:.2f}s  RSS {sample['rss_mb'] or 0:.0f} MB")
+    for result in results.values():
+        result['summary'] = {key: summarize([s[key] for s in result['samples'] if s[key] is not None])
+                             for key in ('launch_s', 'first_navigation_s', 'rss_mb')}
+    return results
+
+
+def print_bench(results):
+    print("\n🚀 Chrome launch profiles (p50 of runs)")
+    print(f"   {'profile':<15}{'runs':>6}{'launch s':>10}{'first page s':>14}{'RSS MB':>9}")
+    for name, result in results.items():
+        s = result['summary']
+        if not result['samples']:
+            print(f"   {name:<15}{0:>6}  {result['error'] or 'no samples'}")
+            continue
+        rss = s['rss_mb']['p50']
+        print(f"   {name:<15}{len(result['samples']):>6}{s['launch_s']['p50']:>10.2f}"
+              f"{s['first_navigation_s']['p50']:>14.2f}{(f'{rss:.0f}' if rss is not None else '-'):>9}")
+    measured = {n: r for n, r in results.items() if r['samples']}
+    if measured:
+        fastest = min(measured, key=lambda n: measured[n]['summary']['launch_s']['p50']
+                      + measured[n]['summary']['first_navigation_s']['p50'])
+        print(f"   ⚡ Fastest launch + first page: {fastest}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chrome の起動プロファイルのベンチマーク")
+    parser.add_argument('--profiles', default=','.join(PROFILES), help="比較するプロファイル（カンマ区切り）")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--url', default=None, help="最初に開くページ（既定は APP_URL の /login）")
+    parser.add_argument('--output', default='launch_bench.json')
+    parser.add_argument('--list', action='store_true', help="プロファイルの内容を表示する")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, profile in PROFILES.items():
+            print(f"{name}: {profile['description']}")
+            print("   " + " ".join(COMMON_ARGUMENTS + profile['arguments'] + [f"--window-size={profile['window_size']}"]))
+        return
+    names = [n for n in args.profiles.split(',') if n]
+    unknown = [n for n in names if n not in PROFILES]
+    if unknown:
+        raise SystemExit(f"❌ Unknown profile(s): {', '.join(unknown)}")
+    results = bench(names, args.runs, args.url)
+    print_bench(results)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"📁 Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
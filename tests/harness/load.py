@@ -0,0 +1,194 @@
+"""
+HTTP 負荷生成（記録したフローの再生）
+
+harness.flow_recorder で記録したフロー定義を、仮想ユーザーごとに AppClient で再生する。
+仮想ユーザーは1回の実行（iteration）ごとに新しいセッションを使い、
+{email}・{password} などのパラメーターと、レスポンスから capture した ID を置き換えて送信する。
+ブラウザを使わないため、数十ユーザーの並列実行でも Chrome 1台分より軽い。
+
+python -m harness.load flows/flow_approver_0.json --users approver0_0@wf.nrkk.technology,approver1_0@wf.nrkk.technology \
+    --concurrency 20 --iterations 5
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .http_client import AppClient
+from .stats import summarize
+from . import seeding
+
+_PLACEHOLDER = re.compile(r'\{([a-z_][a-z0-9_]*)\}')
+
+
+class ReplayError(Exception):
+    """置き換えに必要な値がそろわない・レスポンスが想定と違う"""
+
+
+def load_flow(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def substitute(template, values):
+    """{名前} を値に置き換える。値がリストのときは呼び出し側で展開する"""
+    def replace(match):
+        name = match.group(1)
+        if name not in values:
+            raise ReplayError(f"No value for {{{name}}}")
+        return str(values[name])
+    return _PLACEHOLDER.sub(replace, template)
+
+
+def _form(step, values):
+    payload = []
+    for field, template in step.get('form') or []:
+        if isinstance(template, list):
+            payload.extend((field, v) for v in template)
+            continue
+        whole = _PLACEHOLDER.fullmatch(template)
+        if whole and isinstance(values.get(whole.group(1)), list):
+            payload.extend((field, v) for v in values[whole.group(1)])
+        else:
+            payload.append((field, substitute(template, values)))
+    return payload
+
+
+def _capture(step, response, values):
+    for name, capture in (step.get('capture') or {}).items():
+        source = response.url if capture['from'] == 'url' else response.text
+        found = re.findall(capture['pattern'], source)
+        if capture.get('all'):
+            values[name] = found
+        elif found:
+            values[name] = found[min(capture.get('index', 0), len(found) - 1)]
+        else:
+            raise ReplayError(f"Capture {name} not found in {capture['from']} of {step['path']}")
+
+
+def step_label(step):
+    return f"{step['method']} {step['path']}"
+
+
+def run_once(flow, params, base_url=None, timeout=30):
+    """フローを1回再生し、ステップごとの (ラベル, ms, エラー) を返す"""
+    client = AppClient(base_url, timeout=timeout)
+    values = dict(params)
+    results = []
+    for step in flow['steps']:
+        label = step_label(step)
+        started = time.perf_counter()
+        try:
+            path = substitute(step['path'], values)
+            if step['method'] == 'GET':
+                response = client.get(path)
+            elif step.get('body') is not None:
+                headers = {'Content-Type': step.get('content_type'), 'X-CSRF-TOKEN': client.csrf_token or ''}
+                response = client.request(step['method'], path, data=substitute(step['body'], values).encode('utf-8'),
+                                          headers=headers)
+            else:
+                response = client.post(path, _form(step, values))
+            elapsed = (time.perf_counter() - started) * 1000
+            expected = step.get('expect_status')
+            if expected and response.status_code != expected:
+                raise ReplayError(f"HTTP {response.status_code} (recorded {expected})")
+            _capture(step, response, values)
+            results.append((label, elapsed, None))
+        except Exception as e:
+            results.append((label, (time.perf_counter() - started) * 1000, f"{type(e).__name__}: {e}"))
+            # 以降のステップは前提がそろわないので打ち切る
+            break
+    return results
+
+
+def run(flow, users, concurrency=10, iterations=1, base_url=None, think_time=0.0, password='password'):
+    """仮想ユーザー × iteration を並列に再生し、ステップごとの集計を返す"""
+    tasks = [(user, i) for i in range(iterations) for user in users]
+    samples = {step_label(s): [] for s in flow['steps']}
+    errors = []
+    lock = threading.Lock()
+
+    def virtual_user(task):
+        user, iteration = task
+        params = dict(flow.get('params') or {})
+        params.update({'email': user, 'password': password, 'iteration': iteration})
+        if think_time:
+            # 開始をずらして全員が同時にログインしないようにする（ユーザーごとのシードから決める）
+            time.sleep(seeding.derive('load', user, iteration).uniform(0, think_time))
+        for label, ms, error in run_once(flow, params, base_url):
+            with lock:
+                # 失敗したステップ（419/500 や capture の取りこぼし）は速く返ることが多いので、
+                # 応答時間とスループットには入れず errors にだけ残す
+                if error:
+                    errors.append({'user': user, 'iteration': iteration, 'step': label, 'error': error,
+                                   'ms': ms})
+                else:
+                    samples.setdefault(label, []).append(ms)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        list(executor.map(virtual_user, tasks))
+    wall = time.perf_counter() - started
+
+    # 成功したリクエストだけを数える
+    requests_sent = sum(len(v) for v in samples.values())
+    return {
+        'flow': flow['name'],
+        'users': len(users),
+        'iterations': iterations,
+        'concurrency': concurrency,
+        'wall_seconds': wall,
+        'requests': requests_sent,
+        'failed_requests': len(errors),
+        'throughput_rps': requests_sent / wall if wall else None,
+        'steps': {label: summarize(values) for label, values in samples.items()},
+        'errors': errors,
+    }
+
+
+def print_report(report):
+    print(f"\n📊 Replay of '{report['flow']}': {report['requests']} successful requests "
+          f"in {report['wall_seconds']:.1f}s ({report['throughput_rps']:.1f} req/s, {report['concurrency']} concurrent)")
+    print(f"   {'step':<45}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}")
+    for label, s in report['steps'].items():
+        if not s['count']:
+            continue
+        print(f"   {label:<45}{s['count']:>7}{s['p50']:>9.0f}{s['p95']:>9.0f}")
+    if report['errors']:
+        print(f"   ❌ {len(report['errors'])} virtual user run(s) failed, e.g. "
+              f"{report['errors'][0]['step']}: {report['errors'][0]['error']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="記録したフローの HTTP 再生")
+    parser.add_argument('flow', help="flow_recorder が保存したフロー定義（JSON）")
+    parser.add_argument('--users', default=None, help="仮想ユーザーのメールアドレス（カンマ区切り。省略時は記録したユーザー）")
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--iterations', type=int, default=1, help="仮想ユーザーごとの再生回数")
+    parser.add_argument('--think-time', type=float, default=0.0, help="開始のずらし幅の上限（秒）")
+    parser.add_argument('--base-url', default=None)
+    parser.add_argument('--output', default='load_report.json')
+    seeding.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    flow = load_flow(args.flow)
+    users = [u for u in (args.users or '').split(',') if u] or [flow.get('params', {}).get('email')]
+    if not all(users):
+        raise SystemExit("❌ No virtual users (pass --users)")
+    seed = seeding.init(args.seed)
+
+    report = run(flow, users, args.concurrency, args.iterations, args.base_url, args.think_time, args.password)
+    report['seed'] = seed
+    print_report(report)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📁 Replay report saved to {args.output}")
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+名前つきロケーターと、当たったセレクターの学習
+
+ログアウトボタンや承認ボタンのように、画面の変更に備えて複数のセレクターを順に試す要素を
+名前で登録しておき、実際に見つかったセレクター（戦略）を記録する。次回からはその戦略を最初に試すため、
+総当たりが1回の検索で済む。学習した戦略と命中率は状態ディレクトリ（HARNESS_STATE_DIR）に保存し、
+次の実行に引き継ぐ。セレクターの定義を変えると、その名前の学習結果は捨てる。
+
+検索はどれも待たない（harness.lookup と同じく implicit wait 0 が前提）。待つ場合は wait_for を使う。
+
+python -m harness.locators          学習した戦略と命中率を表示
+"""
+
+import argparse
+import atexit
+import json
+import os
+import threading
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+from .checkpoint import DEFAULT_STATE_DIR
+from .waits import FailFastWait
+
+DEFAULT_PATH = os.path.join(DEFAULT_STATE_DIR, 'locators.json')
+
+# 名前 → 試す順のセレクター。先頭ほど現在の画面に合っているもの
+LOCATORS = {
+    'logout': [
+        (By.CSS_SELECTOR, "form[action*='logout'] button"),
+        (By.CSS_SELECTOR, "a[href*='logout']"),
+        (By.XPATH, ".//a[contains(normalize-space(.), 'ログアウト')]"),
+        (By.XPATH, ".//button[contains(normalize-space(.), 'ログアウト')]"),
+    ],
+    # 承認待ち一覧の各行の承認ボタン（「全て承認」「一括承認」は含めない）
+    'approve_button': [
+        (By.CSS_SELECTOR, "button[id^='approveBtn_']"),
+        (By.CSS_SELECTOR, "button[onclick*=\"'approve'\"]"),
+        (By.XPATH, ".//button[normalize-space(.)='承認']"),
+    ],
+}
+
+
+def _key(strategy):
+    by, value = strategy
+    return f"{by}={value}"
+
+
+class LocatorRegistry:
+    """名前ごとのセレクター候補と、当たった戦略の記録"""
+
+    def __init__(self, path=DEFAULT_PATH, locators=None):
+        self.path = path
+        self.locators = dict(LOCATORS if locators is None else locators)
+        self.state = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                self.state = json.load(f)
+        return self
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._lock:
+            state = json.loads(json.dumps(self.state))
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def register(self, name, strategies):
+        self.locators[name] = list(strategies)
+
+    def _entry(self, name):
+        signature = [_key(s) for s in self.locators[name]]
+        entry = self.state.get(name)
+        if entry is None or entry.get('signature') != signature:
+            entry = {'signature': signature, 'preferred': None,
+                     'lookups': 0, 'first_try': 0, 'fallback': 0, 'miss': 0, 'probes': 0}
+            self.state[name] = entry
+        return entry
+
+    def ordered(self, name):
+        """学習した戦略を先頭にした試行順"""
+        strategies = self.locators[name]
+        with self._lock:
+            preferred = self._entry(name)['preferred']
+        if preferred is None:
+            return list(strategies)
+        return sorted(strategies, key=lambda s: _key(s) != preferred)
+
+    def _record(self, name, winner, probes):
+        with self._lock:
+            entry = self._entry(name)
+            entry['lookups'] += 1
+            entry['probes'] += probes
+            if winner is None:
+                # 空状態など、どれもないのが正しい場面もあるので学習結果は変えない
+                entry['miss'] += 1
+            elif probes == 1:
+                entry['first_try'] += 1
+            else:
+                entry['fallback'] += 1
+                entry['preferred'] = _key(winner)
+            if winner is not None and entry['preferred'] is None:
+                entry['preferred'] = _key(winner)
+            self._dirty = True
+
+    def find_all(self, context, name):
+        """見つかった最初の戦略の要素リスト（どれもなければ空リスト）。context はドライバーか要素"""
+        probes = 0
+        for strategy in self.ordered(name):
+            probes += 1
+            found = context.find_elements(*strategy)
+            if found:
+                self._record(name, strategy, probes)
+                return found
+        self._record(name, None, probes)
+        return []
+
+    def find(self, context, name):
+        """最初の要素。なければ None"""
+        found = self.find_all(context, name)
+        return found[0] if found else None
+
+    def wait_for(self, driver, name, timeout=10):
+        """どれかの戦略で見つかるまで待つ。タイムアウトしたら None
+
+        ポーリング中の空振りは数えず、結果（見つかった戦略か、見つからなかったこと）を1回だけ記録する。
+        """
+        strategies = self.ordered(name)
+        attempt = {}
+
+        def condition(d):
+            for probes, strategy in enumerate(strategies, 1):
+                found = d.find_elements(*strategy)
+                if found:
+                    attempt.update(strategy=strategy, probes=probes)
+                    return found[0]
+            return False
+
+        try:
+            element = FailFastWait(driver, timeout).until(condition)
+        except TimeoutException:
+            self._record(name, None, len(strategies))
+            return None
+        self._record(name, attempt['strategy'], attempt['probes'])
+        return element
+
+    def report(self):
+        rows = {}
+        with self._lock:
+            for name, entry in self.state.items():
+                found = entry['first_try'] + entry['fallback']
+                rows[name] = {
+                    'preferred': entry['preferred'],
+                    'lookups': entry['lookups'],
+                    'hit_rate': entry['first_try'] / found if found else None,
+                    'fallback': entry['fallback'],
+                    'miss': entry['miss'],
+                    'probes_per_lookup': entry['probes'] / entry['lookups'] if entry['lookups'] else None,
+                }
+        return rows
+
+
+def print_report(rows):
+    if not rows:
+        return
+    print("\n🎯 Locator strategies (hit = learned strategy matched on the first try)")
+    print(f"   {'name':<18}{'lookups':>9}{'hit rate':>10}{'fallback':>10}{'miss':>6}{'probes':>8}  preferred")
+    for name, r in sorted(rows.items()):
+        hit_rate = f"{r['hit_rate'] * 100:.0f}%" if r['hit_rate'] is not None else '-'
+        probes = f"{r['probes_per_lookup']:.2f}" if r['probes_per_lookup'] is not None else '-'
+        print(f"   {name:<18}{r['lookups']:>9}{hit_rate:>10}{r['fallback']:>10}{r['miss']:>6}{probes:>8}  "
+              f"{r['preferred'] or '-'}")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def registry():
+    """プロセス共通のレジストリ（初回に保存済みの学習結果を読み込み、終了時に保存）"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LocatorRegistry().load()
+            atexit.register(_registry.save)
+        return _registry
+
+
+def find(context, name):
+    return registry().find(context, name)
+
+
+def find_all(context, name):
+    return registry().find_all(context, name)
+
+
+def wait_for(driver, name, timeout=10):
+    return registry().wait_for(driver, name, timeout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="学習したロケーター戦略と命中率の表示")
+    parser.add_argument('--path', default=DEFAULT_PATH)
+    parser.add_argument('--reset', action='store_true', help="学習した戦略を削除する")
+    args = parser.parse_args(argv)
+
+    if args.reset:
+        if os.path.exists(args.path):
+            os.remove(args.path)
+        print(f"🗑️ Removed {args.path}")
+        return
+    rows = LocatorRegistry(args.path).load().report()
+    if not rows:
+        print(f"ℹ️ No locator lookups recorded in {args.path}")
+        return
+    print_report(rows)
+
+
+if __name__ == '__main__':
+    main()
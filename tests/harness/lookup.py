@@ -0,0 +1,67 @@
+"""
+明示的な待機だけを使う要素の検索
+
+implicitly_wait を設定すると、「あれば使う」ための find_elements が要素のないページで毎回
+implicit wait の秒数だけ止まる（空状態の確認やセレクターの総当たりで 5〜10 秒ずつ）。
+このモジュールは implicit wait を 0 にしたドライバーを前提に、
+- その場で返す存在確認（present / first / all_now）
+- 待つ必要がある場所だけの明示的な待機（wait_for / wait_for_any）
+を提供する。要素がない経路はミリ秒で終わる。
+"""
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+
+from .waits import FailFastWait
+
+
+def explicit_only(driver):
+    """implicit wait を無効にする（ドライバー作成直後に呼ぶ）"""
+    driver.implicitly_wait(0)
+    return driver
+
+
+def all_now(context, by, value):
+    """いま存在する要素のリスト（待たない）。context はドライバーか要素"""
+    return context.find_elements(by, value)
+
+
+def first(context, by, value):
+    """いま存在する最初の要素。なければ None（待たない）"""
+    found = context.find_elements(by, value)
+    return found[0] if found else None
+
+
+def present(context, by, value):
+    """いま要素が存在するか（待たない）"""
+    return bool(context.find_elements(by, value))
+
+
+def wait_for(driver, by, value, timeout=10, visible=False, clickable=False):
+    """要素が現れるまで待って返す。タイムアウトしたら TimeoutException"""
+    if clickable:
+        condition = EC.element_to_be_clickable((by, value))
+    elif visible:
+        condition = EC.visibility_of_element_located((by, value))
+    else:
+        condition = EC.presence_of_element_located((by, value))
+    return FailFastWait(driver, timeout).until(condition)
+
+
+def wait_for_any(driver, locators, timeout=10):
+    """複数の候補のうち最初に現れたものを (index, 要素) で返す。どれも現れなければ (None, None)
+
+    一覧と空状態のように「どちらかが必ず表示される」場面で、ない方を待たずに済む。
+    """
+    def condition(d):
+        for index, (by, value) in enumerate(locators):
+            found = d.find_elements(by, value)
+            if found:
+                return index, found[0]
+        return False
+
+    try:
+        return FailFastWait(driver, timeout).until(condition)
+    except TimeoutException:
+        return None, None
+
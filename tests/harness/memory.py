@@ -0,0 +1,241 @@
+"""
+ブラウザのメモリ増加の検出と作り直し
+
+同じブラウザを使い回す長時間の実行では、承認待ち一覧でモーダルの開閉を繰り返すなどして
+レンダラーの JS ヒープや Chrome のプロセス群の RSS が増え続けることがある。
+ManagedBrowser はチェックポイントごとに JS ヒープ（CDP の Performance.getMetrics、
+使えなければ performance.memory）と RSS を記録し、最初の数回の中央値からの増加がしきい値を超えたら
+そのセッションを閉じて新しいブラウザに置き換える。置き換えるたびに、その時点のメモリを
+browser_recycles.jsonl に1行ずつ残す。
+
+HARNESS_MEMORY_WATCH=1          スクリプト側の ManagedBrowser で監視・作り直しを行う
+HARNESS_HEAP_GROWTH_MB=100      JS ヒープの増加のしきい値
+HARNESS_RSS_GROWTH_MB=300       RSS の増加のしきい値
+HARNESS_MEMORY_SAMPLE_EVERY=1   何回のチェックポイントごとに計測するか
+
+python -m harness.memory soak --email approver0_0@wf.nrkk.technology --cycles 500
+    承認待ち一覧で承認モーダルの開閉を繰り返し、メモリの推移と作り直しを記録する
+"""
+
+import argparse
+import json
+import os
+import time
+
+from . import browser_profile
+from .launch import browser_rss
+from .stats import percentile
+from .steps import current_step
+
+MB = 1024 * 1024
+DEFAULT_LOG = 'browser_recycles.jsonl'
+# 最初の何回の計測をベースラインにするか（起動直後の読み込み分を含めないよう中央値を使う）
+BASELINE_SAMPLES = 3
+
+
+def is_enabled():
+    return os.getenv("HARNESS_MEMORY_WATCH", "0").lower() in ("1", "true", "yes")
+
+
+def sample(driver):
+    """JS ヒープ（MB）と Chrome のプロセス群の RSS（MB）"""
+    heap = None
+    try:
+        driver.execute_cdp_cmd('Performance.enable', {})
+        metrics = driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']
+        heap = {m['name']: m['value'] for m in metrics}.get('JSHeapUsedSize')
+    except Exception:
+        # CDP が使えないドライバー（Selenium Grid など）は Chrome 独自の performance.memory を読む
+        heap = driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : null")
+    rss = browser_rss(driver)
+    return {
+        'at': time.time(),
+        'heap_mb': round(heap / MB, 2) if heap else None,
+        'rss_mb': round(rss, 1) if rss is not None else None,
+    }
+
+
+class MemoryWatch:
+    """ベースラインからの増加がしきい値を超えたかを判定する"""
+
+    def __init__(self, heap_growth_mb=100.0, rss_growth_mb=300.0, baseline_samples=BASELINE_SAMPLES):
+        self.limits = {'heap_mb': heap_growth_mb, 'rss_mb': rss_growth_mb}
+        self.baseline_samples = baseline_samples
+        self.samples = []
+
+    @classmethod
+    def from_env(cls):
+        return cls(heap_growth_mb=float(os.getenv("HARNESS_HEAP_GROWTH_MB", "100")),
+                   rss_growth_mb=float(os.getenv("HARNESS_RSS_GROWTH_MB", "300")))
+
+    def baseline(self):
+        if len(self.samples) < self.baseline_samples:
+            return None
+        first = self.samples[:self.baseline_samples]
+        return {key: percentile([s[key] for s in first if s[key] is not None], 50) for key in self.limits}
+
+    def growth(self, current):
+        base = self.baseline()
+        if base is None:
+            return {}
+        return {key: current[key] - base[key] for key in self.limits
+                if current.get(key) is not None and base.get(key) is not None}
+
+    def observe(self, current):
+        """計測値を追加し、しきい値を超えていれば理由の文字列を返す"""
+        self.samples.append(current)
+        over = [f"{key} +{value:.0f} MB (limit {self.limits[key]:.0f})"
+                for key, value in self.growth(current).items() if value > self.limits[key]]
+        return ", ".join(over) or None
+
+
+class ManagedBrowser:
+    """ドライバーを使い回し、メモリが増え続けたら作り直す
+
+    factory() で新しいドライバーを作り、on_start(driver) でログインなどの準備をする。
+    作業の区切りごとに checkpoint() を呼び、返ってきたドライバーを以降の操作に使う。
+    """
+
+    def __init__(self, factory, on_start=None, watch_factory=None, every=None, log_path=DEFAULT_LOG, label='browser',
+                 enabled=None):
+        self.factory = factory
+        self.on_start = on_start
+        self.watch_factory = watch_factory or MemoryWatch.from_env
+        self.every = every or int(os.getenv("HARNESS_MEMORY_SAMPLE_EVERY", "1"))
+        self.log_path = log_path
+        self.label = label
+        self.enabled = is_enabled() if enabled is None else enabled
+        self.driver = None
+        self.session = 0
+        self.recycles = []
+        self.history = []
+
+    def start(self):
+        self.driver = self.factory()
+        self.session += 1
+        self.watch = self.watch_factory()
+        self._checkpoints = 0
+        self._started_at = time.time()
+        if self.on_start:
+            self.on_start(self.driver)
+        return self.driver
+
+    def checkpoint(self):
+        """メモリを計測し、しきい値を超えていればブラウザを作り直す。以降に使うドライバーを返す"""
+        if self.driver is None:
+            return self.start()
+        if not self.enabled:
+            return self.driver
+        self._checkpoints += 1
+        if self._checkpoints % self.every:
+            return self.driver
+        current = sample(self.driver)
+        current.update(session=self.session, checkpoint=self._checkpoints)
+        self.history.append(current)
+        step = current_step()
+        if step is not None:
+            step.data['memory'] = current
+        reason = self.watch.observe(current)
+        if reason:
+            self.recycle(reason, current)
+        return self.driver
+
+    def recycle(self, reason, current):
+        entry = {
+            'label': self.label,
+            'session': self.session,
+            'reason': reason,
+            'at': current['at'],
+            'age_s': round(current['at'] - self._started_at, 1),
+            'checkpoints': self._checkpoints,
+            'memory': {k: current[k] for k in ('heap_mb', 'rss_mb')},
+            'baseline': self.watch.baseline(),
+        }
+        self.recycles.append(entry)
+        print(f"   ♻️ Recycling {self.label} session {self.session} after {entry['checkpoints']} checkpoints: {reason} "
+              f"(heap {current['heap_mb']} MB, RSS {current['rss_mb']} MB)")
+        if self.log_path:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.close()
+        self.start()
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                # テンプレートから複製したプロファイルで起動していれば、作り直しのたびに削除する
+                browser_profile.quit_driver(self.driver)
+            finally:
+                self.driver = None
+
+
+def soak(base_url, email, cycles, password='password', profile='fast-headless'):
+    """承認待ち一覧で承認モーダルの開閉を繰り返す（承認待ちがなければ一覧の再読み込みを繰り返す）"""
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+
+    from . import launch, locators, lookup
+    from .driver import chrome_service
+    from .waits import FailFastWait
+
+    def factory():
+        driver = webdriver.Chrome(service=chrome_service(), options=launch.chrome_options(profile))
+        return lookup.explicit_only(driver)
+
+    def on_start(driver):
+        driver.get(f"{base_url}/login")
+        lookup.wait_for(driver, By.NAME, 'email').send_keys(email)
+        driver.find_element(By.NAME, 'password').send_keys(password)
+        driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
+        FailFastWait(driver, 15).until(EC.url_contains('/dashboard'))
+        driver.get(f"{base_url}/applications/my-approvals")
+        lookup.wait_for(driver, By.TAG_NAME, 'h2')
+
+    browser = ManagedBrowser(factory, on_start, label=f"soak:{email}", enabled=True)
+    driver = browser.start()
+    try:
+        for cycle in range(1, cycles + 1):
+            button = locators.find(driver, 'approve_button')
+            if button is None:
+                driver.refresh()
+                lookup.wait_for(driver, By.TAG_NAME, 'h2')
+            else:
+                driver.execute_script("arguments[0].click();", button)
+                wait = FailFastWait(driver, 10)
+                wait.until(EC.visibility_of_element_located((By.ID, 'approvalModal')))
+                driver.find_element(By.ID, 'approvalCancelBtn').click()
+                wait.until(EC.invisibility_of_element_located((By.ID, 'approvalModal')))
+            driver = browser.checkpoint()
+            if cycle % 50 == 0 and browser.history:
+                last = browser.history[-1]
+                print(f"   cycle {cycle}: heap {last['heap_mb']} MB, RSS {last['rss_mb']} MB "
+                      f"(session {browser.session})")
+    finally:
+        browser.close()
+    return browser
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ブラウザのメモリ増加の検出と作り直し")
+    sub = parser.add_subparsers(dest='command', required=True)
+    soak_parser = sub.add_parser('soak', help="承認モーダルの開閉を繰り返してメモリの推移を記録")
+    soak_parser.add_argument('--email', required=True)
+    soak_parser.add_argument('--password', default='password')
+    soak_parser.add_argument('--cycles', type=int, default=200)
+    soak_parser.add_argument('--base-url', default=None)
+    soak_parser.add_argument('--profile', default='fast-headless', help="harness.launch の起動プロファイル")
+    soak_parser.add_argument('--output', default='memory_soak.json')
+    args = parser.parse_args(argv)
+
+    base_url = args.base_url or os.getenv("APP_URL", "http://localhost:8080")
+    print(f"🧪 Memory soak: {args.cycles} modal cycles as {args.email}")
+    browser = soak(base_url, args.email, args.cycles, args.password, args.profile)
+    print(f"\n🧠 {len(browser.history)} samples, {len(browser.recycles)} recycle(s) over {browser.session} session(s)")
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'samples': browser.history, 'recycles': browser.recycles}, f, ensure_ascii=False, indent=2)
+    print(f"📁 Memory samples saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
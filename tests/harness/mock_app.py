@@ -0,0 +1,473 @@
+"""
+ワークフローアプリのローカルモック
+
+ログイン・ダッシュボード・申請作成・承認待ち一覧の静的なコピーを返す軽量サーバー。
+テストスクリプトが使う要素 ID（newApplicationBtn, submitApplicationBtn, approveAllBtn,
+bulkApprovalModal, selectAll など）と CSRF トークン・ロール表示はアプリと同じにしてあり、
+POST には設定した固定の遅延のあとリダイレクトを返す。DB もアプリのロジックもないので、
+このサーバーに対して実行したステップの所要時間は、ほぼハーネス側（ドライバー呼び出し・待機・出力）のコストになる。
+
+python -m harness.mock_app --port 8090 --post-latency-ms 50
+APP_URL=http://localhost:8090 python test_create_applications.py
+
+終了時（Ctrl-C）に受けたリクエストを mock_app_requests.json に保存し、
+--overhead でステップ記録と突き合わせてステップごとのクライアント側の時間を出せる。
+python -m harness.mock_app --overhead create_steps.json --requests mock_app_requests.json
+"""
+
+import argparse
+import collections
+import html
+import json
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qsl, urlparse
+
+from .stats import summarize
+
+# 承認者としてロールを表示するユーザー（tests/test_approve_applications.py の名簿）
+DEFAULT_APPROVERS = (
+    'nakamura.keiko@wf.nrkk.technology', 'kimura.tomoko@wf.nrkk.technology', 'admin@wf.nrkk.technology',
+    'sato.taro@wf.nrkk.technology', 'suzuki.hanako@wf.nrkk.technology', 'takahashi.ichiro@wf.nrkk.technology',
+    'tanaka.miki@wf.nrkk.technology', 'ito.kenta@wf.nrkk.technology', 'watanabe.yumi@wf.nrkk.technology',
+    'yamamoto.naoki@wf.nrkk.technology', 'tazuma@wf.nrkk.technology',
+)
+
+LAYOUT = Template("""<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="utf-8">
+<meta name="csrf-token" content="$token">
+<title>$title - 承認ワークフロー</title>
+<style>
+.modal { display: none; }
+.modal.show { display: block; }
+</style>
+<script>
+// bootstrap.Modal の代わり（show で表示するだけ）
+window.bootstrap = { Modal: function (el) { this.show = function () { el.classList.add('show'); }; } };
+</script>
+</head>
+<body>
+<nav>
+  <a href="/dashboard" id="dashboardBtn">ダッシュボード</a>
+  <a href="/applications" id="myApplicationsBtn">申請一覧</a>
+  $approvals_link
+  <ul><li><span class="dropdown-item-text">$role</span></li></ul>
+  <form method="POST" action="/logout"><input type="hidden" name="_token" value="$token"><button type="submit" id="logoutBtn">ログアウト</button></form>
+</nav>
+<main>
+$flash
+$content
+</main>
+</body>
+</html>
+""")
+
+LOGIN = Template("""<!DOCTYPE html>
+<html lang="ja">
+<head><meta charset="utf-8"><title>ログイン - 承認ワークフロー</title></head>
+<body>
+$flash
+<form method="POST" action="/login">
+  <input type="hidden" name="_token" value="$token">
+  <input type="email" name="email" id="email">
+  <input type="password" name="password" id="password">
+  <button type="submit">ログイン</button>
+</form>
+</body>
+</html>
+""")
+
+DASHBOARD = """
+<h1>ダッシュボード</h1>
+<a href="/applications/create" class="btn btn-primary" id="newApplicationBtn">新規申請</a>
+"""
+
+CREATE_FORM = Template("""
+<h1>新規申請</h1>
+<form method="POST" action="/applications">
+  <input type="hidden" name="_token" value="$token">
+  <input type="text" id="title" name="title">
+  <select id="type" name="type">
+    <option value="">選択してください</option>
+    <option value="expense">経費申請</option>
+    <option value="leave">休暇申請</option>
+    <option value="purchase">購入申請</option>
+    <option value="other">その他</option>
+  </select>
+  <select id="priority" name="priority">
+    <option value="low">低</option>
+    <option value="medium" selected>中</option>
+    <option value="high">高</option>
+    <option value="urgent">緊急</option>
+  </select>
+  <textarea id="description" name="description"></textarea>
+  <input type="number" id="amount" name="amount">
+  <input type="date" id="requested_date" name="requested_date">
+  <input type="date" id="due_date" name="due_date">
+  <button type="submit" id="submitApplicationBtn">申請を作成</button>
+</form>
+""")
+
+SHOW = Template("""
+<h1 id="applicationTitle">申請 #$id</h1>
+<form method="POST" action="/applications/$id/submit">
+  <input type="hidden" name="_token" value="$token">
+  <button type="submit" id="submitBtn">提出</button>
+</form>
+""")
+
+APPROVAL_CARD = Template("""
+<div class="col-md-6 mb-4">
+  <div class="card">
+    <div class="card-body">
+      <input class="form-check-input" type="checkbox" value="$id" id="approval_$id" onchange="updateBulkActions()">
+      <h5 class="card-title">モック申請 $id</h5>
+      <a href="/applications/$id" class="btn btn-outline-primary btn-sm" id="viewDetailsBtn_$id">詳細を見る</a>
+      <button type="button" class="btn btn-success btn-sm" id="approveBtn_$id" onclick="showApprovalModal($id, 'approve')">承認</button>
+      <button type="button" class="btn btn-danger btn-sm" id="rejectBtn_$id" onclick="showApprovalModal($id, 'reject')">却下</button>
+      <button type="button" class="btn btn-secondary btn-sm" id="skipBtn_$id" onclick="showApprovalModal($id, 'skip')">スキップ</button>
+    </div>
+  </div>
+</div>
+""")
+
+MY_APPROVALS = Template("""
+<h1>承認待ち</h1>
+<div id="bulkActions" style="display: none;">
+  <button type="button" id="bulkApproveBtn" onclick="bulkApprove()">選択を承認</button>
+  <button type="button" id="bulkRejectBtn" onclick="bulkReject()">選択を却下</button>
+</div>
+<button type="button" id="approveAllBtn" onclick="approveAll()">全て承認</button>
+<button type="button" id="rejectAllBtn" onclick="rejectAll()">全て却下</button>
+<input class="form-check-input" type="checkbox" id="selectAll" onchange="toggleSelectAll()">
+<div class="row">$cards</div>
+
+<div class="modal fade" id="approvalModal">
+  <form id="approvalForm" method="POST">
+    <input type="hidden" name="_token" value="$token">
+    <textarea name="comment" id="comment"></textarea>
+    <button type="submit" id="approvalSubmit">実行</button>
+  </form>
+</div>
+<div class="modal fade" id="bulkApprovalModal">
+  <form id="bulkApprovalForm" method="POST">
+    <input type="hidden" name="_token" value="$token">
+    <p id="bulkApprovalMessage"></p>
+    <textarea name="comment" id="bulkComment"></textarea>
+    <button type="submit" id="bulkApprovalSubmit">実行</button>
+  </form>
+</div>
+<div class="modal fade" id="bulkRejectionModal">
+  <form id="bulkRejectionForm" method="POST" action="/approvals/reject-all">
+    <input type="hidden" name="_token" value="$token">
+    <textarea name="comment" id="bulkRejectComment"></textarea>
+    <button type="submit" id="bulkRejectionSubmit">実行</button>
+  </form>
+</div>
+<script>
+function showApprovalModal(id, action) {
+    document.getElementById('approvalForm').action = '/approvals/' + id + '/' + action;
+    new bootstrap.Modal(document.getElementById('approvalModal')).show();
+}
+function toggleSelectAll() {
+    const checked = document.getElementById('selectAll').checked;
+    document.querySelectorAll('input[type="checkbox"][id^="approval_"]').forEach(cb => { cb.checked = checked; });
+    updateBulkActions();
+}
+function updateBulkActions() {
+    const selected = document.querySelectorAll('input[type="checkbox"][id^="approval_"]:checked').length;
+    document.getElementById('bulkActions').style.display = selected > 0 ? 'block' : 'none';
+}
+function openBulk(action, ids) {
+    const form = document.getElementById('bulkApprovalForm');
+    form.action = action;
+    form.querySelectorAll('input[name="approval_ids[]"]').forEach(input => input.remove());
+    (ids || []).forEach(id => {
+        const input = document.createElement('input');
+        input.type = 'hidden'; input.name = 'approval_ids[]'; input.value = id;
+        form.appendChild(input);
+    });
+    new bootstrap.Modal(document.getElementById('bulkApprovalModal')).show();
+}
+function selectedIds() {
+    return Array.from(document.querySelectorAll('input[type="checkbox"][id^="approval_"]:checked')).map(cb => cb.value);
+}
+function bulkApprove() { openBulk('/approvals/bulk-approve', selectedIds()); }
+function bulkReject() { openBulk('/approvals/bulk-reject', selectedIds()); }
+function approveAll() { openBulk('/approvals/approve-all'); }
+function rejectAll() { new bootstrap.Modal(document.getElementById('bulkRejectionModal')).show(); }
+</script>
+""")
+
+# POST 先 → (リダイレクト先, 完了メッセージ)
+_POST_ROUTES = (
+    (re.compile(r'^/applications/(\d+)/submit$'), '/applications/{0}', '申請を提出しました。'),
+    (re.compile(r'^/approvals/(\d+)/(approve|reject|skip)$'), '/my-approvals', '処理が完了しました。'),
+    (re.compile(r'^/approvals/(bulk-approve|bulk-reject|approve-all|reject-all)$'), '/my-approvals', '一括処理が完了しました。'),
+)
+
+
+class MockApp:
+    """静的ページを返すモックサーバー"""
+
+    def __init__(self, host='127.0.0.1', port=8090, post_latency_ms=0, get_latency_ms=0,
+                 pending=5, approvers=DEFAULT_APPROVERS, max_records=100000):
+        self.host = host
+        self.port = port
+        self.post_latency_ms = post_latency_ms
+        self.get_latency_ms = get_latency_ms
+        self.pending = pending
+        self.approvers = set(approvers)
+        self.requests = collections.deque(maxlen=max_records)
+        self._sessions = {}
+        self._next_id = 1000
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def _new_application_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def _session(self, cookie_header):
+        """Cookie のセッション（なければ作る）と、新しく発行したかどうか"""
+        match = re.search(r'mock_session=([0-9a-f]+)', cookie_header or '')
+        if match and match.group(1) in self._sessions:
+            return match.group(1), self._sessions[match.group(1)], False
+        sid = secrets.token_hex(16)
+        with self._lock:
+            self._sessions[sid] = {'token': secrets.token_hex(20), 'email': None, 'flash': None}
+        return sid, self._sessions[sid], True
+
+    def render(self, path, session):
+        """GET のパスに対応するページ。None なら 404"""
+        token = session['token']
+        flash = session.pop('flash', None)
+        session['flash'] = None
+        flash_html = f'<div class="alert alert-success">{html.escape(flash)}</div>' if flash else ''
+        if path == '/login':
+            return LOGIN.substitute(token=token, flash=flash_html)
+
+        pages = {
+            '/dashboard': ('ダッシュボード', DASHBOARD),
+            '/applications': ('申請一覧', '<h1>申請一覧</h1>'),
+            '/applications/create': ('新規申請', CREATE_FORM.substitute(token=token)),
+            '/my-approvals': ('承認待ち', self._my_approvals(token)),
+            '/applications/my-approvals': ('承認待ち', self._my_approvals(token)),
+            '/notifications/settings': ('通知設定', '<h1>通知設定</h1>'),
+        }
+        show = re.match(r'^/applications/(\d+)$', path)
+        if show:
+            pages[path] = (f"申請 #{show.group(1)}", SHOW.substitute(id=show.group(1), token=token))
+        if path not in pages:
+            return None
+        title, content = pages[path]
+        approver = session['email'] in self.approvers
+        return LAYOUT.substitute(
+            token=token, title=title, content=content, flash=flash_html,
+            role='approver' if approver else 'applicant',
+            approvals_link='<a class="nav-link" href="/my-approvals" id="applicationsBtn">承認待ち</a>' if approver else '',
+        )
+
+    def _my_approvals(self, token):
+        cards = ''.join(APPROVAL_CARD.substitute(id=500 + i) for i in range(self.pending))
+        return MY_APPROVALS.substitute(token=token, cards=cards)
+
+    def redirect_for(self, path, form, session):
+        """POST の処理。(リダイレクト先, ステータス) を返す"""
+        if form.get('_token') != session['token'] and path != '/logout':
+            return None, 419
+        if path == '/login':
+            session['email'] = form.get('email')
+            return '/dashboard', 302
+        if path == '/logout':
+            session['email'] = None
+            return '/login', 302
+        if path == '/applications':
+            return f"/applications/{self._new_application_id()}", 302
+        for pattern, target, message in _POST_ROUTES:
+            match = pattern.match(path)
+            if match:
+                session['flash'] = message
+                return target.format(*match.groups()), 302
+        return None, 404
+
+    def _handler(self):
+        app = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self, status, body=b'', location=None, cookie=None):
+                self.send_response(status)
+                if location:
+                    self.send_header('Location', location)
+                if cookie:
+                    self.send_header('Set-Cookie', f"mock_session={cookie}; Path=/; HttpOnly")
+                self.send_header('Content-Type', 'text/html; charset=UTF-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _handle(self, method):
+                started = time.time()
+                path = urlparse(self.path).path.rstrip('/') or '/'
+                sid, session, issued = app._session(self.headers.get('Cookie'))
+                cookie = sid if issued else None
+
+                if method == 'GET':
+                    if app.get_latency_ms:
+                        time.sleep(app.get_latency_ms / 1000.0)
+                    if path == '/':
+                        self._respond(302, location='/dashboard' if session['email'] else '/login', cookie=cookie)
+                        status = 302
+                    else:
+                        page = app.render(path, session)
+                        status = 200 if page is not None else 404
+                        self._respond(status, (page or '<h1>404 Not Found</h1>').encode('utf-8'), cookie=cookie)
+                else:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    form = dict(parse_qsl(self.rfile.read(length).decode('utf-8'), keep_blank_values=True))
+                    if app.post_latency_ms:
+                        time.sleep(app.post_latency_ms / 1000.0)
+                    location, status = app.redirect_for(path, form, session)
+                    if location:
+                        self._respond(302, location=location, cookie=cookie)
+                    else:
+                        body = '<title>Page Expired</title>' if status == 419 else '<h1>404 Not Found</h1>'
+                        self._respond(status, body.encode('utf-8'), cookie=cookie)
+
+                app.requests.append({
+                    'method': method, 'path': path, 'status': status,
+                    'started_at': started, 'ended_at': time.time(),
+                })
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"🧪 Mock app listening on http://{self.host}:{self.port} "
+              f"(POST latency {self.post_latency_ms}ms, {self.pending} pending approvals)")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def save(self, path='mock_app_requests.json'):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(list(self.requests), f, ensure_ascii=False, indent=2)
+        print(f"📁 {len(self.requests)} mock requests saved to {path}")
+
+
+def _server_time(requests, start, end):
+    """ステップの時間内にサーバーが処理していた時間（区間の和集合、秒）"""
+    spans = sorted((max(r['started_at'], start), min(r['ended_at'], end))
+                   for r in requests if r['ended_at'] > start and r['started_at'] < end)
+    total, current_start, current_end = 0.0, None, None
+    for s, e in spans:
+        if current_end is None or s > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = s, e
+        else:
+            current_end = max(current_end, e)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def overhead_report(steps, requests):
+    """ステップ名ごとの所要時間と、そのうちサーバー以外（ハーネス側）の時間"""
+    by_name = collections.defaultdict(lambda: {'total_ms': [], 'client_ms': [], 'requests': 0})
+    for step in steps:
+        if step.get('ended_at') is None or step.get('warmup'):
+            continue
+        duration = step['ended_at'] - step['started_at']
+        server = _server_time(requests, step['started_at'], step['ended_at'])
+        entry = by_name[step['name']]
+        entry['total_ms'].append(duration * 1000)
+        entry['client_ms'].append((duration - server) * 1000)
+        entry['requests'] += sum(1 for r in requests if step['started_at'] <= r['started_at'] < step['ended_at'])
+    return {
+        name: {
+            'count': len(e['total_ms']),
+            'requests': e['requests'],
+            'total_ms': summarize(e['total_ms']),
+            'client_ms': summarize(e['client_ms']),
+        }
+        for name, e in by_name.items()
+    }
+
+
+def print_overhead(report):
+    print("\n📊 Harness cost per step against the mock (client = step time - mock server time)")
+    print(f"   {'step':<22}{'count':>7}{'requests':>10}{'total p50':>11}{'client p50':>12}{'client share':>14}")
+    for name, r in report.items():
+        total, client = r['total_ms']['p50'], r['client_ms']['p50']
+        share = f"{client / total * 100:.0f}%" if total else '-'
+        print(f"   {name:<22}{r['count']:>7}{r['requests']:>10}{total:>10.0f}ms{client:>10.0f}ms{share:>14}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ワークフローアプリのローカルモック")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--post-latency-ms', type=float, default=0, help="POST の応答までの固定遅延")
+    parser.add_argument('--get-latency-ms', type=float, default=0, help="GET の応答までの固定遅延")
+    parser.add_argument('--pending', type=int, default=5, help="承認待ち一覧に表示する件数")
+    parser.add_argument('--approver', action='append', help="承認者として表示するユーザー（省略時は承認テストの名簿）")
+    parser.add_argument('--output', default='mock_app_requests.json')
+    parser.add_argument('--overhead', metavar='STEPS_JSON', help="サーバーを起動せず、ステップ記録からハーネス側の時間を集計する")
+    parser.add_argument('--requests', default='mock_app_requests.json', help="--overhead で使うリクエスト記録")
+    args = parser.parse_args(argv)
+
+    if args.overhead:
+        with open(args.overhead, encoding='utf-8') as f:
+            steps = json.load(f)
+        with open(args.requests, encoding='utf-8') as f:
+            requests = json.load(f)
+        report = overhead_report(steps['steps'] if isinstance(steps, dict) else steps, requests)
+        print_overhead(report)
+        return report
+
+    app = MockApp(args.host, args.port, args.post_latency_ms, args.get_latency_ms, args.pending,
+                  args.approver or DEFAULT_APPROVERS).start()
+    try:
+        while True:
+            time.sleep(10)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        app.stop()
+        app.save(args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""
+ネットワーク記録（オプトイン）
+
+HARNESS_NETWORK_CAPTURE=1 のとき、Chrome のパフォーマンスログに流れる CDP の Network イベントを読み取り、
+各リクエストの URL・ステータス・タイミング内訳・転送サイズを実行中のステップに添付する。
+長時間実行でもメモリが増え続けないよう、ステップごと（MAX_PER_STEP）と実行全体（HARNESS_NETWORK_MAX_ENTRIES、
+既定 MAX_PER_RUN）の両方に上限を設ける。上限を超えた分は記録せず、件数だけを network_dropped と
+meta の network に残す。
+
+パフォーマンスログは get_log('performance') で読んだ分がバッファから消えるため、同じドライバーのログを読む記録器は
+performance_log(driver) の PerformanceLog を購読し、自分で get_log を呼ばない。
+"""
+
+import collections
+import json
+import os
+import threading
+import weakref
+from urllib.parse import urlparse
+
+from .steps import recorder as default_recorder
+
+# ステップごとに添付するリクエスト数の上限
+MAX_PER_STEP = 200
+# 実行全体で添付するリクエスト数の上限（StepRecorder はすべてのステップを保持するため）
+MAX_PER_RUN = 20000
+
+_active = None
+_logs = weakref.WeakKeyDictionary()
+_logs_lock = threading.Lock()
+
+
+def is_enabled():
+    """環境変数でネットワーク記録が有効になっているか"""
+    return os.getenv("HARNESS_NETWORK_CAPTURE", "0").lower() in ("1", "true", "yes")
+
+
+def enable_performance_log(chrome_options):
+    """ChromeOptions にパフォーマンスログ（Network イベント）の取得設定を追加"""
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    chrome_options.add_experimental_option('perfLoggingPrefs', {
+        'enableNetwork': True,
+        'enablePage': False,
+    })
+    return chrome_options
+
+
+def _phases(timing, total_ms):
+    """CDP の ResourceTiming を区間ごとの所要時間（ms）に変換"""
+    if not timing:
+        return {}
+
+    def span(start, end):
+        s, e = timing.get(start, -1), timing.get(end, -1)
+        return round(e - s, 2) if s >= 0 and e >= 0 else None
+
+    headers_end = timing.get('receiveHeadersEnd', -1)
+    return {
+        'dns': span('dnsStart', 'dnsEnd'),
+        'connect': span('connectStart', 'connectEnd'),
+        'ssl': span('sslStart', 'sslEnd'),
+        'send': span('sendStart', 'sendEnd'),
+        'wait': span('sendEnd', 'receiveHeadersEnd'),
+        'receive': round(total_ms - headers_end, 2) if headers_end >= 0 and total_ms is not None else None,
+    }
+
+
+class PerformanceLog:
+    """1つのドライバーのパフォーマンスログを読み取り、購読者全員に同じメッセージを配る"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """callback(messages) を登録（messages は CDP メッセージの dict のリスト）"""
+        with self._lock:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def pump(self):
+        """溜まったログを読み取って購読者に配る"""
+        with self._lock:
+            try:
+                logs = self.driver.get_log('performance')
+            except Exception:
+                return
+            messages = [json.loads(log['message'])['message'] for log in logs]
+            if messages:
+                for callback in list(self.subscribers):
+                    callback(messages)
+
+
+def performance_log(driver):
+    """ドライバーごとに1つの PerformanceLog"""
+    with _logs_lock:
+        log = _logs.get(driver)
+        if log is None:
+            log = _logs[driver] = PerformanceLog(driver)
+        return log
+
+
+class NetworkRecorder:
+    """パフォーマンスログを読み取ってリクエストごとの記録を作る"""
+
+    def __init__(self, driver, max_entries=1000, steps=None):
+        self.driver = driver
+        self.entries = collections.deque(maxlen=max_entries)
+        self._pending = collections.OrderedDict()
+        self._max_pending = max_entries
+        self.steps = steps or default_recorder
+        self.steps.add_listener(self)
+        # 他の記録器が先にログを読んでも取りこぼさないよう、配られたメッセージを溜めておく
+        self._messages = []
+        self.log = performance_log(driver)
+        self.log.subscribe(self._messages.extend)
+        # 実行全体の件数はドライバーを作り直しても引き継ぐよう、StepRecorder の meta に持つ
+        self.totals = self.steps.meta.setdefault('network', {
+            'max_entries': int(os.getenv("HARNESS_NETWORK_MAX_ENTRIES", MAX_PER_RUN)),
+            'attached': 0,
+            'dropped': 0,
+        })
+
+    def detach(self):
+        self.steps.remove_listener(self)
+        self.log.unsubscribe(self._messages.extend)
+
+    def on_step_start(self, step):
+        # ステップ開始前の通信は直前のステップ（あれば親）に帰属させる
+        self._attach(step.parent, self.poll())
+
+    def on_step_end(self, step):
+        self._attach(step, self.poll())
+
+    def _attach(self, step, completed):
+        if step is None or not completed:
+            return
+        records = step.data.setdefault('network', [])
+        room = max(min(MAX_PER_STEP - len(records), self.totals['max_entries'] - self.totals['attached']), 0)
+        records.extend(completed[:room])
+        self.totals['attached'] += min(len(completed), room)
+        if len(completed) > room:
+            dropped = len(completed) - room
+            step.data['network_dropped'] = step.data.get('network_dropped', 0) + dropped
+            self.totals['dropped'] += dropped
+
+    def _complete(self, request_id, **fields):
+        entry = self._pending.pop(request_id, None)
+        if entry is None:
+            return None
+        end = fields.pop('end_ts', None)
+        entry.update(fields)
+        if end is not None and entry.get('start_ts') is not None:
+            entry['total_ms'] = round((end - entry['start_ts']) * 1000, 2)
+        entry['phases'] = _phases(entry.pop('timing', None), entry.get('total_ms'))
+        self.entries.append(entry)
+        return entry
+
+    def poll(self):
+        """溜まったログを読み取り、完了したリクエストの記録を返す"""
+        self.log.pump()
+        messages, self._messages[:] = list(self._messages), []
+
+        completed = []
+        for message in messages:
+            method = message.get('method', '')
+            params = message.get('params', {})
+            request_id = params.get('requestId')
+
+            if method == 'Network.requestWillBeSent':
+                # リダイレクトは同じ requestId で届くので、前のリクエストをここで確定させる
+                redirect = params.get('redirectResponse')
+                if redirect and request_id in self._pending:
+                    self._pending[request_id].update(timing=redirect.get('timing'))
+                    done = self._complete(
+                        request_id,
+                        status=redirect.get('status'),
+                        end_ts=params.get('timestamp'),
+                        encoded_size=redirect.get('encodedDataLength'),
+                    )
+                    if done:
+                        completed.append(done)
+
+                request = params.get('request', {})
+                self._pending[request_id] = {
+                    'url': request.get('url'),
+                    'path': urlparse(request.get('url', '')).path,
+                    'method': request.get('method'),
+                    'type': params.get('type'),
+                    'start_ts': params.get('timestamp'),
+                    'wall_time': params.get('wallTime'),
+                    'status': None,
+                }
+                while len(self._pending) > self._max_pending:
+                    self._pending.popitem(last=False)
+
+            elif method == 'Network.responseReceived' and request_id in self._pending:
+                response = params.get('response', {})
+                self._pending[request_id].update(
+                    status=response.get('status'),
+                    mime_type=response.get('mimeType'),
+                    from_cache=response.get('fromDiskCache', False),
+                    timing=response.get('timing'),
+                )
+
+            elif method == 'Network.loadingFinished':
+                done = self._complete(
+                    request_id,
+                    end_ts=params.get('timestamp'),
+                    encoded_size=params.get('encodedDataLength'),
+                )
+                if done:
+                    completed.append(done)
+
+            elif method == 'Network.loadingFailed':
+                done = self._complete(
+                    request_id,
+                    end_ts=params.get('timestamp'),
+                    error=params.get('errorText'),
+                    canceled=params.get('canceled', False),
+                )
+                if done:
+                    completed.append(done)
+
+        return completed
+
+
+def attach(driver, max_entries=1000):
+    """ドライバーにレコーダーを接続（前のドライバーのレコーダーは切り離す）"""
+    global _active
+    if _active is not None:
+        _active.detach()
+    _active = NetworkRecorder(driver, max_entries=max_entries)
+    return _active
+
+
+def report_current_step():
+    """実行中ステップの通信を取り込み、失敗・遅いリクエストを表示"""
+    step = default_recorder.current()
+    if _active is None or step is None:
+        return
+    _active._attach(step, _active.poll())
+
+    records = step.data.get('network', [])
+    documents = [r for r in records if r.get('type') in ('Document', 'XHR', 'Fetch')]
+    failed = [r for r in documents if r.get('error') or (r.get('status') or 0) >= 400]
+    for r in failed:
+        print(f"   🌐 {r['method']} {r['path']} → {r.get('status') or r.get('error')} ({r.get('total_ms')}ms)")
+    if documents:
+        slowest = max(documents, key=lambda r: r.get('total_ms') or 0)
+        phases = slowest.get('phases') or {}
+        print(f"   🐢 Slowest: {slowest['method']} {slowest['path']} {slowest.get('total_ms')}ms "
+              f"(wait {phases.get('wait')}ms, status {slowest.get('status')})")
@@ -0,0 +1,149 @@
+"""
+New Relic コレクターの代替サーバー
+
+PHP エージェントのデーモンが送る preconnect / connect に最小限の応答を返し、
+以降のハーベスト（metric_data, analytic_event_data など）を受け取って件数・サイズだけ記録する。
+実アカウントなしでエージェントを「接続済み」の状態にし、計測のオーバーヘッドを測るために使う。
+
+デーモンは HTTPS でしか接続しないため、証明書を指定して起動し、
+アプリ側には newrelic.daemon.ssl_ca_bundle でその証明書を信頼させる（docker-compose.nrbench.yml）。
+
+単体起動:
+python -m harness.nr_collector --port 443 --certfile cert.pem --keyfile key.pem
+"""
+
+import argparse
+import collections
+import gzip
+import json
+import ssl
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def _decode(body, encoding):
+    """gzip / deflate で圧縮されたペイロードを展開"""
+    try:
+        if encoding == 'gzip':
+            return gzip.decompress(body)
+        if encoding == 'deflate':
+            return zlib.decompress(body)
+    except (OSError, zlib.error):
+        pass
+    return body
+
+
+class DummyCollector:
+    """エージェントのハーベストを受け取って記録するだけのコレクター"""
+
+    def __init__(self, host='0.0.0.0', port=443, certfile=None, keyfile=None,
+                 redirect_host=None, report_period=60, max_records=10000):
+        self.host = host
+        self.port = port
+        self.certfile = certfile
+        self.keyfile = keyfile
+        self.redirect_host = redirect_host
+        self.report_period = report_period
+        self.records = collections.deque(maxlen=max_records)
+        self.run_id = uuid.uuid4().hex
+        self._server = None
+        self._thread = None
+
+    def respond(self, method, host):
+        """プロトコルのメソッドごとの応答（return_value）"""
+        if method == 'preconnect':
+            return {'redirect_host': self.redirect_host or host}
+        if method == 'connect':
+            return {
+                'agent_run_id': self.run_id,
+                'entity_guid': f"harness-{self.run_id[:12]}",
+                'data_report_period': self.report_period,
+                'request_headers_map': {},
+                'collect_traces': True,
+                'collect_errors': True,
+                'collect_analytics_events': True,
+            }
+        return None
+
+    def _record(self, method, body):
+        self.records.append({'received_at': time.time(), 'method': method, 'size': len(body)})
+
+    def _handler(self):
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = _decode(self.rfile.read(length), self.headers.get('Content-Encoding'))
+                query = parse_qs(urlparse(self.path).query)
+                method = query.get('method', [''])[0]
+                collector._record(method, body)
+
+                host = (self.headers.get('Host') or '').split(':')[0]
+                payload = json.dumps({'return_value': collector.respond(method, host)}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        if self.certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(self.certfile, self.keyfile)
+            self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        scheme = 'https' if self.certfile else 'http'
+        print(f"📡 Dummy New Relic collector listening on {scheme}://{self.host}:{self.port}")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def summary(self):
+        records = list(self.records)
+        return {
+            'count': len(records),
+            'bytes': sum(r['size'] for r in records),
+            'by_method': dict(collections.Counter(r['method'] for r in records)),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="New Relic コレクターの代替サーバー")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=443)
+    parser.add_argument('--certfile')
+    parser.add_argument('--keyfile')
+    parser.add_argument('--redirect-host', help="preconnect で返すホスト名（省略時は Host ヘッダー）")
+    parser.add_argument('--report-period', type=int, default=60)
+    args = parser.parse_args()
+
+    collector = DummyCollector(args.host, args.port, certfile=args.certfile, keyfile=args.keyfile,
+                               redirect_host=args.redirect_host, report_period=args.report_period).start()
+    try:
+        while True:
+            time.sleep(30)
+            print(f"📊 {collector.summary()}", flush=True)
+    except KeyboardInterrupt:
+        collector.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+ログイン情報の事前チェック
+
+ブラウザを起動する前に、名簿の全ユーザーで HTTP ログインを並列に試し、
+- ログインできない（メールアドレスの形式・未登録・パスワード違い）
+- 組織が未設定（users.organization_id が NULL か存在しない組織を指している）
+- ロールが想定と違う（申請者なのに承認者、承認者なのに「承認待ち」メニューがない など）
+を数秒で洗い出す。問題のあるユーザーは実行対象から外す。
+
+組織は DB に接続できる場合だけ確認する（接続設定は db_status と共通）。
+ロールはヘッダーのユーザーメニューの表示と、承認待ちメニュー（#applicationsBtn）の有無で判定する。
+
+python -m harness.preflight --role approver nakamura.keiko@wf.nrkk.technology kimura.tomoko@wf.nrkk.technology
+"""
+
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from .http_client import AppClient
+
+# 名簿の種類ごとに許容するロール（User::isReviewer と同じ範囲を承認者とみなす）
+EXPECTED_ROLES = {
+    'applicant': {'applicant'},
+    'approver': {'reviewer', 'approver', 'admin'},
+    'admin': {'admin'},
+}
+
+_EMAIL = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+_ROLE = re.compile(r'<span class="dropdown-item-text">\s*([a-z_]+)\s*</span>')
+
+
+def is_enabled():
+    return os.getenv("HARNESS_PREFLIGHT", "1").lower() not in ("0", "false", "no")
+
+
+def check_user(user, kind, base_url=None, password='password'):
+    """1ユーザー分のログイン・ロールの確認。problems が空なら問題なし"""
+    result = {'email': user['email'], 'name': user.get('name'), 'kind': kind, 'problems': []}
+    if not _EMAIL.match(user['email']):
+        result['problems'].append('invalid_email')
+        return result
+
+    client = AppClient(base_url, timeout=15)
+    try:
+        if not client.login(user['email'], password):
+            result['problems'].append('login_failed')
+            return result
+        html = client.last_response.text
+    except Exception as e:
+        result['problems'].append('login_error')
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+
+    match = _ROLE.search(html)
+    result['role'] = match.group(1) if match else None
+    result['approvals_menu'] = 'id="applicationsBtn"' in html
+    if result['role'] not in EXPECTED_ROLES[kind]:
+        result['problems'].append('role_mismatch')
+    elif kind != 'applicant' and not result['approvals_menu']:
+        result['problems'].append('role_mismatch')
+    return result
+
+
+def fetch_organizations(emails):
+    """メールアドレス → (organization_id, 組織名)。DB に接続できなければ None"""
+    try:
+        from .db_status import connect_from_env
+
+        connection = connect_from_env()
+    except Exception as e:
+        print(f"   ⚠️ Organization check skipped (database unavailable: {e})")
+        return None
+    try:
+        placeholders = ', '.join(['%s'] * len(emails))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT u.email, u.organization_id, o.name FROM users u "
+                f"LEFT JOIN organizations o ON o.id = u.organization_id WHERE u.email IN ({placeholders})",
+                list(emails),
+            )
+            return {email: (org_id, org_name) for email, org_id, org_name in cursor.fetchall()}
+    finally:
+        connection.close()
+
+
+def run(users, kind, base_url=None, workers=8, check_org=True):
+    """名簿のユーザーを並列に確認し、ユーザーごとの結果を返す"""
+    users = list(users)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(users) or 1))) as executor:
+        results = list(executor.map(lambda u: check_user(u, kind, base_url), users))
+
+    organizations = fetch_organizations([u['email'] for u in users]) if check_org and users else None
+    if organizations is not None:
+        for result in results:
+            org_id, org_name = organizations.get(result['email'], (None, None))
+            result['organization'] = org_name
+            # ログインできたユーザーだけ判定する（ログイン失敗は既に問題として記録済み）
+            if org_name is None and 'role' in result:
+                result['problems'].append('missing_organization')
+    return results
+
+
+def print_report(results):
+    bad = [r for r in results if r['problems']]
+    print(f"🔑 Preflight: {len(results) - len(bad)}/{len(results)} users OK")
+    for r in bad:
+        detail = f" (role: {r['role']})" if r.get('role') else ''
+        print(f"   ❌ {r['email']}: {', '.join(r['problems'])}{detail}")
+
+
+def filter_users(users, kind, base_url=None, workers=8, path=None):
+    """問題のないユーザーだけを返す。HARNESS_PREFLIGHT=0 ならそのまま返す"""
+    if not is_enabled():
+        return list(users)
+    results = run(users, kind, base_url, workers)
+    print_report(results)
+    if results and all('login_error' in r['problems'] for r in results):
+        raise SystemExit(f"❌ Preflight could not reach the application: {results[0].get('error')}")
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    bad = {r['email'] for r in results if r['problems']}
+    return [u for u in users if u['email'] not in bad]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ログイン情報の事前チェック")
+    parser.add_argument('emails', nargs='+')
+    parser.add_argument('--role', choices=sorted(EXPECTED_ROLES), default='applicant', help="名簿の種類")
+    parser.add_argument('--base-url', default=None)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--no-org', action='store_true', help="DB での組織の確認を省略する")
+    parser.add_argument('--output', default='preflight_report.json')
+    args = parser.parse_args(argv)
+
+    results = run([{'email': e} for e in args.emails], args.role, args.base_url, args.workers,
+                  check_org=not args.no_org)
+    print_report(results)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    if any(r['problems'] for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
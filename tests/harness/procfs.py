@@ -0,0 +1,74 @@
+"""
+/proc からのプロセス情報（Linux のみ）
+
+ハーネスがローカルで起動したプロセス（chromedriver と Chrome）の CPU 時間やメモリを、
+ハーネスのプロセスからたどった子孫プロセスについて読み取る。/proc がない環境では None を返す。
+"""
+
+import os
+
+
+def _children():
+    """/proc から 親 PID → 子 PID のリストを作る"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # comm に空白や括弧を含むことがあるので最後の ')' の後ろから読む
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+    return children
+
+
+def descendants(pid, include_root=False):
+    """pid の子孫プロセスの PID のリスト"""
+    tree = _children()
+    pids = [pid] if include_root else []
+    stack = list(tree.get(pid, []))
+    while stack:
+        child = stack.pop()
+        pids.append(child)
+        stack.extend(tree.get(child, []))
+    return pids
+
+
+def _cpu_seconds(pid):
+    """プロセスの CPU 時間（user + system、秒）"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+    except OSError:
+        return None
+    # ')' の後ろの 12・13 番目が utime・stime（クロック tick）
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def process_tree_cpu(pid, include_root=False):
+    """pid の子孫プロセスごとの CPU 時間（{PID: 秒}）。/proc がなければ None"""
+    if not pid or not os.path.isdir('/proc'):
+        return None
+    times = {p: _cpu_seconds(p) for p in descendants(pid, include_root)}
+    return {p: t for p, t in times.items() if t is not None}
+
+
+def _rss_kb(pid):
+    """プロセスの RSS（KB）。読めなければ 0"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree_rss(pid, include_root=False):
+    """pid の子孫プロセスの RSS の合計（MB）。/proc がなければ None"""
+    if not pid or not os.path.isdir('/proc'):
+        return None
+    return sum(_rss_kb(p) for p in descendants(pid, include_root)) / 1024
@@ -0,0 +1,239 @@
+"""
+スロークエリログによる SQL のステップ帰属
+
+実行中だけ MariaDB のスロークエリログを long_query_time=0・TABLE 出力で有効にし、全クエリを所要時間付きで記録する。
+各ステップの開始・終了時にハーネスの接続から目印のクエリ（SELECT 'harness-step:...'）を流し、
+ログ上の目印の位置（DB 側の時刻）でアプリのクエリをステップに振り分ける。
+終了後にステップごとのクエリ数・合計時間・正規化した上位ステートメントを報告するため、
+ApprovalService::getApprovals や DashboardService::getStatistics の N+1 が見える。
+
+HARNESS_QUERY_LOG=1 で有効化（接続設定は db_status と共通）。
+ハーネスの接続（目印を流す接続、db_status のサンプラー）のクエリはアプリのクエリとして数えない。
+変更したログ設定は finish で戻し、途中で異常終了した場合も終了時に戻す。
+"""
+
+import atexit
+import collections
+import json
+import os
+import re
+import time
+import uuid
+
+from .db_status import connect_from_env, note_own_query, own_thread_ids
+
+MARKER_PREFIX = 'harness-step:'
+_MARKER = re.compile(r"harness-step:(start|end):([0-9a-f]+)")
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def is_enabled():
+    return os.getenv("HARNESS_QUERY_LOG", "0").lower() in ("1", "true", "yes")
+
+
+def normalize(sql):
+    """リテラルを ? に置き換えて同じ形のクエリをまとめる"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def _seconds(value):
+    """TIME 型（timedelta）を秒に変換"""
+    return value.total_seconds() if hasattr(value, 'total_seconds') else float(value or 0)
+
+
+class QueryLogCapture:
+    """スロークエリログを有効化し、ステップ境界に目印を流すリスナー"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._markers = {}
+        self._saved = {}
+        self._closed = False
+        self.started_at = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(connect_from_env())
+
+    def _execute(self, sql, args=None):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, args)
+            return cursor.fetchall()
+
+    def enable(self):
+        """現在の設定を退避して全クエリを mysql.slow_log に記録する"""
+        for name in ('slow_query_log', 'long_query_time', 'log_output'):
+            self._saved[name] = self._execute(f"SELECT @@GLOBAL.{name}")[0][0]
+        self.thread_id = self._execute("SELECT CONNECTION_ID()")[0][0]
+        self.started_at = self._execute("SELECT NOW(6)")[0][0]
+        self._execute("SET GLOBAL log_output = 'TABLE'")
+        self._execute("SET GLOBAL long_query_time = 0")
+        # 目印のクエリも記録されるよう、この接続のセッション値も変更する
+        self._execute("SET SESSION long_query_time = 0")
+        self._execute("SET GLOBAL slow_query_log = 1")
+
+    def disable(self):
+        """退避した設定に戻す"""
+        if not self._saved:
+            return
+        self._execute("SET GLOBAL slow_query_log = %s", (self._saved['slow_query_log'],))
+        self._execute("SET GLOBAL long_query_time = %s", (self._saved['long_query_time'],))
+        self._execute("SET GLOBAL log_output = %s", (self._saved['log_output'],))
+        self._saved = {}
+
+    def _mark(self, kind, step):
+        marker = self._markers.setdefault(id(step), uuid.uuid4().hex[:12])
+        self._execute(f"SELECT '{MARKER_PREFIX}{kind}:{marker}'")
+        note_own_query({'Questions': 1, 'Com_select': 1})
+        step.data['query_marker'] = marker
+
+    def on_step_start(self, step):
+        self._mark('start', step)
+
+    def on_step_end(self, step):
+        self._mark('end', step)
+
+    def fetch(self):
+        """記録開始以降のスロークエリログを取得"""
+        rows = self._execute(
+            "SELECT start_time, query_time, rows_examined, thread_id, sql_text "
+            "FROM mysql.slow_log WHERE start_time >= %s ORDER BY start_time",
+            (self.started_at,),
+        )
+        entries = []
+        for start_time, query_time, rows_examined, thread_id, sql_text in rows:
+            if isinstance(sql_text, bytes):
+                sql_text = sql_text.decode('utf-8', errors='replace')
+            entries.append({
+                'start_time': start_time,
+                'query_time': _seconds(query_time),
+                'rows_examined': rows_examined,
+                'thread_id': thread_id,
+                'sql': sql_text,
+            })
+        return entries
+
+    def close(self):
+        """ログ設定を戻して接続を閉じる（2回目以降は何もしない）"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.disable()
+        finally:
+            self.connection.close()
+
+
+def attribute(entries, steps, own_thread_ids):
+    """目印の位置で区切った時間帯に、アプリのクエリを最も内側のステップとして割り当てる
+
+    own_thread_ids はハーネスの接続の CONNECTION_ID() の集合で、これらの接続のクエリはアプリのものとして数えない。
+    """
+    windows = {}
+    for entry in entries:
+        match = _MARKER.search(entry['sql'])
+        if match and entry['thread_id'] in own_thread_ids:
+            kind, marker = match.groups()
+            windows.setdefault(marker, {})[kind] = entry['start_time']
+
+    by_marker = {s.data.get('query_marker'): s for s in steps if s.data.get('query_marker')}
+    spans = []
+    for marker, window in windows.items():
+        if 'start' in window and 'end' in window and marker in by_marker:
+            spans.append((window['start'], window['end'], by_marker[marker]))
+    # 開始が遅く短い区間ほど内側
+    spans.sort(key=lambda s: (s[0], -(s[1] - s[0]).total_seconds()), reverse=True)
+
+    attributed = collections.defaultdict(list)
+    for entry in entries:
+        if entry['thread_id'] in own_thread_ids:
+            continue
+        for start, end, step in spans:
+            if start <= entry['start_time'] <= end:
+                attributed[id(step)].append(entry)
+                break
+    return attributed
+
+
+def step_report(steps, attributed, top=5):
+    """ステップごとのクエリ数・合計時間・上位ステートメント"""
+    report = []
+    for step in steps:
+        queries = attributed.get(id(step), [])
+        if not queries or step.warmup:
+            continue
+        grouped = collections.OrderedDict()
+        for q in queries:
+            key = normalize(q['sql'])
+            g = grouped.setdefault(key, {'statement': key, 'count': 0, 'total_ms': 0.0, 'rows_examined': 0})
+            g['count'] += 1
+            g['total_ms'] += q['query_time'] * 1000
+            g['rows_examined'] += q['rows_examined'] or 0
+        statements = sorted(grouped.values(), key=lambda g: (g['count'], g['total_ms']), reverse=True)
+        report.append({
+            'step': step.name,
+            'phase': step.phase,
+            'attrs': step.attrs,
+            'queries': len(queries),
+            'total_ms': round(sum(q['query_time'] for q in queries) * 1000, 2),
+            'top_statements': statements[:top],
+        })
+    return report
+
+
+def print_report(report):
+    print("\n📊 SQL by step")
+    for r in report:
+        user = r['attrs'].get('user', '')
+        print(f"   {r['step']} {user}: {r['queries']} queries, {r['total_ms']:.1f}ms")
+        for s in r['top_statements'][:3]:
+            print(f"      {s['count']:>4}x {s['total_ms']:>8.1f}ms  {s['statement'][:100]}")
+
+
+def attach(recorder):
+    """HARNESS_QUERY_LOG=1 のときログを有効化してレコーダーに接続"""
+    if not is_enabled():
+        return None
+    try:
+        capture = QueryLogCapture.from_env()
+    except Exception as e:
+        print(f"⚠️ Query log capture disabled: {e}")
+        return None
+    try:
+        capture.enable()
+    except Exception as e:
+        # 途中まで変更した設定を戻す
+        capture.close()
+        print(f"⚠️ Query log capture disabled: {e}")
+        return None
+    # 実行が途中で異常終了しても DB のログ設定を元に戻す
+    atexit.register(capture.close)
+    recorder.add_listener(capture)
+    print("📝 Query log capture enabled (slow_query_log, long_query_time=0)")
+    return capture
+
+
+def finish(capture, recorder, path='query_log_report.json'):
+    """ログ設定を戻し、ステップごとの SQL を集計して保存"""
+    if capture is None:
+        return None
+    recorder.remove_listener(capture)
+    try:
+        entries = capture.fetch()
+        attributed = attribute(entries, recorder.steps, own_thread_ids() | {capture.thread_id})
+        report = step_report(recorder.steps, attributed)
+    finally:
+        capture.close()
+
+    print_report(report)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'recorded_at': time.time(), 'steps': report}, f, ensure_ascii=False, indent=2)
+    print(f"📁 Query log report saved to {path}")
+    return report
@@ -0,0 +1,157 @@
+"""
+起動待ちの準備完了チェック
+
+固定の sleep の代わりに、必要なものが実際に使えるようになるまで指数バックオフで確認する。
+- app:  /login が 200 でログインフォームを返す
+- db:   MariaDB が SELECT 1 に応答する（接続設定は db_status と共通）
+- hub:  Selenium Grid の /status が ready: true を返す
+- xvfb: DISPLAY の X サーバーのソケット（/tmp/.X11-unix/X99 など）が存在する
+
+全部そろった時点ですぐ戻り、タイムアウトしたらどのチェックが何で失敗していたかを表示して終了コード 1 を返す。
+起動直後に使うため HTTP は標準ライブラリだけで行う。
+
+python -m harness.ready --check app --check db --check hub --timeout 120
+"""
+
+import argparse
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+DEFAULT_APP_URL = os.getenv("APP_URL", "http://localhost:8080")
+DEFAULT_HUB_URL = os.getenv("SELENIUM_HUB_URL", "http://localhost:4444")
+
+
+class NotReady(Exception):
+    """まだ準備ができていない（再試行する）"""
+
+
+def _fetch(url, timeout=5):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status, response.read().decode('utf-8', errors='replace')
+    except urllib.error.HTTPError as e:
+        return e.code, ''
+    except OSError as e:
+        raise NotReady(f"{url}: {e}")
+
+
+def check_app(app_url=DEFAULT_APP_URL):
+    status, body = _fetch(f"{app_url.rstrip('/')}/login")
+    if status != 200:
+        raise NotReady(f"/login returned HTTP {status}")
+    if 'name="email"' not in body or 'name="password"' not in body:
+        raise NotReady("/login did not contain the login form")
+
+
+def check_db():
+    from .db_status import connect_from_env
+
+    try:
+        connection = connect_from_env()
+    except ImportError:
+        raise
+    except Exception as e:
+        raise NotReady(f"database: {e}")
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    finally:
+        connection.close()
+
+
+def check_hub(hub_url=DEFAULT_HUB_URL):
+    base = hub_url.rstrip('/')
+    if base.endswith('/wd/hub'):
+        base = base[:-len('/wd/hub')]
+    status, body = _fetch(f"{base}/status")
+    if status != 200:
+        raise NotReady(f"hub /status returned HTTP {status}")
+    try:
+        value = json.loads(body).get('value', {})
+    except ValueError:
+        raise NotReady("hub /status was not JSON")
+    if not value.get('ready'):
+        raise NotReady(f"hub not ready: {value.get('message', 'no message')}")
+
+
+def xvfb_socket(display=None):
+    display = display or os.getenv("DISPLAY", ":99")
+    number = display.rsplit(':', 1)[-1].split('.')[0]
+    return f"/tmp/.X11-unix/X{number}"
+
+
+def check_xvfb(display=None):
+    path = xvfb_socket(display)
+    if not os.path.exists(path):
+        raise NotReady(f"{path} does not exist yet")
+
+
+CHECKS = {
+    'app': check_app,
+    'db': check_db,
+    'hub': check_hub,
+    'xvfb': check_xvfb,
+}
+
+
+def wait_until_ready(checks, timeout=120, initial_delay=0.25, max_delay=5.0, factor=2.0, verbose=True):
+    """各チェックが通るまで指数バックオフで再試行。通らなかったチェックとその理由を返す（空なら成功）
+
+    checks は CHECKS の名前のリストか、名前 → 関数の dict。
+    """
+    pending = dict(checks) if isinstance(checks, dict) else {name: CHECKS[name] for name in checks}
+    last_errors = {}
+    started = time.time()
+    delay = initial_delay
+    while pending:
+        for name, check in list(pending.items()):
+            try:
+                check()
+            except NotReady as e:
+                last_errors[name] = str(e)
+                continue
+            pending.pop(name)
+            last_errors.pop(name, None)
+            if verbose:
+                print(f"✅ {name} ready after {time.time() - started:.1f}s")
+        if not pending:
+            break
+        remaining = timeout - (time.time() - started)
+        if remaining <= 0:
+            break
+        time.sleep(min(delay, remaining))
+        delay = min(delay * factor, max_delay)
+    return {name: last_errors.get(name, 'not checked') for name in pending}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="起動待ちの準備完了チェック")
+    parser.add_argument('--check', action='append', choices=sorted(CHECKS),
+                        help="確認する項目（複数指定可、省略時は app と db）")
+    parser.add_argument('--app-url', default=DEFAULT_APP_URL)
+    parser.add_argument('--hub-url', default=DEFAULT_HUB_URL)
+    parser.add_argument('--timeout', type=float, default=float(os.getenv("READY_TIMEOUT", "120")))
+    args = parser.parse_args(argv)
+
+    available = dict(CHECKS, app=lambda: check_app(args.app_url), hub=lambda: check_hub(args.hub_url))
+    checks = args.check or ['app', 'db']
+
+    started = time.time()
+    try:
+        failed = wait_until_ready({name: available[name] for name in checks}, timeout=args.timeout)
+    except ImportError as e:
+        raise SystemExit(f"❌ Readiness check cannot run: {e}")
+    if failed:
+        print(f"❌ Not ready after {args.timeout:.0f}s:")
+        for name, error in failed.items():
+            print(f"   {name}: {error}")
+        raise SystemExit(1)
+    print(f"🚀 All checks ready in {time.time() - started:.1f}s ({', '.join(checks)})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+実行単位の乱数シード
+
+1回の実行で使う乱数をすべて1つのシードから導出し、結果と一緒に保存する。
+仮想ユーザー（メールアドレスなど）ごとに独立したストリームを派生させるため、
+ユーザーの実行順や再開の有無に関係なく、同じシードなら同じ種類・金額・組織の組み合わせになる。
+
+シードは --seed、HARNESS_SEED の順で決まり、どちらもなければ新しく生成して表示する。
+遅かった実行は表示・保存されたシードを指定すればそのまま再現できる。
+"""
+
+import hashlib
+import os
+import random
+
+_seed = None
+
+
+def resolve(seed=None):
+    """--seed → HARNESS_SEED → 新規生成 の順でシードを決める"""
+    if seed is not None:
+        return int(seed)
+    env = os.getenv("HARNESS_SEED")
+    if env:
+        return int(env)
+    return random.SystemRandom().randrange(2 ** 32)
+
+
+def init(seed=None):
+    """実行のシードを確定して表示する"""
+    global _seed
+    _seed = resolve(seed)
+    print(f"🎲 Run seed: {_seed} (replay with --seed {_seed} or HARNESS_SEED={_seed})")
+    return _seed
+
+
+def current():
+    """確定済みのシード（未確定なら環境変数などから確定する）"""
+    if _seed is None:
+        init()
+    return _seed
+
+
+def derive_seed(*key):
+    """シードとキーから、キーごとに独立した整数シードを導出"""
+    material = '|'.join([str(current())] + [str(k) for k in key])
+    return int.from_bytes(hashlib.sha256(material.encode('utf-8')).digest()[:8], 'big')
+
+
+def derive(*key):
+    """キー（例: 'application', email, index）ごとの乱数ストリーム"""
+    return random.Random(derive_seed(*key))
+
+
+def add_argument(parser):
+    parser.add_argument('--seed', type=int, default=None,
+                        help="乱数シード（省略時は HARNESS_SEED か新規生成。結果に保存される）")
@@ -0,0 +1,179 @@
+"""
+メール送信の代替 SMTP サーバー（asyncio）
+
+本番では ApplicationNotificationMail を SES で送信しているため負荷試験ができない。
+テスト実行時はアプリのメーラーをこのサーバーに向け（MAIL_MAILER=smtp / MAIL_HOST / MAIL_PORT）、
+受信件数・到着時刻を記録する。DATA 完了後の応答を遅らせて、遅い SMTP サーバーも再現できる。
+
+単体起動:
+python -m harness.smtp_sink --port 2525 --delay-ms 100
+"""
+
+import argparse
+import asyncio
+import collections
+import threading
+import time
+from email import message_from_bytes
+from email.policy import default as default_policy
+
+
+def _address(command):
+    """MAIL FROM:<addr> SIZE=... からアドレス部分を取り出す"""
+    argument = command.partition(':')[2].strip()
+    return argument.split()[0].strip('<>') if argument else ''
+
+
+class SmtpSink:
+    """受信したメールを記録する最小限の SMTP サーバー"""
+
+    def __init__(self, host='0.0.0.0', port=2525, delay_ms=0, max_records=10000):
+        self.host = host
+        self.port = port
+        self.delay_ms = delay_ms
+        self.messages = collections.deque(maxlen=max_records)
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    async def _reply(self, writer, line):
+        writer.write(f"{line}\r\n".encode())
+        await writer.drain()
+
+    async def _read_data(self, reader):
+        lines = []
+        while True:
+            line = await reader.readline()
+            if not line or line in (b".\r\n", b".\n"):
+                break
+            # ドット・スタッフィングを戻す
+            if line.startswith(b".."):
+                line = line[1:]
+            lines.append(line)
+        return b"".join(lines)
+
+    def _record(self, mail_from, recipients, data, session_started):
+        try:
+            subject = str(message_from_bytes(data, policy=default_policy).get('Subject', ''))
+        except Exception:
+            subject = ''
+        self.messages.append({
+            'received_at': time.time(),
+            'session_started_at': session_started,
+            'mail_from': mail_from,
+            'recipients': recipients,
+            'subject': subject,
+            'size': len(data),
+        })
+
+    async def _handle(self, reader, writer):
+        session_started = time.time()
+        mail_from, recipients = None, []
+        await self._reply(writer, "220 harness-smtp-sink ESMTP")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode(errors='replace').strip()
+                verb = command[:4].upper()
+
+                if verb == 'EHLO':
+                    await self._reply(writer, "250-harness-smtp-sink")
+                    await self._reply(writer, "250-8BITMIME")
+                    await self._reply(writer, "250 SIZE 52428800")
+                elif verb == 'HELO':
+                    await self._reply(writer, "250 harness-smtp-sink")
+                elif verb == 'MAIL':
+                    mail_from = _address(command)
+                    recipients = []
+                    await self._reply(writer, "250 OK")
+                elif verb == 'RCPT':
+                    recipients.append(_address(command))
+                    await self._reply(writer, "250 OK")
+                elif verb == 'DATA':
+                    await self._reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    data = await self._read_data(reader)
+                    if self.delay_ms:
+                        await asyncio.sleep(self.delay_ms / 1000.0)
+                    self._record(mail_from, recipients, data, session_started)
+                    await self._reply(writer, "250 OK queued")
+                elif verb in ('RSET', 'NOOP'):
+                    if verb == 'RSET':
+                        mail_from, recipients = None, []
+                    await self._reply(writer, "250 OK")
+                elif verb == 'QUIT':
+                    await self._reply(writer, "221 Bye")
+                    break
+                else:
+                    await self._reply(writer, "502 Command not implemented")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._server.close()
+        self._loop.run_until_complete(self._server.wait_closed())
+        self._loop.close()
+
+    def start(self):
+        """別スレッドのイベントループでサーバーを起動"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=10)
+        print(f"📮 SMTP sink listening on {self.host}:{self.port} (delay {self.delay_ms}ms)")
+        return self
+
+    def stop(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            self._loop = None
+
+    def since(self, start):
+        """指定時刻以降に届いたメール"""
+        return [m for m in list(self.messages) if m['received_at'] >= start]
+
+    def wait_for_quiet(self, start, quiet_seconds=2.0, timeout=60):
+        """一定時間新しいメールが届かなくなるまで待ち、start 以降のメールを返す"""
+        deadline = time.time() + timeout
+        last_count = -1
+        last_change = time.time()
+        while time.time() < deadline:
+            count = len(self.since(start))
+            if count != last_count:
+                last_count, last_change = count, time.time()
+            elif time.time() - last_change >= quiet_seconds:
+                break
+            time.sleep(0.1)
+        return self.since(start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="メール送信の代替 SMTP サーバー")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=2525)
+    parser.add_argument('--delay-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    sink = SmtpSink(args.host, args.port, delay_ms=args.delay_ms).start()
+    try:
+        while True:
+            time.sleep(10)
+            print(f"📊 {len(sink.messages)} messages received")
+    except KeyboardInterrupt:
+        sink.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+計測値の集計ヘルパー
+
+ベンチマーク結果の平均・パーセンタイルなどを標準ライブラリだけで計算する。
+"""
+
+import math
+
+
+def percentile(values, p):
+    """線形補間によるパーセンタイル（p は 0〜100）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * p / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return ordered[int(rank)]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def mean(values):
+    return sum(values) / len(values) if values else None
+
+
+def stdev(values):
+    """標本標準偏差"""
+    if len(values) < 2:
+        return 0.0
+    m = mean(values)
+    return math.sqrt(sum((v - m) ** 2 for v in values) / (len(values) - 1))
+
+
+def summarize(values):
+    """件数・平均・主要パーセンタイルをまとめて返す"""
+    return {
+        'count': len(values),
+        'mean': mean(values),
+        'min': min(values) if values else None,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values) if values else None,
+    }
+
+
+# 両側 95% の t 分布の臨界値（自由度 1〜30、それ以上は正規近似）
+_T95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+
+
+def t_critical(df):
+    """両側 95% の t 値（小数の自由度は切り捨てて保守側に寄せる）"""
+    df = int(df)
+    if df < 1:
+        return None
+    return _T95[df - 1] if df <= len(_T95) else 1.96
+
+
+def confidence_interval(values):
+    """平均の 95% 信頼区間 (mean, low, high)"""
+    if not values:
+        return None, None, None
+    m = mean(values)
+    if len(values) < 2:
+        return m, None, None
+    half = t_critical(len(values) - 1) * stdev(values) / math.sqrt(len(values))
+    return m, m - half, m + half
+
+
+def diff_interval(a, b):
+    """平均の差 (b - a) とその 95% 信頼区間（Welch の t）"""
+    if not a or not b:
+        return None, None, None
+    diff = mean(b) - mean(a)
+    if len(a) < 2 or len(b) < 2:
+        return diff, None, None
+    va, vb = stdev(a) ** 2 / len(a), stdev(b) ** 2 / len(b)
+    se = math.sqrt(va + vb)
+    if se == 0:
+        return diff, diff, diff
+    # Welch–Satterthwaite の自由度
+    df = (va + vb) ** 2 / ((va ** 2 / (len(a) - 1)) + (vb ** 2 / (len(b) - 1)))
+    half = t_critical(df) * se
+    return diff, diff - half, diff + half
+
+
+def coefficient_of_variation(values):
+    """変動係数（標準偏差 / 平均）。ばらつきが落ち着いたかの判定に使う"""
+    m = mean(values)
+    if not m or len(values) < 2:
+        return None
+    return stdev(values) / m
@@ -0,0 +1,178 @@
+"""
+ハーネスのステップ記録
+
+ログイン・申請作成・承認などの操作を「ステップ」として開始/終了時刻付きで記録する。
+ステップは入れ子にでき、最上位のステップがフェーズ（create, approve_all など）になる。
+ネットワーク記録などの計測器はリスナーとして登録し、ステップ境界で呼び出される。
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Step:
+    """1つの操作の記録"""
+
+    def __init__(self, name, attrs, parent=None):
+        self.name = name
+        self.attrs = attrs
+        self.parent = parent
+        self.started_at = time.time()
+        self.ended_at = None
+        self.status = 'running'
+        self.error = None
+        # 計測器が付与する追加データ（network など）
+        self.data = {}
+
+    @property
+    def root(self):
+        """最上位のステップ"""
+        step = self
+        while step.parent is not None:
+            step = step.parent
+        return step
+
+    @property
+    def phase(self):
+        """最上位ステップの名前"""
+        return self.root.name
+
+    @property
+    def warmup(self):
+        """ウォームアップ中の記録か（最上位ステップの warmup 属性）。集計からは除く"""
+        return bool(self.root.attrs.get('warmup'))
+
+    @property
+    def duration(self):
+        end = self.ended_at if self.ended_at is not None else time.time()
+        return end - self.started_at
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'phase': self.phase,
+            'warmup': self.warmup,
+            'parent': self.parent.name if self.parent else None,
+            'attrs': self.attrs,
+            'started_at': self.started_at,
+            'ended_at': self.ended_at,
+            'duration': self.duration,
+            'status': self.status,
+            'error': self.error,
+            **self.data,
+        }
+
+
+class StepRecorder:
+    """ステップの開始・終了を記録し、リスナーに通知する"""
+
+    def __init__(self):
+        self.steps = []
+        self.listeners = []
+        # 実行全体の情報（シード・ネットワーク記録の件数など）。保存時にステップと一緒に書き出す
+        self.meta = {}
+        self._local = threading.local()
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def add_listener(self, listener):
+        """on_step_start(step) / on_step_end(step) を持つオブジェクトを登録"""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def _notify(self, event, step):
+        for listener in list(self.listeners):
+            handler = getattr(listener, event, None)
+            if handler:
+                try:
+                    handler(step)
+                except Exception as e:
+                    print(f"   ⚠️ Step listener error ({type(listener).__name__}): {e}")
+
+    def current(self):
+        """実行中の最も内側のステップ（なければ None）"""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def step(self, name, **attrs):
+        stack = self._stack()
+        step = Step(name, attrs, parent=stack[-1] if stack else None)
+        stack.append(step)
+        self.steps.append(step)
+        self._notify('on_step_start', step)
+        try:
+            yield step
+            step.status = 'ok'
+        except Exception as e:
+            step.status = 'error'
+            step.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            step.ended_at = time.time()
+            self._notify('on_step_end', step)
+            stack.pop()
+
+    def to_list(self):
+        return [s.to_dict() for s in self.steps]
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'meta': self.meta, 'steps': self.to_list()}, f, ensure_ascii=False, indent=2)
+        print(f"📁 Step records saved to {path}")
+
+
+def load(path):
+    """save() で保存した記録を (meta, ステップのリスト) で読み込む（meta のない古い形式も読む）"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return {}, data
+    return data.get('meta', {}), data.get('steps', [])
+
+
+def summary(steps):
+    """(フェーズ, ステップ名) ごとの所要時間の集計。ウォームアップ中の記録は除く"""
+    from .stats import summarize
+
+    durations = {}
+    errors = {}
+    for s in steps:
+        if s.get('warmup'):
+            continue
+        key = (s.get('phase'), s['name'])
+        durations.setdefault(key, []).append(s['duration'])
+        if s.get('status') == 'error':
+            errors[key] = errors.get(key, 0) + 1
+    return [dict(phase=phase, name=name, errors=errors.get((phase, name), 0), **summarize(values))
+            for (phase, name), values in durations.items()]
+
+
+def print_summary(rows, meta=None):
+    if meta:
+        print("   " + ", ".join(f"{k}={v}" for k, v in meta.items()))
+    print(f"   {'phase / step':<40}{'count':>7}{'p50 s':>9}{'p95 s':>9}{'max s':>9}{'errors':>8}")
+    for r in rows:
+        label = r['name'] if r['name'] == r['phase'] else f"{r['phase']} / {r['name']}"
+        print(f"   {label:<40}{r['count']:>7}{r['p50']:>9.2f}{r['p95']:>9.2f}{r['max']:>9.2f}{r['errors']:>8}")
+
+
+# スクリプト全体で共有するデフォルトのレコーダー
+recorder = StepRecorder()
+
+
+def step(name, **attrs):
+    """デフォルトレコーダーでステップを記録するコンテキストマネージャー"""
+    return recorder.step(name, **attrs)
+
+
+def current_step():
+    return recorder.current()
@@ -0,0 +1,157 @@
+"""
+観測した待ち時間から決める待機タイムアウト
+
+FailFastWait が条件を満たすまでにかかった時間を「ステップ名 + 待機開始時のルート」ごとに記録し、
+直近のサンプルの p99 × 倍率（下限・上限つき）をそのキーの次回以降のタイムアウトにする。
+タイムアウトした待ちも、その時点まで待った時間（実際の待ち時間の下限）をサンプルに入れる。
+入れないと負荷で遅くなった応答が分布に現れず、タイムアウトが短いまま広がらない。
+サンプルが少ないうちはコードに書かれた値（15 秒など）をそのまま使う。
+学習した値は状態ディレクトリ（HARNESS_STATE_DIR）に保存し、次の実行に引き継ぐ。
+
+HARNESS_ADAPTIVE_TIMEOUTS=1      記録して、学習したタイムアウトを使う
+HARNESS_ADAPTIVE_TIMEOUTS=learn  記録だけする（タイムアウトはコードの値のまま）
+
+python -m harness.timeouts          学習済みのタイムアウトを表示
+"""
+
+import argparse
+import atexit
+import collections
+import json
+import os
+import re
+import threading
+from urllib.parse import urlparse
+
+from .checkpoint import DEFAULT_STATE_DIR
+from .stats import percentile
+
+DEFAULT_PATH = os.path.join(DEFAULT_STATE_DIR, 'timeouts.json')
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def mode():
+    value = os.getenv("HARNESS_ADAPTIVE_TIMEOUTS", "0").lower()
+    if value == 'learn':
+        return 'learn'
+    return 'apply' if value in ("1", "true", "yes") else None
+
+
+def route_of(url):
+    """URL のパス（ID は {id} にまとめる）"""
+    return _ID_SEGMENT.sub('/{id}', urlparse(url or '').path) or '/'
+
+
+class TimeoutModel:
+    """キーごとの待ち時間の記録と、そこから決めるタイムアウト"""
+
+    def __init__(self, path=DEFAULT_PATH, multiplier=3.0, min_seconds=2.0, max_seconds=60.0,
+                 window=200, min_samples=20):
+        self.path = path
+        self.multiplier = multiplier
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.window = window
+        self.min_samples = min_samples
+        self.samples = collections.defaultdict(lambda: collections.deque(maxlen=self.window))
+        self.timeouts = collections.Counter()
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path, encoding='utf-8') as f:
+            state = json.load(f)
+        for key, values in state.get('samples', {}).items():
+            self.samples[key].extend(values)
+        self.timeouts.update(state.get('timeouts', {}))
+        return self
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._lock:
+            state = {
+                'samples': {k: [round(v, 3) for v in d] for k, d in self.samples.items()},
+                'timeouts': dict(self.timeouts),
+                'learned': {k: self.learned(k) for k in self.samples},
+            }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def observe(self, key, seconds):
+        """条件を満たすまでにかかった時間を記録"""
+        with self._lock:
+            self.samples[key].append(seconds)
+            self._dirty = True
+
+    def observe_timeout(self, key, seconds):
+        """タイムアウトした待ち。回数を数え、待った時間をサンプルとして記録する"""
+        with self._lock:
+            self.timeouts[key] += 1
+            self.samples[key].append(seconds)
+            self._dirty = True
+
+    def learned(self, key):
+        """p99 × 倍率を下限・上限に収めた値。サンプルが足りなければ None"""
+        values = list(self.samples.get(key, ()))
+        if len(values) < self.min_samples:
+            return None
+        return min(max(percentile(values, 99) * self.multiplier, self.min_seconds), self.max_seconds)
+
+    def timeout(self, key, default):
+        learned = self.learned(key)
+        return default if learned is None else learned
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def model():
+    """プロセス共通のモデル（初回に保存済みの値を読み込み、終了時に保存）"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = TimeoutModel(
+                multiplier=float(os.getenv("HARNESS_TIMEOUT_MULTIPLIER", "3")),
+                min_seconds=float(os.getenv("HARNESS_TIMEOUT_MIN", "2")),
+                max_seconds=float(os.getenv("HARNESS_TIMEOUT_MAX", "60")),
+            ).load()
+            atexit.register(_model.save)
+        return _model
+
+
+def key_for(step, url):
+    return f"{step.name if step is not None else '-'} {route_of(url)}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="学習済みの待機タイムアウトの表示")
+    parser.add_argument('--path', default=DEFAULT_PATH)
+    parser.add_argument('--reset', action='store_true', help="学習した値を削除する")
+    args = parser.parse_args(argv)
+
+    if args.reset:
+        if os.path.exists(args.path):
+            os.remove(args.path)
+        print(f"🗑️ Removed {args.path}")
+        return
+    learned = TimeoutModel(args.path).load()
+    print(f"⏱️ Learned wait timeouts ({args.path})")
+    print(f"   {'step / route':<45}{'samples':>9}{'p99':>8}{'timeout':>9}{'timed out':>11}")
+    for key in sorted(learned.samples):
+        values = list(learned.samples[key])
+        p99 = percentile(values, 99)
+        timeout = learned.learned(key)
+        print(f"   {key:<45}{len(values):>9}{(f'{p99:.1f}s' if p99 is not None else '-'):>8}"
+              f"{(f'{timeout:.1f}s' if timeout else '-'):>9}{learned.timeouts.get(key, 0):>11}")
+
+
+if __name__ == '__main__':
+    main()
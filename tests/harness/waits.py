@@ -0,0 +1,167 @@
+"""
+フェイルファストな待機処理
+
+Laravel が 500 やエラーページ（419 Page Expired、Ignition の例外画面など）を返した場合、
+要素待ちがタイムアウトするまで待たずに、エラーを分類してその場でステップを中断する。
+判定は条件が満たされなかったポーリング時にだけ行うため、正常系のコストは増えない。
+HARNESS_ADAPTIVE_TIMEOUTS を指定すると、タイムアウトは観測した待ち時間から決める（harness.timeouts）。
+"""
+
+import time
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .steps import current_step
+from . import timeouts
+
+# Laravel の標準エラービュー（resources/views/errors/minimal）のタイトル
+ERROR_TITLES = {
+    'Server Error': 'server_error',
+    'Page Expired': 'csrf_expired',
+    'Not Found': 'not_found',
+    'Forbidden': 'forbidden',
+    'Unauthorized': 'unauthorized',
+    'Too Many Requests': 'rate_limited',
+    'Service Unavailable': 'unavailable',
+}
+
+# APP_DEBUG=true の例外画面（Ignition / Whoops）に含まれる文字列
+EXCEPTION_MARKERS = ['laravel-ignition', 'window.ignite', 'Whoops!', 'BulkApprovalException', 'SQLSTATE[']
+
+_PROBE_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const html = document.documentElement ? document.documentElement.outerHTML : '';
+return {
+    status: nav && nav.responseStatus ? nav.responseStatus : 0,
+    title: document.title || '',
+    markers: arguments[0].filter(function (m) { return html.indexOf(m) !== -1; })
+};
+"""
+
+
+class ServerErrorPage(Exception):
+    """サーバーがエラーページを返したことを表す例外"""
+
+    def __init__(self, kind, status, url, title='', markers=None):
+        self.kind = kind
+        self.status = status
+        self.url = url
+        self.title = title
+        self.markers = markers or []
+        super().__init__(f"{kind} (HTTP {status or '?'}) at {url}")
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'status': self.status,
+            'url': self.url,
+            'title': self.title,
+            'markers': self.markers,
+        }
+
+
+def classify(status, title, markers):
+    """レスポンスステータスとページ内容からエラー種別を判定（正常なら None）"""
+    if markers:
+        return 'exception_page'
+    if title in ERROR_TITLES:
+        return ERROR_TITLES[title]
+    if status == 419:
+        return 'csrf_expired'
+    if status >= 500:
+        return 'server_error'
+    if status in (401, 403, 404, 429):
+        return {401: 'unauthorized', 403: 'forbidden', 404: 'not_found', 429: 'rate_limited'}[status]
+    return None
+
+
+def detect_server_error(driver):
+    """現在のページがエラーページなら ServerErrorPage を返す"""
+    try:
+        probe = driver.execute_script(_PROBE_SCRIPT, EXCEPTION_MARKERS)
+    except Exception:
+        return None
+    if not probe:
+        return None
+
+    kind = classify(probe.get('status') or 0, probe.get('title', ''), probe.get('markers'))
+    if kind is None:
+        return None
+    return ServerErrorPage(kind, probe.get('status'), driver.current_url, probe.get('title', ''), probe.get('markers'))
+
+
+def _record(error):
+    step = current_step()
+    if step is not None:
+        step.data['server_error'] = error.to_dict()
+
+
+def check_server_error(driver):
+    """エラーページなら即座に ServerErrorPage を送出"""
+    error = detect_server_error(driver)
+    if error is not None:
+        _record(error)
+        raise error
+
+
+class FailFastWait(WebDriverWait):
+    """WebDriverWait と同じ使い方で、エラーページを検出したら即座に中断する
+
+    timeout はサンプルが集まるまでの既定値。HARNESS_ADAPTIVE_TIMEOUTS=1 なら学習した値に置き換わる。
+    """
+
+    def __init__(self, driver, timeout, *args, **kwargs):
+        super().__init__(driver, timeout, *args, **kwargs)
+        self._default_timeout = timeout
+
+    def _adaptive_key(self):
+        if not timeouts.mode():
+            return None
+        try:
+            url = self._driver.current_url
+        except Exception:
+            url = ''
+        key = timeouts.key_for(current_step(), url)
+        if timeouts.mode() == 'apply':
+            self._timeout = timeouts.model().timeout(key, self._default_timeout)
+        return key
+
+    def until(self, method, message=""):
+        driver = self._driver
+        key = self._adaptive_key()
+        started = time.monotonic()
+
+        def condition(d):
+            try:
+                result = method(d)
+            except NoSuchElementException:
+                check_server_error(driver)
+                raise
+            if not result:
+                check_server_error(driver)
+            return result
+
+        try:
+            result = super().until(condition, message)
+        except TimeoutException:
+            if key:
+                timeouts.model().observe_timeout(key, time.monotonic() - started)
+            raise
+        if key:
+            timeouts.model().observe(key, time.monotonic() - started)
+        return result
+
+
+def mark_document(driver):
+    """フォーム送信前に現在のドキュメントへ目印を付ける（遷移の検出用）"""
+    driver.execute_script("window.__harnessPending = true;")
+
+
+def wait_for_navigation(driver, timeout=15):
+    """mark_document 後の遷移完了を待つ（同じURLへのリダイレクトでも検出できる）"""
+    return FailFastWait(driver, timeout).until(
+        lambda d: d.execute_script(
+            "return !window.__harnessPending && document.readyState === 'complete';"
+        )
+    )
@@ -0,0 +1,191 @@
+"""
+計測前のウォームアップ
+
+docker-compose up 直後は opcache・Blade ビューのコンパイルや InnoDB バッファプールが冷えており、
+最初のリクエストだけ極端に遅くなる。代表的なルートを決まった回数ずつ呼び出したあと、
+ルートごとの直近の応答時間の変動係数（CV）がしきい値を下回るまで呼び出しを続ける。
+ウォームアップのサンプルには tag='warmup' を付け、計測側の統計には含めない。
+
+HARNESS_WARMUP=1 でテストスクリプトの開始前に実行（ステップ 'warmup' として記録し、各集計からは除外）。
+
+単体実行:
+python -m harness.warmup --requests 5 --cv 0.15
+"""
+
+import argparse
+import json
+import os
+import time
+
+from .http_client import AppClient
+from .ready import check_app, wait_until_ready
+from .stats import coefficient_of_variation, summarize
+
+DEFAULT_USER = 'nakamura.keiko@wf.nrkk.technology'
+# ログインが必要な代表ルート（/login は未ログインのクライアントで呼ぶ）
+ROUTES = ('/login', '/dashboard', '/applications', '/applications/create', '/my-approvals')
+TAG = 'warmup'
+
+
+def is_enabled():
+    return os.getenv("HARNESS_WARMUP", "0").lower() in ("1", "true", "yes")
+
+
+def wait_for_app(client, timeout=120):
+    """アプリが応答するようになるまで待つ（起動直後用）"""
+    failed = wait_until_ready({'app': lambda: check_app(client.base_url)}, timeout=timeout, verbose=False)
+    return not failed
+
+
+def _hit(client, route, samples):
+    started = time.perf_counter()
+    try:
+        status = client.get(route).status_code
+    except Exception as e:
+        status = f"{type(e).__name__}"
+    samples.append({
+        'tag': TAG,
+        'route': route,
+        'ms': (time.perf_counter() - started) * 1000,
+        'status': status,
+        'at': time.time(),
+    })
+
+
+def route_cv(samples, route, window):
+    values = [s['ms'] for s in samples if s['route'] == route][-window:]
+    if len(values) < window:
+        return None
+    return coefficient_of_variation(values)
+
+
+def is_stable(cv, cv_threshold):
+    """CV が出ていて（サンプルが揃っていて）しきい値を下回るか。CV 0 も安定とみなす"""
+    return cv is not None and cv < cv_threshold
+
+
+def warm_up(base_url=None, email=DEFAULT_USER, requests_per_route=5, cv_threshold=0.15,
+            window=5, max_seconds=120, startup_timeout=120, routes=ROUTES):
+    """ルートごとに決まった回数呼び出し、応答時間が安定するまで続ける"""
+    anonymous = AppClient(base_url)
+    if not wait_for_app(anonymous, startup_timeout):
+        raise RuntimeError(f"Application did not respond within {startup_timeout}s")
+    client = AppClient(base_url)
+    if not client.login(email):
+        raise RuntimeError(f"Warm-up login failed for {email}")
+
+    def client_for(route):
+        return anonymous if route == '/login' else client
+
+    samples = []
+    started = time.time()
+    for route in routes:
+        for _ in range(requests_per_route):
+            _hit(client_for(route), route, samples)
+
+    # すべてのルートの直近 window 回の CV がしきい値を下回るまで回す
+    stable = False
+    while time.time() - started < max_seconds:
+        unstable = [r for r in routes if not is_stable(route_cv(samples, r, window), cv_threshold)]
+        if not unstable:
+            stable = True
+            break
+        for route in unstable:
+            _hit(client_for(route), route, samples)
+
+    return {
+        'tag': TAG,
+        'stable': stable,
+        'requests': len(samples),
+        'elapsed': time.time() - started,
+        'cv_threshold': cv_threshold,
+        'routes': {
+            route: {
+                'cv': route_cv(samples, route, window),
+                'first_ms': next(s['ms'] for s in samples if s['route'] == route),
+                'last_window_ms': summarize([s['ms'] for s in samples if s['route'] == route][-window:]),
+            }
+            for route in routes
+        },
+        'samples': samples,
+    }
+
+
+def print_summary(result):
+    state = "stable" if result['stable'] else "NOT stable (time limit reached)"
+    print(f"🔥 Warm-up: {result['requests']} requests in {result['elapsed']:.1f}s, latency {state}")
+    for route, r in result['routes'].items():
+        cv = f"{r['cv']:.2f}" if r['cv'] is not None else '-'
+        print(f"   {route:<22} first {r['first_ms']:>7.0f}ms → p50 {r['last_window_ms']['p50']:>6.0f}ms (cv {cv})")
+
+
+def settings_from_env():
+    return {
+        'requests_per_route': int(os.getenv("HARNESS_WARMUP_REQUESTS", "5")),
+        'cv_threshold': float(os.getenv("HARNESS_WARMUP_CV", "0.15")),
+        'max_seconds': float(os.getenv("HARNESS_WARMUP_MAX_SECONDS", "120")),
+    }
+
+
+def run(recorder, base_url=None, path='warmup.json'):
+    """HARNESS_WARMUP=1 のとき、warmup 属性付きのステップとしてウォームアップを実行"""
+    if not is_enabled():
+        return None
+    with recorder.step('warmup', warmup=True) as step:
+        try:
+            result = warm_up(base_url, **settings_from_env())
+        except Exception as e:
+            print(f"⚠️ Warm-up failed: {e}")
+            return None
+        step.data['warmup'] = {k: v for k, v in result.items() if k != 'samples'}
+    print_summary(result)
+    save(result, path)
+    return result
+
+
+def save(result, path='warmup.json'):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"📁 Warm-up samples saved to {path}")
+
+
+def add_arguments(parser):
+    """ベンチマーク共通のウォームアップ用オプション"""
+    parser.add_argument('--no-warmup', action='store_true', help="ウォームアップを省略する")
+    parser.add_argument('--warmup-requests', type=int, default=5, help="ルートごとの最低リクエスト数")
+    parser.add_argument('--warmup-cv', type=float, default=0.15, help="安定とみなす変動係数")
+
+
+def run_from_args(args, base_url=None):
+    """ベンチマークの計測前に呼び出す。結果はサンプルを除いた要約を返す"""
+    if args.no_warmup:
+        return None
+    result = warm_up(base_url, requests_per_route=args.warmup_requests, cv_threshold=args.warmup_cv)
+    print_summary(result)
+    return {k: v for k, v in result.items() if k != 'samples'}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="計測前のウォームアップ")
+    parser.add_argument('--base-url', default=None)
+    parser.add_argument('--user', default=DEFAULT_USER)
+    parser.add_argument('--requests', type=int, default=5, help="ルートごとの最低リクエスト数")
+    parser.add_argument('--cv', type=float, default=0.15, help="安定とみなす変動係数")
+    parser.add_argument('--window', type=int, default=5, help="CV を計算する直近の回数")
+    parser.add_argument('--max-seconds', type=float, default=120)
+    parser.add_argument('--startup-timeout', type=float, default=120, help="アプリの起動を待つ時間")
+    parser.add_argument('--output', default='warmup.json')
+    args = parser.parse_args(argv)
+
+    try:
+        result = warm_up(args.base_url, args.user, args.requests, args.cv, args.window,
+                         args.max_seconds, args.startup_timeout)
+    except RuntimeError as e:
+        raise SystemExit(f"❌ {e}")
+    print_summary(result)
+    save(result, args.output)
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Slack Webhook の代替サーバー
+
+NotificationService::sendSlack は承認処理中に同期的に Webhook を呼び出すため、
+ユーザーの slack_webhook_url をこのサーバーに向けて到着時刻・ペイロードサイズを記録する。
+遅延やエラーを注入して、通知配信が承認リクエストの応答時間にどれだけ影響するかを測定できる。
+
+単体起動:
+python -m harness.webhook_sink --port 9100 --latency-ms 200
+"""
+
+import argparse
+import collections
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class WebhookSink:
+    """受信した Webhook を記録するローカル HTTP サーバー"""
+
+    def __init__(self, host='0.0.0.0', port=9100, public_host='host.docker.internal',
+                 latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=500,
+                 max_records=10000, seed=None):
+        self.host = host
+        self.port = port
+        self.public_host = public_host
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.arrivals = collections.deque(maxlen=max_records)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def url_for(self, key='default'):
+        """アプリ側に設定する Webhook URL"""
+        return f"http://{self.public_host}:{self.port}/hook/{key}"
+
+    def _delay(self):
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+            fail = self._random.random() < self.error_rate
+        return max(self.latency_ms + jitter, 0) / 1000.0, fail
+
+    def _record(self, path, body, status, delay):
+        try:
+            event_type = json.loads(body).get('event_type')
+        except (ValueError, AttributeError):
+            event_type = None
+        self.arrivals.append({
+            'received_at': time.time(),
+            'path': path,
+            'size': len(body),
+            'event_type': event_type,
+            'status': status,
+            'injected_delay_ms': round(delay * 1000, 1),
+        })
+
+    def _handler(self):
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length)
+                delay, fail = sink._delay()
+                if delay:
+                    time.sleep(delay)
+                status = sink.error_status if fail else 200
+                sink._record(self.path, body, status, delay)
+
+                payload = b'error' if fail else b'ok'
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/plain')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"📮 Webhook sink listening on {self.host}:{self.port} (latency {self.latency_ms}ms, error rate {self.error_rate})")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def between(self, start, end):
+        """指定した時間範囲に届いた Webhook"""
+        return [a for a in list(self.arrivals) if start <= a['received_at'] <= end]
+
+    def summary(self):
+        arrivals = list(self.arrivals)
+        return {
+            'count': len(arrivals),
+            'errors': sum(1 for a in arrivals if a['status'] >= 400),
+            'bytes': sum(a['size'] for a in arrivals),
+            'by_event': dict(collections.Counter(a['event_type'] for a in arrivals)),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slack Webhook の代替サーバー")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=500)
+    args = parser.parse_args()
+
+    sink = WebhookSink(args.host, args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                       error_rate=args.error_rate, error_status=args.error_status).start()
+    try:
+        while True:
+            time.sleep(10)
+            print(f"📊 {sink.summary()}")
+    except KeyboardInterrupt:
+        sink.stop()
+
+
+if __name__ == '__main__':
+    main()
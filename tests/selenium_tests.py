@@ -15,26 +15,23 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 import unittest
 
+from harness import launch, locators, lookup, memory
+from harness.driver import chrome_service
+
 
 class ApprovalWorkflowTests(unittest.TestCase):
     
     @classmethod
-    def setUpClass(cls):
-        """Set up Chrome driver for testing"""
-        chrome_options = Options()
-        # chrome_options.add_argument("--headless")  # Run in headless mode - commented out for visual testing
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
+    def _create_driver(cls):
+        """Create a Chrome driver (Selenium Grid first, then local Chrome)"""
+        # Visible by default for visual testing; HARNESS_LAUNCH_PROFILE=fast-headless runs headless
+        chrome_options = launch.chrome_options('debug-visible')
         
         # Try to connect to Selenium Grid, fallback to local Chrome
         try:
-            cls.driver = webdriver.Remote(
+            driver = webdriver.Remote(
                 command_executor='http://localhost:4444/wd/hub',
                 desired_capabilities=DesiredCapabilities.CHROME,
                 options=chrome_options
@@ -45,14 +42,23 @@ class ApprovalWorkflowTests(unittest.TestCase):
             print("Falling back to local Chrome driver")
             try:
                 # Use webdriver-manager to automatically download and manage ChromeDriver
-                service = Service(ChromeDriverManager().install())
-                cls.driver = webdriver.Chrome(service=service, options=chrome_options)
+                service = chrome_service()
+                driver = webdriver.Chrome(service=service, options=chrome_options)
                 print("✓ Connected to local Chrome driver with WebDriver Manager")
             except Exception as e2:
                 print(f"✗ Could not connect to local Chrome driver: {e2}")
                 raise Exception("No Chrome driver available")
         
-        cls.driver.implicitly_wait(10)
+        # implicit wait は使わない（要素がないときの確認が毎回止まるため）。待機は明示的に行う
+        return lookup.explicit_only(driver)
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up Chrome driver for testing"""
+        # The driver is shared by all tests; with HARNESS_MEMORY_WATCH=1 it is replaced
+        # when its memory keeps growing (see setUp)
+        cls.browser = memory.ManagedBrowser(cls._create_driver, label='selenium_tests')
+        cls.driver = cls.browser.start()
         cls.base_url = "http://localhost:8080"
         cls.wait = WebDriverWait(cls.driver, 10)
         
@@ -73,11 +79,16 @@ class ApprovalWorkflowTests(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         """Clean up after tests"""
-        if hasattr(cls, 'driver'):
-            cls.driver.quit()
+        if hasattr(cls, 'browser'):
+            cls.browser.close()
+        locators.print_report(locators.registry().report())
 
     def setUp(self):
         """Reset for each test"""
+        driver = self.browser.checkpoint()
+        if driver is not type(self).driver:
+            type(self).driver = driver
+            type(self).wait = WebDriverWait(driver, 10)
         self.driver.delete_all_cookies()
 
     def login(self, user_type='admin'):
@@ -115,7 +126,7 @@ class ApprovalWorkflowTests(unittest.TestCase):
         self.wait.until(EC.url_contains("/login"))
         
         # Check if login form is present
-        login_form = self.driver.find_element(By.TAG_NAME, "form")
+        login_form = lookup.wait_for(self.driver, By.TAG_NAME, "form")
         self.assertIsNotNone(login_form)
         
         # Check for email and password fields
@@ -139,7 +150,7 @@ class ApprovalWorkflowTests(unittest.TestCase):
         self.assertIn("dashboard", current_url)
         
         # Check for admin-specific elements
-        page_title = self.driver.find_element(By.TAG_NAME, "h2")
+        page_title = lookup.wait_for(self.driver, By.TAG_NAME, "h2")
         self.assertIn("申請一覧", page_title.text)
         
         print(f"✓ Admin login successful for {user['email']}")
@@ -158,24 +169,20 @@ class ApprovalWorkflowTests(unittest.TestCase):
         page_title = self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "h2")))
         self.assertIn("申請一覧", page_title.text)
         
-        # Look for application cards or table
-        try:
-            applications = self.driver.find_elements(By.CSS_SELECTOR, ".card")
-            if applications:
-                print(f"✓ Found {len(applications)} application cards")
-            else:
-                # Check for empty state
-                empty_message = self.driver.find_element(By.CSS_SELECTOR, ".text-muted")
-                print(f"✓ Empty state message: {empty_message.text}")
-        except Exception as e:
-            print(f"⚠ Could not find applications or empty state: {e}")
+        # Look for application cards or table (page is loaded, so check without waiting)
+        applications = lookup.all_now(self.driver, By.CSS_SELECTOR, ".card")
+        empty_message = lookup.first(self.driver, By.CSS_SELECTOR, ".text-muted")
+        if applications:
+            print(f"✓ Found {len(applications)} application cards")
+        elif empty_message:
+            print(f"✓ Empty state message: {empty_message.text}")
+        else:
+            print("⚠ Could not find applications or empty state")
         
         # Check for "新規申請" button
-        try:
-            new_app_button = self.driver.find_element(By.LINK_TEXT, "新規申請")
-            self.assertIsNotNone(new_app_button)
+        if lookup.present(self.driver, By.LINK_TEXT, "新規申請"):
             print("✓ New application button found")
-        except Exception:
+        else:
             print("⚠ New application button not found")
 
     def test_04_create_application_page(self):
@@ -194,12 +201,10 @@ class ApprovalWorkflowTests(unittest.TestCase):
         # Check for required form fields
         required_fields = ['title', 'description', 'type']
         for field in required_fields:
-            try:
-                element = self.driver.find_element(By.NAME, field)
-                self.assertIsNotNone(element)
+            if lookup.present(self.driver, By.NAME, field):
                 print(f"✓ Found form field: {field}")
-            except Exception as e:
-                print(f"✗ Missing form field: {field} - {e}")
+            else:
+                print(f"✗ Missing form field: {field}")
 
     def test_05_my_approvals_page(self):
         """Test my approvals page"""
@@ -214,9 +219,9 @@ class ApprovalWorkflowTests(unittest.TestCase):
         page_title = self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "h2")))
         self.assertIn("承認待ち一覧", page_title.text)
         
-        # Check for approval cards or empty state
+        # Check for approval cards or empty state (page is loaded, so check without waiting)
         try:
-            approval_cards = self.driver.find_elements(By.CSS_SELECTOR, ".card")
+            approval_cards = lookup.all_now(self.driver, By.CSS_SELECTOR, ".card")
             if approval_cards:
                 print(f"✓ Found {len(approval_cards)} approval cards")
                 
@@ -224,17 +229,14 @@ class ApprovalWorkflowTests(unittest.TestCase):
                 first_card = approval_cards[0]
                 
                 # Look for approval action buttons
-                approve_btn = first_card.find_elements(By.CSS_SELECTOR, "button[onclick*='approve']")
-                reject_btn = first_card.find_elements(By.CSS_SELECTOR, "button[onclick*='reject']")
-                
-                if approve_btn:
+                if lookup.present(first_card, By.CSS_SELECTOR, "button[onclick*='approve']"):
                     print("✓ Approve button found")
-                if reject_btn:
+                if lookup.present(first_card, By.CSS_SELECTOR, "button[onclick*='reject']"):
                     print("✓ Reject button found")
                     
             else:
-                empty_message = self.driver.find_element(By.CSS_SELECTOR, ".text-muted")
-                print(f"✓ Empty state message: {empty_message.text}")
+                empty_message = lookup.first(self.driver, By.CSS_SELECTOR, ".text-muted")
+                print(f"✓ Empty state message: {empty_message.text if empty_message else '(none)'}")
                 
         except Exception as e:
             print(f"⚠ Error checking approval cards: {e}")
@@ -247,7 +249,7 @@ class ApprovalWorkflowTests(unittest.TestCase):
         
         # First, get list of applications to find one to view
         self.driver.get(f"{self.base_url}/applications")
-        time.sleep(2)
+        lookup.wait_for(self.driver, By.TAG_NAME, "h2")
         
         # Look for application links
         try:
@@ -272,17 +274,15 @@ class ApprovalWorkflowTests(unittest.TestCase):
                 ]
                 
                 for section in sections_to_check:
-                    try:
-                        element = self.driver.find_element(By.XPATH, f"//th[contains(text(), '{section}')]")
+                    if lookup.present(self.driver, By.XPATH, f"//th[contains(text(), '{section}')]"):
                         print(f"✓ Found section: {section}")
-                    except Exception:
+                    else:
                         print(f"⚠ Section not found: {section}")
                         
                 # Check for approval flow section
-                try:
-                    approval_flow = self.driver.find_element(By.XPATH, "//h5[contains(text(), '承認フロー')]")
+                if lookup.present(self.driver, By.XPATH, "//h5[contains(text(), '承認フロー')]"):
                     print("✓ Approval flow section found")
-                except Exception:
+                else:
                     print("⚠ Approval flow section not found")
                     
             else:
@@ -337,12 +337,10 @@ class ApprovalWorkflowTests(unittest.TestCase):
             time.sleep(1)  # Allow layout to adjust
             
             # Check if page is still functional
-            try:
-                page_title = self.driver.find_element(By.TAG_NAME, "h2")
-                self.assertIsNotNone(page_title)
+            if lookup.present(self.driver, By.TAG_NAME, "h2"):
                 print(f"✓ {device} ({width}x{height}): Page renders correctly")
-            except Exception as e:
-                print(f"✗ {device} ({width}x{height}): Page render issue - {e}")
+            else:
+                print(f"✗ {device} ({width}x{height}): Page render issue - h2 not found")
 
     def test_09_logout_functionality(self):
         """Test logout functionality"""
@@ -352,29 +350,9 @@ class ApprovalWorkflowTests(unittest.TestCase):
         
         # Look for logout link or button
         try:
-            # Try different selectors for logout
-            logout_selectors = [
-                "a[href*='logout']",
-                "form[action*='logout'] button",
-                "a:contains('ログアウト')",
-                "button:contains('ログアウト')"
-            ]
-            
-            logout_element = None
-            for selector in logout_selectors:
-                try:
-                    if 'contains' in selector:
-                        # Handle :contains() pseudo-selector manually
-                        if 'ログアウト' in selector:
-                            elements = self.driver.find_elements(By.XPATH, "//*[contains(text(), 'ログアウト')]")
-                            if elements:
-                                logout_element = elements[0]
-                                break
-                    else:
-                        logout_element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        break
-                except Exception:
-                    continue
+            # Candidate selectors are registered in harness.locators; the one that
+            # matched last time is tried first
+            logout_element = locators.find(self.driver, 'logout')
             
             if logout_element:
                 logout_element.click()
@@ -383,7 +361,7 @@ class ApprovalWorkflowTests(unittest.TestCase):
                 self.wait.until(EC.url_contains("/login"))
                 
                 # Verify we're back at login
-                login_form = self.driver.find_element(By.TAG_NAME, "form")
+                login_form = lookup.wait_for(self.driver, By.TAG_NAME, "form")
                 self.assertIsNotNone(login_form)
                 
                 print("✓ Logout successful")
@@ -5,17 +5,23 @@
 組織2と5は「全て承認」、それ以外は「選択承認」を使用
 """
 
+import argparse
 import json
+import os
 import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 
-BASE_URL = "http://localhost:8080"
+from harness import (assets, browser_profile, db_status, docker_stats, fault_proxy, launch, network, preflight, query_log,
+                     warmup)
+from harness.checkpoint import Checkpoint
+from harness.steps import recorder, step
+from harness.waits import FailFastWait, ServerErrorPage, mark_document, wait_for_navigation
+from harness.driver import chrome_service
+
+BASE_URL = os.getenv("APP_URL", "http://localhost:8080")
 
 # 承認者リスト（各組織から1名） - 正しいメールアドレス形式
 APPROVERS = [
@@ -31,31 +37,41 @@ APPROVERS = [
     {'email': 'yamamoto.naoki@wf.nrkk.technology', 'name': '山本直樹', 'org': 10, 'use_approve_all': False},
 ]
 
+# このスクリプトの既定の起動プロファイル（画面を表示して確認する）
+LAUNCH_PROFILE = 'debug-visible'
+
 def create_chrome_driver():
     """Chrome WebDriverを作成"""
-    chrome_options = webdriver.ChromeOptions()
-    # chrome_options.add_argument('--headless')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
+    # 起動オプションは harness.launch のプロファイル（HARNESS_LAUNCH_PROFILE で上書き）
+    chrome_options = launch.chrome_options(LAUNCH_PROFILE)
+
+    # HARNESS_NETWORK_CAPTURE=1 のときはリクエストごとの通信記録を取る
+    if network.is_enabled():
+        network.enable_performance_log(chrome_options)
+
+    # HARNESS_BROWSER_PROFILE 指定時は温めたプロファイル・共有キャッシュで起動する
+    browser_profile.apply(chrome_options)
 
     print("    🔧 Creating new Chrome driver...")
-    print("    ⏳ Installing Chrome driver via webdriver-manager...")
-    service = Service(ChromeDriverManager().install())
-    print("    ✓ Chrome driver installed")
+    service = chrome_service()
 
     print("    ⏳ Starting Chrome browser...")
     driver = webdriver.Chrome(service=service, options=chrome_options)
     print("    ✅ Chrome browser started")
 
+    if network.is_enabled():
+        network.attach(driver)
+        print("    ✓ Network capture enabled")
+
+    # HARNESS_STATIC_ASSETS 指定時は CDN のアセットをローカルから返す・画像とフォントをブロックする
+    assets.intercept(driver)
+
     return driver
 
 def login(driver, email, password='password'):
     """ログイン処理"""
     driver.get(f"{BASE_URL}/login")
-    wait = WebDriverWait(driver, 10)
+    wait = FailFastWait(driver, 10)
 
     # ログインフォーム入力
     email_input = wait.until(EC.presence_of_element_located((By.NAME, "email")))
@@ -113,10 +129,12 @@ def process_approvals_with_approve_all(driver, wait, approver_name):
 
         except TimeoutException:
             print("   ❌ Approve All modal did not appear")
+            network.report_current_step()
             return False
 
     except (NoSuchElementException, TimeoutException) as e:
         print(f"   ❌ Approve All failed: {e}")
+        network.report_current_step()
         return False
 
 def process_approvals_with_reject_all(driver, wait, approver_name):
@@ -161,10 +179,12 @@ def process_approvals_with_reject_all(driver, wait, approver_name):
 
         except TimeoutException:
             print("   ❌ Reject All modal did not appear")
+            network.report_current_step()
             return False
 
     except (NoSuchElementException, TimeoutException) as e:
         print(f"   ❌ Reject All failed: {e}")
+        network.report_current_step()
         return False
 
 def test_combination_bugs(driver, wait, approver_name):
@@ -186,6 +206,7 @@ def test_combination_bugs(driver, wait, approver_name):
                 approve_btn = driver.find_element(By.CSS_SELECTOR, "button[formaction*='/approve']")
 
                 # JavaScriptで bulk_mode パラメータを追加した form data を送信
+                mark_document(driver)
                 driver.execute_script("""
                     var form = document.createElement('form');
                     form.method = 'POST';
@@ -213,7 +234,10 @@ def test_combination_bugs(driver, wait, approver_name):
                     form.submit();
                 """, approve_btn)
                 print("   ✅ Submitted approve with bulk_mode=1 and empty comment")
-                time.sleep(2)
+                wait_for_navigation(driver)
+            except ServerErrorPage as e:
+                print(f"   🐛 Server error page: {e}")
+                network.report_current_step()
             except Exception as e:
                 print(f"   ❌ Approve combination bug test failed: {e}")
 
@@ -235,6 +259,7 @@ def test_combination_bugs(driver, wait, approver_name):
                     reject_btn = driver.find_element(By.CSS_SELECTOR, "button[formaction*='/reject']")
 
                     # JavaScriptで reason パラメータが空文字列の form data を送信
+                    mark_document(driver)
                     driver.execute_script("""
                         var form = document.createElement('form');
                         form.method = 'POST';
@@ -262,7 +287,10 @@ def test_combination_bugs(driver, wait, approver_name):
                         form.submit();
                     """, reject_btn)
                     print("   ✅ Submitted reject with empty reason and valid comment")
-                    time.sleep(2)
+                    wait_for_navigation(driver)
+                except ServerErrorPage as e:
+                    print(f"   🐛 Server error page: {e}")
+                    network.report_current_step()
                 except Exception as e:
                     print(f"   ❌ Reject combination bug test failed: {e}")
 
@@ -318,24 +346,54 @@ def process_approvals_selective(driver, wait, approver_name, max_approvals=3):
 
             except TimeoutException:
                 print("   ❌ Bulk approval modal did not appear")
+                network.report_current_step()
 
     except Exception as e:
         print(f"   ❌ Selective approval failed: {e}")
+        network.report_current_step()
 
     return approved_count
 
-def test_approve_applications():
+def test_approve_applications(resume=False, state_file=None):
     """承認処理テスト"""
+    global BASE_URL
     print("🧪 Approval Processing Test")
     print("=" * 50)
     print(f"🔗 Base URL: {BASE_URL}")
-    print(f"👥 Testing with {len(APPROVERS)} approvers")
+
+    # ブラウザを起動する前にログインできない・承認権限のないユーザーを除外（HARNESS_PREFLIGHT=0 で省略）
+    approvers = preflight.filter_users(APPROVERS, 'approver', BASE_URL)
+
+    print(f"👥 Testing with {len(approvers)} approvers")
     print("🚀 Starting test execution...")
 
+    checkpoint = Checkpoint('approve_applications', path=state_file, resume=resume)
+    # 計測前のウォームアップ（HARNESS_WARMUP=1 のとき。集計からは除外）
+    warmup.run(recorder, BASE_URL)
+    # HARNESS_FAULT_PROXY 指定時は、以降のブラウザ操作を遅延・障害注入プロキシ経由にする
+    proxy = fault_proxy.attach(recorder, BASE_URL)
+    if proxy:
+        BASE_URL = proxy.base_url
+    sampler = db_status.attach(recorder)
+    query_capture = query_log.attach(recorder)
+    resources = docker_stats.attach(recorder)
+    # 静的アセットの扱い（HARNESS_STATIC_ASSETS）。未指定でも meta に 'off' を残す
+    static_assets = assets.attach(recorder)
+    recorder.meta['browser_profile'] = browser_profile.mode() or 'off'
+    recorder.meta['launch_profile'] = launch.profile_name(LAUNCH_PROFILE)
+
     total_approved = 0
     approval_results = []
 
-    for approver in APPROVERS:
+    for approver in approvers:
+        # 前回の実行で完了済みの承認者はスキップ
+        if checkpoint.is_done(approver['email']):
+            result = checkpoint.outcome(approver['email'])
+            approval_results.append(result)
+            total_approved += result['approved_count']
+            print(f"\n⏭️ Skipping {approver['name']} (completed in previous run)")
+            continue
+
         print(f"\n👤 Approver: {approver['name']} (Organization {approver['org']})")
         print("=" * 40)
 
@@ -346,17 +404,18 @@ def test_approve_applications():
 
             # ログイン
             print(f"🔐 Logging in as {approver['name']}...")
-            login(driver, approver['email'])
+            with step('login', user=approver['email']):
+                login(driver, approver['email'])
             print(f"✅ {approver['name']} logged in successfully")
 
             # 承認一覧ページへ移動 - applicationsBtnをクリック
-            applications_btn = WebDriverWait(driver, 15).until(
+            applications_btn = FailFastWait(driver, 15).until(
                 EC.element_to_be_clickable((By.ID, "applicationsBtn"))
             )
             applications_btn.click()
             time.sleep(2)
 
-            wait = WebDriverWait(driver, 10)
+            wait = FailFastWait(driver, 10)
 
             # 承認待ち件数を確認
             approval_cards = driver.find_elements(By.CSS_SELECTOR, ".card")
@@ -367,7 +426,8 @@ def test_approve_applications():
                 if approver.get('use_reject_all', False):
                     # 全て却下機能を使用してバグを誘発
                     print(f"   🎯 Organization {approver['org']}: Using 'Reject All' feature (bug test)")
-                    success = process_approvals_with_reject_all(driver, wait, approver['name'])
+                    with step('reject_all', user=approver['email'], items=pending_count):
+                        success = process_approvals_with_reject_all(driver, wait, approver['name'])
                     if success:
                         approved_count = pending_count
                         total_approved += approved_count
@@ -378,12 +438,14 @@ def test_approve_applications():
                 elif approver.get('test_combination_bugs', False):
                     # 組み合わせバグをテスト
                     print(f"   🎯 Organization {approver['org']}: Testing combination bugs")
-                    test_combination_bugs(driver, wait, approver['name'])
+                    with step('combination_bugs', user=approver['email'], items=pending_count):
+                        test_combination_bugs(driver, wait, approver['name'])
                     approved_count = 0  # バグテストのため実際の承認数は0
                 elif approver['use_approve_all']:
                     # 全て承認機能を使用
                     print(f"   🎯 Organization {approver['org']}: Using 'Approve All' feature")
-                    success = process_approvals_with_approve_all(driver, wait, approver['name'])
+                    with step('approve_all', user=approver['email'], items=pending_count):
+                        success = process_approvals_with_approve_all(driver, wait, approver['name'])
                     if success:
                         approved_count = pending_count
                         total_approved += approved_count
@@ -394,7 +456,8 @@ def test_approve_applications():
                 else:
                     # 選択的承認機能を使用
                     print(f"   🎯 Organization {approver['org']}: Using 'Selective Approval' feature")
-                    approved_count = process_approvals_selective(driver, wait, approver['name'])
+                    with step('selective_approve', user=approver['email'], items=pending_count):
+                        approved_count = process_approvals_selective(driver, wait, approver['name'])
                     total_approved += approved_count
                     print(f"   ✅ {approver['name']} approved {approved_count} items")
 
@@ -433,9 +496,14 @@ def test_approve_applications():
 
         finally:
             if driver:
-                driver.quit()
+                # テンプレートから複製したプロファイルもここで削除する
+                browser_profile.quit_driver(driver)
                 print(f"🚪 Closed {approver['name']}'s browser")
 
+        # エラーなく終わった承認者のみ完了として記録（クラッシュした承認者は再開時にやり直す）
+        if 'error' not in approval_results[-1]:
+            checkpoint.mark_done(approver['email'], approval_results[-1])
+
         # 承認者間の待機
         time.sleep(3)
 
@@ -444,7 +512,7 @@ def test_approve_applications():
     print("🎉 APPROVAL PROCESSING TEST COMPLETED!")
     print("=" * 50)
     print(f"📊 Total approvals processed: {total_approved}")
-    print(f"📊 Approvers tested: {len(APPROVERS)}")
+    print(f"📊 Approvers tested: {len(approvers)}")
 
     # 承認方法別の統計
     approve_all_count = sum(1 for r in approval_results if r['method'] == 'approve_all')
@@ -465,7 +533,29 @@ def test_approve_applications():
         json.dump(approval_results, f, ensure_ascii=False, indent=2)
     print(f"\n📁 Approval results saved to approval_results.json")
 
+    # フェーズごとのDB負荷（HARNESS_DB_STATUS=1 のとき）
+    db_status.finish(sampler, recorder)
+    # ステップごとの SQL（HARNESS_QUERY_LOG=1 のとき）
+    query_log.finish(query_capture, recorder)
+    # フェーズごとのコンテナのリソース使用量（HARNESS_DOCKER_STATS=1 のとき）
+    docker_stats.finish(resources, recorder)
+    # ルートごとのアプリの応答時間と注入した障害（HARNESS_FAULT_PROXY 指定時）
+    fault_proxy.finish(proxy, recorder)
+    # CDN のアセットをキャッシュから返した数（HARNESS_STATIC_ASSETS 指定時）
+    assets.finish(static_assets, recorder)
+    # ステップごとの記録（ネットワーク記録が有効ならリクエスト詳細も含む）
+    recorder.save('approve_steps.json')
+
+    # 全承認者を処理し終えたらチェックポイントを破棄
+    if all('error' not in r for r in approval_results):
+        checkpoint.clear()
+
     return approval_results
 
 if __name__ == "__main__":
-    test_approve_applications()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="承認処理テスト")
+    parser.add_argument('--resume', action='store_true', help="前回のチェックポイントから再開する")
+    parser.add_argument('--state-file', help="チェックポイントの状態ファイルのパス")
+    args = parser.parse_args()
+
+    test_approve_applications(resume=args.resume, state_file=args.state_file)
\ No newline at end of file
@@ -4,18 +4,23 @@
 複数のユーザーがそれぞれのブラウザで申請を作成する
 """
 
-import random
+import argparse
+import os
 import time
 from datetime import datetime, timedelta
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import TimeoutException
 
-BASE_URL = "http://localhost:8080"
+from harness import (assets, browser_profile, db_status, docker_stats, fault_proxy, launch, network, preflight, query_log,
+                     seeding, warmup)
+from harness.checkpoint import Checkpoint
+from harness.steps import recorder, step
+from harness.waits import FailFastWait, ServerErrorPage, mark_document, wait_for_navigation
+from harness.driver import chrome_service
+
+BASE_URL = os.getenv("APP_URL", "http://localhost:8080")
 
 # 申請者リスト（各組織から複数選択） - 正しいメールアドレス形式
 APPLICANTS = [
@@ -42,40 +47,44 @@ BUG_TEST_USERS = [
     {'email': 'yoshida.aiko@wf.nrkk.technology', 'name': '吉田愛子', 'org': 4, 'test_bugs': True},
 ]
 
+# バグテストの種類（同日設定・緊急+低優先度・経費申請で金額なし）
+BUG_TYPES = ['same_dates', 'urgent_low', 'expense_no_amount']
+
+# このスクリプトの既定の起動プロファイル
+LAUNCH_PROFILE = 'fast-headless'
+
 def create_chrome_driver():
     """Chrome WebDriverを作成"""
-    chrome_options = webdriver.ChromeOptions()
-    chrome_options.add_argument('--headless')  # ヘッドフルモードで実行
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--disable-features=VizDisplayCompositor')
-    chrome_options.add_argument('--disable-extensions')
-    chrome_options.add_argument('--disable-plugins')
-    chrome_options.add_argument('--disable-background-timer-throttling')
-    chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-    chrome_options.add_argument('--disable-renderer-backgrounding')
-    chrome_options.add_argument('--remote-debugging-port=9222')
-    chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
+    # 起動オプションは harness.launch のプロファイル（HARNESS_LAUNCH_PROFILE で上書き）
+    chrome_options = launch.chrome_options(LAUNCH_PROFILE)
+
+    # HARNESS_NETWORK_CAPTURE=1 のときはリクエストごとの通信記録を取る
+    if network.is_enabled():
+        network.enable_performance_log(chrome_options)
+
+    # HARNESS_BROWSER_PROFILE 指定時は温めたプロファイル・共有キャッシュで起動する
+    browser_profile.apply(chrome_options)
 
     print("    🔧 Creating new Chrome driver...")
-    print("    ⏳ Installing Chrome driver via webdriver-manager...")
-    service = Service(ChromeDriverManager().install())
-    print("    ✓ Chrome driver installed")
+    service = chrome_service()
 
     print("    ⏳ Starting Chrome browser...")
     driver = webdriver.Chrome(service=service, options=chrome_options)
     print("    ✅ Chrome browser started")
 
+    if network.is_enabled():
+        network.attach(driver)
+        print("    ✓ Network capture enabled")
+
+    # HARNESS_STATIC_ASSETS 指定時は CDN のアセットをローカルから返す・画像とフォントをブロックする
+    assets.intercept(driver)
+
     return driver
 
 def login(driver, email, password='password'):
     """ログイン処理"""
     driver.get(f"{BASE_URL}/login")
-    wait = WebDriverWait(driver, 15)
+    wait = FailFastWait(driver, 15)
 
     # ページの読み込み完了を待つ
     wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
@@ -97,9 +106,10 @@ def login(driver, email, password='password'):
     # ログイン後の画面を待つ
     time.sleep(3)
 
-def create_application(driver, applicant_name, index):
-    """申請を作成"""
-    wait = WebDriverWait(driver, 15)
+def create_application(driver, applicant_name, index, rng=None):
+    """申請を作成（種類・優先度・日付・金額は rng から決める）"""
+    rng = rng or seeding.derive('application', applicant_name, index)
+    wait = FailFastWait(driver, 15)
     driver.get(f"{BASE_URL}/dashboard")
 
     # 申請作成ページへ - dashboardのnewApplicationBtnをクリック
@@ -128,7 +138,7 @@ def create_application(driver, applicant_name, index):
     priorities = ['low', 'medium', 'high']
 
     # Type選択
-    selected_type = random.choice(types)
+    selected_type = rng.choice(types)
     type_select = wait.until(EC.element_to_be_clickable((By.NAME, "type")))
     type_select.click()
     time.sleep(0.5)
@@ -137,7 +147,7 @@ def create_application(driver, applicant_name, index):
     print(f"   ✓ Selected type: {selected_type}")
 
     # Priority選択
-    selected_priority = random.choice(priorities)
+    selected_priority = rng.choice(priorities)
     priority_select = wait.until(EC.element_to_be_clickable((By.NAME, "priority")))
     priority_select.click()
     time.sleep(0.5)
@@ -146,8 +156,8 @@ def create_application(driver, applicant_name, index):
     print(f"   ✓ Selected priority: {selected_priority}")
 
     # 希望日と期限日を入力（異なる日付にしてバグを回避）
-    requested_date_obj = datetime.now() + timedelta(days=random.randint(2, 5))
-    due_date_obj = datetime.now() + timedelta(days=random.randint(7, 14))
+    requested_date_obj = datetime.now() + timedelta(days=rng.randint(2, 5))
+    due_date_obj = datetime.now() + timedelta(days=rng.randint(7, 14))
 
     # JavaScriptで直接値を設定（HTML5 date input対応）
     requested_date_str = requested_date_obj.strftime('%Y-%m-%d')
@@ -167,7 +177,7 @@ def create_application(driver, applicant_name, index):
 
     # 金額を入力（expense/purchaseの場合）
     if selected_type in ['expense', 'purchase']:
-        amount = random.randint(1000, 50000)
+        amount = rng.randint(1000, 50000)
         amount_input = driver.find_element(By.NAME, "amount")
         amount_input.clear()
         amount_input.send_keys(str(amount))
@@ -176,10 +186,16 @@ def create_application(driver, applicant_name, index):
     # 申請ボタンクリック
     submit_button = wait.until(EC.element_to_be_clickable((By.ID, "submitApplicationBtn")))
     print("   ✓ Found submit button, clicking...")
+    mark_document(driver)
     submit_button.click()
 
-    # 申請後のページ遷移を待つ
-    time.sleep(3)
+    # 申請後のページ遷移を待つ（エラーページならその場で中断）
+    try:
+        wait_for_navigation(driver)
+    except ServerErrorPage as e:
+        print(f"   ❌ Failed to create application: {e}")
+        network.report_current_step()
+        return None
 
     current_url = driver.current_url
     print(f"   📍 After submit URL: {current_url}")
@@ -190,12 +206,13 @@ def create_application(driver, applicant_name, index):
         return application_id
     else:
         print("   ❌ Failed to create application")
+        network.report_current_step()
         return None
     driver.get(f"{BASE_URL}/applications/create")
 
 def create_bug_application(driver, applicant_name, bug_type):
     """バグが発生する申請を作成"""
-    wait = WebDriverWait(driver, 15)
+    wait = FailFastWait(driver, 15)
     driver.get(f"{BASE_URL}/dashboard")
 
     # 申請作成ページへ
@@ -286,12 +303,19 @@ def create_bug_application(driver, applicant_name, bug_type):
 
     # 申請ボタンクリック
     submit_button = wait.until(EC.element_to_be_clickable((By.ID, "submitApplicationBtn")))
+    mark_document(driver)
     submit_button.click()
-    time.sleep(3)
+
+    # サーバーエラーで落ちた場合も分類してバグ発生として扱う
+    try:
+        wait_for_navigation(driver)
+    except ServerErrorPage as e:
+        print(f"   ✅ Bug triggered: {e}")
+        return {'bug': bug_type, 'triggered': True, 'error': str(e), 'server_error': e.to_dict()}
 
     # エラーメッセージを確認
     try:
-        error_element = wait.until(EC.presence_of_element_located((By.CLASS_NAME, "alert-danger")), timeout=5)
+        error_element = FailFastWait(driver, 5).until(EC.presence_of_element_located((By.CLASS_NAME, "alert-danger")))
         print(f"   ✅ Bug triggered: {error_element.text}")
         return {'bug': bug_type, 'triggered': True, 'error': error_element.text}
     except TimeoutException:
@@ -304,19 +328,49 @@ def create_bug_application(driver, applicant_name, bug_type):
             print(f"   ❌ Bug not triggered - Unexpected state")
             return {'bug': bug_type, 'triggered': False}
 
-def test_create_applications():
+def test_create_applications(resume=False, state_file=None, seed=None):
     """複数ユーザーで申請を作成するテスト"""
+    global BASE_URL
     print("🧪 Application Creation Test")
     print("=" * 50)
     print(f"🔗 Base URL: {BASE_URL}")
-    print(f"👥 Testing with {len(APPLICANTS) + len(BUG_TEST_USERS)} users")
+
+    # ブラウザを起動する前にログインできないユーザーを除外（HARNESS_PREFLIGHT=0 で省略）
+    applicants = preflight.filter_users(APPLICANTS, 'applicant', BASE_URL)
+    bug_users = preflight.filter_users(BUG_TEST_USERS, 'applicant', BASE_URL)
+
+    print(f"👥 Testing with {len(applicants) + len(bug_users)} users")
     print("🚀 Starting test execution...")
 
-    created_applications = []
+    checkpoint = Checkpoint('create_applications', path=state_file, resume=resume)
+    # 再開時は前回のシードを引き継ぎ、同じ申請内容で続ける
+    seeding.init(seed if seed is not None else checkpoint.get('seed'))
+    checkpoint.set('seed', seeding.current())
+    recorder.meta['seed'] = seeding.current()
+    # 計測前のウォームアップ（HARNESS_WARMUP=1 のとき。集計からは除外）
+    warmup.run(recorder, BASE_URL)
+    # HARNESS_FAULT_PROXY 指定時は、以降のブラウザ操作を遅延・障害注入プロキシ経由にする
+    proxy = fault_proxy.attach(recorder, BASE_URL)
+    if proxy:
+        BASE_URL = proxy.base_url
+    sampler = db_status.attach(recorder)
+    query_capture = query_log.attach(recorder)
+    resources = docker_stats.attach(recorder)
+    # 静的アセットの扱い（HARNESS_STATIC_ASSETS）。未指定でも meta に 'off' を残す
+    static_assets = assets.attach(recorder)
+    recorder.meta['browser_profile'] = browser_profile.mode() or 'off'
+    recorder.meta['launch_profile'] = launch.profile_name(LAUNCH_PROFILE)
+
+    # 再開時は前回までに作成済みの申請を引き継ぐ
+    created_applications = checkpoint.created
     bug_results = []
 
     # 通常の申請者でテスト
-    for applicant in APPLICANTS:
+    for applicant in applicants:
+        if checkpoint.is_done(applicant['email']):
+            print(f"\n⏭️ Skipping {applicant['name']} (completed in previous run)")
+            continue
+
         print(f"\n👤 Applicant: {applicant['name']} (Organization {applicant['org']})")
         print("=" * 40)
 
@@ -327,32 +381,53 @@ def test_create_applications():
 
             # ログイン
             print(f"🔐 Logging in as {applicant['name']}...")
-            login(driver, applicant['email'])
+            with step('login', user=applicant['email']):
+                login(driver, applicant['email'])
             print(f"✅ {applicant['name']} logged in successfully")
 
-            # 2-3個の申請を作成
-            num_applications = random.randint(2, 3)
+            # 2-3個の申請を作成（再開時は前回決めた件数を使う）
+            plan_key = f"plan:{applicant['email']}"
+            num_applications = checkpoint.get(plan_key) or seeding.derive('plan', applicant['email']).randint(2, 3)
+            checkpoint.set(plan_key, num_applications)
             print(f"📝 Creating {num_applications} applications...")
 
             for i in range(1, num_applications + 1):
+                unit = f"{applicant['email']}#{i}"
+                if checkpoint.is_done(unit):
+                    print(f"⏭️ Application {i} already created in previous run")
+                    continue
+
                 print(f"📝 Creating {i} / {num_applications} applications...")
-                app_id = create_application(driver, applicant['name'], i)
+                with step('create_application', user=applicant['email'], index=i):
+                    app_id = create_application(driver, applicant['name'], i,
+                                                rng=seeding.derive('application', applicant['email'], i))
                 if app_id:
-                    created_applications.append({
+                    record = {
                         'applicant': applicant['name'],
                         'org': applicant['org'],
                         'application_id': app_id
-                    })
+                    }
+                    created_applications.append(record)
+                    checkpoint.add_created(record)
+                    # 作成できなかった申請は完了にせず、再開時に作り直す
+                    checkpoint.mark_done(unit, app_id)
                 time.sleep(1)  # 申請間の待機
 
-            print(f"✅ Created {num_applications} applications for {applicant['name']}")
+            pending = [i for i in range(1, num_applications + 1)
+                       if not checkpoint.is_done(f"{applicant['email']}#{i}")]
+            if pending:
+                print(f"⚠️ {len(pending)} application(s) failed for {applicant['name']} (retried on --resume)")
+            else:
+                checkpoint.mark_done(applicant['email'])
+                print(f"✅ Created {num_applications} applications for {applicant['name']}")
 
         except Exception as e:
             print(f"❌ Error for {applicant['name']}: {e}")
 
         finally:
             if driver:
-                driver.quit()
+                # テンプレートから複製したプロファイルもここで削除する
+                browser_profile.quit_driver(driver)
                 print(f"🚪 Closed {applicant['name']}'s browser")
 
         # ユーザー間の待機
@@ -363,7 +438,12 @@ def test_create_applications():
     print("🐛 BUG TEST PHASE")
     print("=" * 50)
 
-    for bug_user in BUG_TEST_USERS:
+    for bug_user in bug_users:
+        if checkpoint.is_done(bug_user['email']):
+            bug_results.extend(checkpoint.outcome(bug_user['email']))
+            print(f"\n⏭️ Skipping {bug_user['name']} (completed in previous run)")
+            continue
+
         print(f"\n👤 Bug Test User: {bug_user['name']} (Organization {bug_user['org']})")
         print("=" * 40)
 
@@ -374,54 +454,64 @@ def test_create_applications():
 
             # ログイン
             print(f"🔐 Logging in as {bug_user['name']}...")
-            login(driver, bug_user['email'])
+            with step('login', user=bug_user['email']):
+                login(driver, bug_user['email'])
             print(f"✅ {bug_user['name']} logged in successfully")
 
             # バグテスト実施
             print(f"🐛 Running bug tests for {bug_user['name']}...")
 
-            # バグ1: 同日設定
-            bug_result = create_bug_application(driver, bug_user['name'], 'same_dates')
-            bug_results.append({
-                'user': bug_user['name'],
-                'org': bug_user['org'],
-                **bug_result
-            })
-            time.sleep(2)
-
-            # バグ2: 緊急+低優先度
-            bug_result = create_bug_application(driver, bug_user['name'], 'urgent_low')
-            bug_results.append({
-                'user': bug_user['name'],
-                'org': bug_user['org'],
-                **bug_result
-            })
-            time.sleep(2)
-
-            # バグ3: 経費申請で金額なし
-            bug_result = create_bug_application(driver, bug_user['name'], 'expense_no_amount')
-            bug_results.append({
-                'user': bug_user['name'],
-                'org': bug_user['org'],
-                **bug_result
-            })
-
-            # 正常な申請も1つ作成
-            print(f"📝 Creating normal application...")
-            app_id = create_application(driver, bug_user['name'], 99)
-            if app_id:
-                created_applications.append({
-                    'applicant': bug_user['name'],
+            # バグ1: 同日設定 / バグ2: 緊急+低優先度 / バグ3: 経費申請で金額なし
+            for bug_type in BUG_TYPES:
+                unit = f"{bug_user['email']}#{bug_type}"
+                if checkpoint.is_done(unit):
+                    print(f"⏭️ Bug test {bug_type} already run in previous run")
+                    bug_results.append(checkpoint.outcome(unit))
+                    continue
+                with step('create_bug_application', user=bug_user['email'], bug=bug_type):
+                    bug_result = create_bug_application(driver, bug_user['name'], bug_type)
+                result = {
+                    'user': bug_user['name'],
                     'org': bug_user['org'],
-                    'application_id': app_id
-                })
+                    **bug_result
+                }
+                bug_results.append(result)
+                checkpoint.mark_done(unit, result)
+                time.sleep(2)
+
+            # 正常な申請も1つ作成（再開時に二重に作らないよう、ユーザーとは別の単位で記録）
+            unit = f"{bug_user['email']}#99"
+            if checkpoint.is_done(unit):
+                print(f"⏭️ Normal application already created in previous run")
+            else:
+                print(f"📝 Creating normal application...")
+                with step('create_application', user=bug_user['email'], index=99):
+                    app_id = create_application(driver, bug_user['name'], 99,
+                                                rng=seeding.derive('application', bug_user['email'], 99))
+                if app_id:
+                    record = {
+                        'applicant': bug_user['name'],
+                        'org': bug_user['org'],
+                        'application_id': app_id
+                    }
+                    created_applications.append(record)
+                    checkpoint.add_created(record)
+                    checkpoint.mark_done(unit, app_id)
+
+            # このユーザーのバグテスト結果をまとめて完了として記録
+            if checkpoint.is_done(unit):
+                checkpoint.mark_done(
+                    bug_user['email'],
+                    [r for r in bug_results if r['user'] == bug_user['name']]
+                )
 
         except Exception as e:
             print(f"❌ Error for {bug_user['name']}: {e}")
 
         finally:
             if driver:
-                driver.quit()
+                # テンプレートから複製したプロファイルもここで削除する
+                browser_profile.quit_driver(driver)
                 print(f"🚪 Closed {bug_user['name']}'s browser")
 
         # ユーザー間の待機
@@ -432,7 +522,7 @@ def test_create_applications():
     print("🎉 APPLICATION CREATION TEST COMPLETED!")
     print("=" * 50)
     print(f"📊 Total applications created: {len(created_applications)}")
-    print(f"📊 Users tested: {len(APPLICANTS) + len(BUG_TEST_USERS)}")
+    print(f"📊 Users tested: {len(applicants) + len(bug_users)}")
 
     # 組織別の統計
     org_stats = {}
@@ -454,14 +544,36 @@ def test_create_applications():
             if result['triggered']:
                 bug_summary[result['bug']] += 1
 
-        print(f"   Same Date Bug: {bug_summary['same_dates']}/{len(BUG_TEST_USERS)} triggered")
-        print(f"   Urgent+Low Priority Bug: {bug_summary['urgent_low']}/{len(BUG_TEST_USERS)} triggered")
-        print(f"   Expense Without Amount Bug: {bug_summary['expense_no_amount']}/{len(BUG_TEST_USERS)} triggered")
+        print(f"   Same Date Bug: {bug_summary['same_dates']}/{len(bug_users)} triggered")
+        print(f"   Urgent+Low Priority Bug: {bug_summary['urgent_low']}/{len(bug_users)} triggered")
+        print(f"   Expense Without Amount Bug: {bug_summary['expense_no_amount']}/{len(bug_users)} triggered")
+
+    # フェーズごとのDB負荷（HARNESS_DB_STATUS=1 のとき）
+    db_status.finish(sampler, recorder)
+    # ステップごとの SQL（HARNESS_QUERY_LOG=1 のとき）
+    query_log.finish(query_capture, recorder)
+    # フェーズごとのコンテナのリソース使用量（HARNESS_DOCKER_STATS=1 のとき）
+    docker_stats.finish(resources, recorder)
+    # ルートごとのアプリの応答時間と注入した障害（HARNESS_FAULT_PROXY 指定時）
+    fault_proxy.finish(proxy, recorder)
+    # CDN のアセットをキャッシュから返した数（HARNESS_STATIC_ASSETS 指定時）
+    assets.finish(static_assets, recorder)
+
+    # 事前チェックを通った全ユーザーを処理し終えたらチェックポイントを破棄（失敗したユーザーが残っていれば --resume で続きから）
+    if all(checkpoint.is_done(user['email']) for user in applicants + bug_users):
+        checkpoint.clear()
 
     return created_applications, bug_results
 
 if __name__ == "__main__":
-    created_apps, bug_test_results = test_create_applications()
+    parser = argparse.ArgumentParser(description="申請作成テスト")
+    parser.add_argument('--resume', action='store_true', help="前回のチェックポイントから再開する")
+    parser.add_argument('--state-file', help="チェックポイントの状態ファイルのパス")
+    seeding.add_argument(parser)
+    args = parser.parse_args()
+
+    created_apps, bug_test_results = test_create_applications(resume=args.resume, state_file=args.state_file,
+                                                              seed=args.seed)
 
     # 作成された申請IDをファイルに保存（承認テストで使用）
     import json
@@ -473,4 +585,7 @@ if __name__ == "__main__":
     if bug_test_results:
         with open('bug_test_results.json', 'w') as f:
             json.dump(bug_test_results, f, ensure_ascii=False, indent=2)
-        print(f"📁 Bug test results saved to bug_test_results.json")
\ No newline at end of file
+        print(f"📁 Bug test results saved to bug_test_results.json")
+
+    # ステップごとの記録（ネットワーク記録が有効ならリクエスト詳細も含む）
+    recorder.save('create_steps.json')
\ No newline at end of file
@@ -16,9 +16,9 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+
+from harness import launch
+from harness.driver import chrome_service
 
 class MultiBrowserApprovalTest:
     def __init__(self):
@@ -44,32 +44,11 @@ class MultiBrowserApprovalTest:
     def create_driver(self):
         """新しいChromeドライバーインスタンスを作成"""
         print("    🔧 Creating new Chrome driver...")
-        chrome_options = Options()
-        
-        # コンテナ環境での必須オプション
-        chrome_options.add_argument('--headless')  # コンテナではヘッドレスモード
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--disable-features=VizDisplayCompositor')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--remote-debugging-port=9222')
-        chrome_options.add_argument('--disable-extensions')
-        chrome_options.add_argument('--disable-plugins')
-        chrome_options.add_argument('--disable-background-timer-throttling')
-        chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-        chrome_options.add_argument('--disable-renderer-backgrounding')
+        # コンテナではヘッドレス（harness.launch のプロファイル。HARNESS_LAUNCH_PROFILE で上書き）
+        chrome_options = launch.chrome_options('fast-headless')
         
-        # コンテナ環境でのChromeDriverパス
-        chrome_driver_path = os.getenv('CHROME_DRIVER_PATH')
-        if chrome_driver_path and os.path.exists(chrome_driver_path):
-            print(f"    ✓ Using Chrome driver at: {chrome_driver_path}")
-            service = Service(chrome_driver_path)
-        else:
-            # ローカル開発環境ではwebdriver-managerを使用
-            print("    ⏳ Installing Chrome driver via webdriver-manager...")
-            service = Service(ChromeDriverManager().install())
-            print("    ✓ Chrome driver installed")
+        # CHROME_DRIVER_PATH → ローカルキャッシュ → webdriver-manager の順に解決（プロセス内で1回）
+        service = chrome_service()
 
         print("    ⏳ Starting Chrome browser...")
         driver = webdriver.Chrome(service=service, options=chrome_options)
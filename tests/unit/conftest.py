@@ -0,0 +1,12 @@
+"""
+ハーネス（tests/harness）の単体テスト
+
+ブラウザやアプリを使わずに動く部分だけを対象にする。
+cd tests && python -m pytest unit
+"""
+
+import os
+import sys
+
+# harness パッケージを tests/ から読み込む（スクリプトと同じ import harness.xxx の形）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
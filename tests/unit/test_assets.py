@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from harness import assets
+from harness.steps import StepRecorder
+
+
+class _CdpDriver:
+    def __init__(self):
+        self.commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('', set()),
+    ('local', {'local'}),
+    (' local , block-media ', {'local', 'block-media'}),
+    ('block-media,', {'block-media'}),
+])
+def test_modes(monkeypatch, value, expected):
+    monkeypatch.setenv('HARNESS_STATIC_ASSETS', value)
+    assert assets.modes() == expected
+    assert assets.is_enabled() == bool(expected)
+
+
+def test_unknown_mode_is_rejected(monkeypatch):
+    monkeypatch.setenv('HARNESS_STATIC_ASSETS', 'local,offline')
+    with pytest.raises(ValueError, match='offline'):
+        assets.modes()
+
+
+def test_cache_path_keeps_host_and_path(tmp_path):
+    url = 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css'
+    assert assets.cache_path(url, str(tmp_path)) == os.path.join(
+        str(tmp_path), 'cdn.jsdelivr.net', 'npm', 'bootstrap@5.3.0', 'dist', 'css', 'bootstrap.min.css')
+
+
+def test_intercept_blocks_media_only_when_selected(monkeypatch):
+    monkeypatch.delenv('HARNESS_STATIC_ASSETS', raising=False)
+    driver = _CdpDriver()
+    assets.intercept(driver)
+    assert driver.commands == []
+
+    monkeypatch.setenv('HARNESS_STATIC_ASSETS', 'block-media')
+    assets.intercept(driver)
+    assert driver.commands == [('Network.enable', {}),
+                               ('Network.setBlockedURLs', {'urls': assets.MEDIA_PATTERNS})]
+
+
+def test_attach_records_off_when_disabled(monkeypatch):
+    monkeypatch.delenv('HARNESS_STATIC_ASSETS', raising=False)
+    recorder = StepRecorder()
+    assert assets.attach(recorder) is None
+    assert recorder.meta['static_assets'] == {'mode': 'off', 'blocked': []}
+    assert assets.finish(None, recorder) is None
+
+
+def test_phases_get_the_served_count(monkeypatch):
+    monkeypatch.setenv('HARNESS_STATIC_ASSETS', 'local')
+    monkeypatch.setattr(assets, '_totals', assets.collections.Counter())
+    recorder = StepRecorder()
+    marker = assets.attach(recorder)
+    with recorder.step('approve_all') as phase:
+        with recorder.step('login') as nested:
+            assets._count('served', 3)
+        assets._count('missed')
+
+    totals = assets.finish(marker, recorder)
+    assert phase.data['static_assets'] == {'mode': 'local', 'served': 3, 'missed': 1}
+    assert 'static_assets' not in nested.data
+    assert totals == {'served': 3, 'missed': 1}
+    assert recorder.meta['static_assets']['served'] == 3
+    assert marker not in recorder.listeners
@@ -0,0 +1,64 @@
+import pytest
+
+from harness import bench_newrelic
+
+
+def _round(stack, wall, per_route):
+    samples = {route: [10.0] * per_route for route in bench_newrelic.ROUTES}
+    samples['errors'] = [{'route': 'submit', 'error': 'HTTP 500'}]
+    samples['wall_seconds'] = wall
+    return {'stack': stack, 'samples': samples}
+
+
+def test_round_throughput_uses_wall_clock_time():
+    # 各ルート 2件・5ルートの成功が 4 秒で終わった（1件 10ms の応答時間とは無関係）
+    samples = _round('baseline', 4.0, 2)['samples']
+    assert bench_newrelic.round_throughput(samples) == 10 / 4.0
+    assert bench_newrelic.round_throughput({'wall_seconds': 0}) is None
+
+
+def test_compare_throughput_over_rounds():
+    rounds = [_round('baseline', 2.0, 2), _round('newrelic', 2.5, 2),
+              _round('newrelic', 2.5, 2), _round('baseline', 2.0, 2)]
+    result = bench_newrelic.compare_throughput(rounds)
+    assert result['baseline']['rounds_rps'] == [5.0, 5.0]
+    assert result['newrelic']['rounds_rps'] == [4.0, 4.0]
+    assert result['diff_rps'] == {'mean': -1.0, 'low': -1.0, 'high': -1.0}
+    assert result['diff_pct'] == -20.0
+
+
+def test_run_round_merges_concurrent_clients(monkeypatch):
+    users = []
+
+    def fake_scenario(base_url, seed, iterations, batch, applicant, approver, client):
+        users.append((client, applicant, approver))
+        return {'login': [1.0, 2.0], 'create': [3.0], 'errors': [{'client': client}], 'wall_seconds': 9.0}
+
+    monkeypatch.setattr(bench_newrelic, 'run_scenario', fake_scenario)
+    merged = bench_newrelic.run_round('http://app', 1, 1, 1, 'a', 'b', clients=3)
+    assert sorted(users)[0] == (0, 'a', 'b')
+    assert len({approver for _, _, approver in users}) == 3
+    assert merged['clients'] == 3
+    assert len(merged['login']) == 6 and len(merged['create']) == 3
+    assert sorted(e['client'] for e in merged['errors']) == [0, 1, 2]
+    # クライアントごとの経過時間ではなく、全体の経過時間
+    assert merged['wall_seconds'] < 9.0
+
+
+def test_each_client_gets_its_own_organization():
+    pairs = bench_newrelic.client_users(bench_newrelic.DEFAULT_APPLICANT, bench_newrelic.DEFAULT_APPROVER, 9)
+    assert pairs[0] == (bench_newrelic.DEFAULT_APPLICANT, bench_newrelic.DEFAULT_APPROVER)
+    assert len(set(pairs)) == 9
+    assert len({applicant for applicant, _ in pairs}) == len({approver for _, approver in pairs}) == 9
+
+
+def test_custom_users_are_not_shared_with_other_clients():
+    applicant, approver = bench_newrelic.CLIENT_USERS[2]
+    pairs = bench_newrelic.client_users(applicant, approver, 9)
+    assert pairs[0] == (applicant, approver)
+    assert sum(1 for pair in pairs if approver in pair) == 1
+
+
+def test_too_many_clients_are_rejected():
+    with pytest.raises(SystemExit):
+        bench_newrelic.client_users(bench_newrelic.DEFAULT_APPLICANT, bench_newrelic.DEFAULT_APPROVER, 10)
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from harness import browser_profile
+
+
+class FakeDriver:
+    def __init__(self, user_data_dir=None):
+        self.capabilities = {'chrome': {'userDataDir': user_data_dir}} if user_data_dir else {}
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def template(tmp_path, monkeypatch):
+    monkeypatch.setenv('HARNESS_PROFILE_DIR', str(tmp_path))
+    path = tmp_path / 'template' / 'Default'
+    path.mkdir(parents=True)
+    (path / 'Preferences').write_text('{}', encoding='utf-8')
+    (tmp_path / 'template' / 'SingletonLock').write_text('', encoding='utf-8')
+    return tmp_path / 'template'
+
+
+def test_clone_copies_template_without_locks(template):
+    session = browser_profile.clone_template()
+    try:
+        assert os.path.isfile(os.path.join(session, 'Default', 'Preferences'))
+        assert not os.path.exists(os.path.join(session, 'SingletonLock'))
+    finally:
+        browser_profile.remove(session)
+
+
+def test_quit_driver_deletes_cloned_profile(template):
+    session = browser_profile.clone_template()
+    driver = FakeDriver(session)
+
+    browser_profile.quit_driver(driver)
+
+    assert driver.quit_called
+    assert not os.path.exists(session)
+    assert session not in browser_profile._sessions
+
+
+def test_quit_driver_keeps_directories_it_did_not_clone(tmp_path):
+    other = tmp_path / 'profile'
+    other.mkdir()
+    driver = FakeDriver(str(other))
+
+    browser_profile.quit_driver(driver)
+
+    assert driver.quit_called
+    assert other.is_dir()
+    assert not browser_profile.remove(str(other))
+
+
+def test_quit_driver_without_capabilities():
+    driver = FakeDriver()
+    browser_profile.quit_driver(driver)
+    assert driver.quit_called
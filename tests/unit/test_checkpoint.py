@@ -0,0 +1,55 @@
+import json
+
+from harness.checkpoint import Checkpoint
+
+
+def test_mark_done_is_saved_immediately(tmp_path):
+    path = tmp_path / 'create.json'
+    checkpoint = Checkpoint('create', path=str(path))
+    checkpoint.mark_done('a@example.com#1', 12)
+
+    saved = json.loads(path.read_text(encoding='utf-8'))
+    assert saved['completed'] == {'a@example.com#1': 12}
+    assert not (tmp_path / 'create.json.tmp').exists()
+
+
+def test_resume_restores_completed_units_and_created_records(tmp_path):
+    path = str(tmp_path / 'create.json')
+    first = Checkpoint('create', path=path)
+    first.add_created({'applicant': 'A', 'application_id': 1})
+    first.mark_done('a@example.com#1', 1)
+    first.set('plan:a@example.com', 3)
+
+    resumed = Checkpoint('create', path=path, resume=True)
+    assert resumed.resumed
+    assert resumed.is_done('a@example.com#1')
+    assert resumed.outcome('a@example.com#1') == 1
+    assert not resumed.is_done('a@example.com#2')
+    assert resumed.created == [{'applicant': 'A', 'application_id': 1}]
+    assert resumed.get('plan:a@example.com') == 3
+
+
+def test_without_resume_the_previous_state_is_ignored(tmp_path):
+    path = str(tmp_path / 'create.json')
+    Checkpoint('create', path=path).mark_done('a@example.com')
+
+    fresh = Checkpoint('create', path=path)
+    assert not fresh.resumed
+    assert not fresh.is_done('a@example.com')
+
+
+def test_unit_marked_without_outcome_is_still_done(tmp_path):
+    checkpoint = Checkpoint('create', path=str(tmp_path / 'create.json'))
+    checkpoint.mark_done('a@example.com')
+    assert checkpoint.is_done('a@example.com')
+    assert checkpoint.outcome('a@example.com') is None
+
+
+def test_clear_removes_the_state_file(tmp_path):
+    path = tmp_path / 'create.json'
+    checkpoint = Checkpoint('create', path=str(path))
+    checkpoint.mark_done('a@example.com')
+    checkpoint.clear()
+    assert not path.exists()
+    # 2回目の clear（状態ファイルなし）はエラーにしない
+    checkpoint.clear()
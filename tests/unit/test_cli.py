@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+import harness.__main__ as cli
+
+
+def test_scripts_and_benchmarks_exist():
+    for path, _ in cli.SCRIPTS.values():
+        assert os.path.exists(path), path
+    for module in cli.BENCHMARKS.values():
+        assert os.path.exists(os.path.join(cli.TESTS_DIR, *module.split('.')) + '.py'), module
+
+
+def test_usage_lists_every_command(capsys):
+    cli.main([])
+    out = capsys.readouterr().out
+    for name in list(cli.SCRIPTS) + list(cli.COMMANDS):
+        assert name in out
+
+
+def test_unknown_command_exits():
+    with pytest.raises(SystemExit, match='Unknown command: nope'):
+        cli.main(['nope'])
+
+
+def test_script_commands_pass_the_remaining_arguments(monkeypatch):
+    calls = []
+    monkeypatch.setattr(cli, 'run_script', lambda path, argv: calls.append((path, argv)))
+    cli.main(['create', '--seed', '42'])
+    assert calls == [(cli.SCRIPTS['create'][0], ['--seed', '42'])]
+
+
+def test_bench_dispatches_to_the_module(monkeypatch):
+    calls = []
+    module = types.SimpleNamespace(main=calls.append)
+    monkeypatch.setattr(cli.importlib, 'import_module', lambda name: module)
+    cli.main(['bench', 'mail', '--count', '3'])
+    assert calls == [['--count', '3']]
+    with pytest.raises(SystemExit, match='usage'):
+        cli.main(['bench'])
+
+
+def test_report_without_records_exits(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit, match='No step records'):
+        cli.main(['report'])
+
+
+def test_help_does_not_import_selenium():
+    code = "import sys, harness.__main__ as m; m.main(['--help']); print('selenium' in sys.modules)"
+    out = subprocess.run([sys.executable, '-c', code], cwd=cli.TESTS_DIR,
+                         capture_output=True, text=True, timeout=60).stdout
+    assert out.strip().endswith('False')
@@ -0,0 +1,117 @@
+from harness import db_status
+from harness.steps import StepRecorder
+
+
+class _Cursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        self.connection.executed.append(sql)
+
+    def fetchall(self):
+        return self.connection.statuses.pop(0)
+
+
+class FakeConnection:
+    """SHOW GLOBAL STATUS の結果を順に返す"""
+
+    def __init__(self, statuses):
+        self.statuses = [list(s.items()) for s in statuses]
+        self.executed = []
+        self.closed = False
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def close(self):
+        self.closed = True
+
+
+def test_snapshot_keeps_only_numeric_tracked_counters():
+    sampler = db_status.DbStatusSampler(FakeConnection([
+        {'Questions': '10', 'Innodb_rows_read': '5', 'Uptime': '100', 'Com_select': 'n/a'},
+    ]))
+    assert sampler.snapshot() == {'Questions': 10, 'Innodb_rows_read': 5}
+
+
+def test_step_gets_counter_deltas_without_the_samplers_own_queries():
+    steps = StepRecorder()
+    sampler = db_status.DbStatusSampler(FakeConnection([
+        {'Questions': '100', 'Innodb_rows_read': '50', 'Com_insert': '3'},
+        {'Questions': '112', 'Innodb_rows_read': '80', 'Com_insert': '3'},
+    ]))
+    steps.add_listener(sampler)
+    with steps.step('approve_all', items=3) as step:
+        pass
+
+    # 終了時の SHOW GLOBAL STATUS の1回分を Questions から除き、変化のないカウンターは残さない
+    assert step.data['db'] == {'Questions': 11, 'Innodb_rows_read': 30}
+
+
+def test_phase_report_sums_top_level_steps_per_item():
+    steps = StepRecorder()
+    with steps.step('approve_all', items=2) as first:
+        with steps.step('login') as nested:
+            nested.data['db'] = {'Questions': 100}
+    first.data['db'] = {'Questions': 10, 'Innodb_rows_read': 40}
+    with steps.step('approve_all', items=3) as second:
+        pass
+    second.data['db'] = {'Questions': 20}
+    with steps.step('login'):
+        pass
+
+    report = db_status.phase_report(steps.steps)
+
+    assert list(report) == ['approve_all']
+    assert report['approve_all']['steps'] == 2
+    assert report['approve_all']['items'] == 5
+    assert report['approve_all']['totals'] == {'Questions': 30, 'Innodb_rows_read': 40}
+    assert report['approve_all']['per_item'] == {'Questions': 6.0, 'Innodb_rows_read': 8.0}
+
+
+def test_save_report_appends_to_the_history(tmp_path, monkeypatch):
+    monkeypatch.setenv('COMMIT_SHA', 'abc123')
+    path, history = tmp_path / 'report.json', tmp_path / 'history.jsonl'
+    db_status.save_report({'login': {}}, path=str(path), history_path=str(history))
+    db_status.save_report({'login': {}}, path=str(path), history_path=str(history))
+
+    assert '"release": "abc123"' in path.read_text(encoding='utf-8')
+    assert len(history.read_text(encoding='utf-8').splitlines()) == 2
+
+
+def test_calibrate_measures_the_cost_of_one_snapshot():
+    sampler = db_status.DbStatusSampler(FakeConnection([
+        {'Questions': '100', 'Created_tmp_tables': '10', 'Innodb_rows_read': '5'},
+        {'Questions': '101', 'Created_tmp_tables': '11', 'Innodb_rows_read': '5'},
+        # アプリのクエリが混ざった区間は最小値で除かれる
+        {'Questions': '105', 'Created_tmp_tables': '12', 'Innodb_rows_read': '9'},
+        {'Questions': '106', 'Created_tmp_tables': '13', 'Innodb_rows_read': '9'},
+    ]))
+    assert sampler.calibrate() == {'Questions': 1, 'Created_tmp_tables': 1}
+
+
+def test_snapshots_and_declared_harness_queries_are_subtracted(monkeypatch):
+    monkeypatch.setattr(db_status, '_own_counters', db_status.collections.Counter())
+    steps = StepRecorder()
+    sampler = db_status.DbStatusSampler(FakeConnection([
+        {'Questions': '100', 'Com_select': '40', 'Created_tmp_tables': '10'},
+        {'Questions': '101', 'Com_select': '40', 'Created_tmp_tables': '11'},
+        {'Questions': '102', 'Com_select': '40', 'Created_tmp_tables': '12'},
+        {'Questions': '120', 'Com_select': '50', 'Created_tmp_tables': '14'},
+    ]))
+    sampler.overhead = {'Questions': 1, 'Created_tmp_tables': 1}
+    steps.add_listener(sampler)
+    with steps.step('approve_all') as step:
+        with steps.step('login'):
+            # query_log の目印など、ハーネスの別の接続から流したクエリ
+            db_status.note_own_query({'Questions': 2, 'Com_select': 2})
+
+    # 入れ子のステップの開始・終了と自身の終了の3回のスナップショット、申告された2クエリを除く
+    assert step.data['db'] == {'Questions': 15, 'Com_select': 8, 'Created_tmp_tables': 1}
@@ -0,0 +1,84 @@
+from harness import docker_stats
+from harness.steps import StepRecorder
+
+RAW = {
+    'cpu_stats': {
+        'cpu_usage': {'total_usage': 5_000_000_000, 'percpu_usage': [1, 2, 3, 4]},
+        'system_cpu_usage': 100_000_000_000,
+    },
+    'memory_stats': {'usage': 300 * 1024 * 1024, 'limit': 2048 * 1024 * 1024,
+                     'stats': {'inactive_file': 100 * 1024 * 1024}},
+    'networks': {'eth0': {'rx_bytes': 1000, 'tx_bytes': 200}, 'eth1': {'rx_bytes': 24, 'tx_bytes': 0}},
+    'blkio_stats': {'io_service_bytes_recursive': [
+        {'op': 'Read', 'value': 4096}, {'op': 'Write', 'value': 8192}, {'op': 'Total', 'value': 12288},
+    ]},
+}
+
+
+def test_parse_stats_cgroup_v2():
+    parsed = docker_stats.parse_stats(RAW)
+    assert parsed['cpu_total'] == 5_000_000_000
+    # online_cpus がなければ percpu_usage の数を使う
+    assert parsed['online_cpus'] == 4
+    # inactive_file（ページキャッシュ）は除く
+    assert parsed['mem_bytes'] == 200 * 1024 * 1024
+    assert (parsed['net_rx'], parsed['net_tx']) == (1024, 200)
+    assert (parsed['blk_read'], parsed['blk_write']) == (4096, 8192)
+
+
+def test_parse_stats_cgroup_v1_and_missing_sections():
+    raw = {'cpu_stats': {'online_cpus': 2}, 'memory_stats': {'usage': 50, 'stats': {'total_inactive_file': 80}}}
+    parsed = docker_stats.parse_stats(raw)
+    assert parsed['online_cpus'] == 2
+    assert parsed['mem_bytes'] == 0
+    assert parsed['net_rx'] == parsed['blk_read'] == 0
+
+
+def test_cpu_percent_matches_docker_stats():
+    previous = {'cpu_total': 0, 'system_cpu': 0, 'online_cpus': 4}
+    current = {'cpu_total': 1_000, 'system_cpu': 10_000, 'online_cpus': 4}
+    assert docker_stats.cpu_percent(previous, current) == 40.0
+    # コンテナの再起動などでカウンターが戻ったときは 0
+    assert docker_stats.cpu_percent(current, previous) == 0.0
+
+
+def test_verdict_counts_local_browsers_as_client():
+    assert docker_stats.verdict({'approval-workflow-app': 40.0, docker_stats.HARNESS: 5.0,
+                                 docker_stats.LOCAL_BROWSERS: 60.0}) == 'client'
+    assert docker_stats.verdict({'approval-workflow-app': 40.0, docker_stats.HARNESS: 5.0}) == 'server'
+    assert docker_stats.verdict({}) == 'unknown'
+
+
+def test_local_browser_cpu_survives_browsers_restarting(monkeypatch):
+    sampler = docker_stats.DockerStatsSampler(client=object(), containers=[])
+    trees = iter([
+        {101: 1.0, 102: 2.0},
+        # 102 のブラウザが終了し、103 が新しく起動した
+        {101: 1.5, 103: 0.5},
+    ])
+    monkeypatch.setattr(docker_stats, 'process_tree_cpu', lambda pid: next(trees))
+    sampler._sample_local_browsers(100.0)
+    sampler._sample_local_browsers(102.0)
+
+    first, second = sampler.samples
+    assert first['cpu_percent'] is None
+    assert second['cpu_percent'] == 50.0
+    assert second['processes'] == 2
+
+
+def test_phase_report_includes_local_browsers():
+    recorder = StepRecorder()
+    with recorder.step('approve_all') as step:
+        pass
+    step.started_at, step.ended_at = 10.0, 20.0
+    samples = [
+        {'ts': 12.0, 'container': 'approval-workflow-app', 'cpu_percent': 20.0, 'mem_bytes': 0,
+         'net_rx': 0, 'net_tx': 0, 'blk_read': 0, 'blk_write': 0},
+        {'ts': 12.0, 'container': docker_stats.HARNESS, 'cpu_percent': 5.0},
+        {'ts': 12.0, 'container': docker_stats.LOCAL_BROWSERS, 'cpu_percent': 80.0, 'processes': 6},
+    ]
+    report = docker_stats.phase_report(samples, recorder.steps, ['approval-workflow-app'])
+    assert report['approve_all']['containers'][docker_stats.LOCAL_BROWSERS]['cpu_avg'] == 80.0
+    assert report['approve_all']['bottleneck'] == 'client'
+    assert step.data['resources'][docker_stats.LOCAL_BROWSERS]['cpu_avg'] == 80.0
+
@@ -0,0 +1,70 @@
+import sys
+import types
+
+import pytest
+
+from harness import driver
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, tmp_path):
+    monkeypatch.setattr(driver, '_resolved', None)
+    monkeypatch.setenv('HARNESS_DRIVER_CACHE', str(tmp_path / 'cache'))
+    monkeypatch.delenv('CHROME_DRIVER_PATH', raising=False)
+    monkeypatch.setattr(driver, 'chrome_version', lambda: '126.0.6478.126')
+
+
+def _fake_manager(monkeypatch, installed):
+    calls = []
+
+    class ChromeDriverManager:
+        def install(self):
+            calls.append(installed)
+            return str(installed)
+
+    module = types.ModuleType('webdriver_manager.chrome')
+    module.ChromeDriverManager = ChromeDriverManager
+    monkeypatch.setitem(sys.modules, 'webdriver_manager.chrome', module)
+    return calls
+
+
+def test_env_path_wins(monkeypatch, tmp_path):
+    binary = tmp_path / 'chromedriver'
+    binary.write_text('')
+    monkeypatch.setenv('CHROME_DRIVER_PATH', str(binary))
+    assert driver.resolve_chromedriver() == str(binary)
+
+
+def test_cache_hit_skips_webdriver_manager(monkeypatch, tmp_path):
+    cached = tmp_path / 'cache' / '126.0.6478.126' / driver._binary_name()
+    cached.parent.mkdir(parents=True)
+    cached.write_text('')
+    calls = _fake_manager(monkeypatch, tmp_path / 'unused')
+    assert driver.resolve_chromedriver() == str(cached)
+    assert calls == []
+
+
+def test_miss_downloads_once_and_fills_the_cache(monkeypatch, tmp_path):
+    installed = tmp_path / 'downloaded'
+    installed.write_text('binary')
+    calls = _fake_manager(monkeypatch, installed)
+
+    path = driver.resolve_chromedriver()
+    assert path == str(tmp_path / 'cache' / '126.0.6478.126' / driver._binary_name())
+    assert open(path).read() == 'binary'
+    assert driver.resolve_chromedriver() == path
+    assert len(calls) == 1
+
+    # 別プロセス相当（メモ化なし）でもキャッシュから解決する
+    monkeypatch.setattr(driver, '_resolved', None)
+    assert driver.resolve_chromedriver() == path
+    assert len(calls) == 1
+
+
+def test_unknown_chrome_version_uses_the_download_as_is(monkeypatch, tmp_path):
+    monkeypatch.setattr(driver, 'chrome_version', lambda: None)
+    installed = tmp_path / 'downloaded'
+    installed.write_text('')
+    _fake_manager(monkeypatch, installed)
+    assert driver.resolve_chromedriver() == str(installed)
+    assert not (tmp_path / 'cache').exists()
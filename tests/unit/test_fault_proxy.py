@@ -0,0 +1,104 @@
+import json
+import random
+
+import pytest
+
+from harness import fault_proxy
+from harness.fault_proxy import FaultProxy, Rule
+from harness.http_client import AppClient
+from harness.mock_app import MockApp
+from harness.steps import StepRecorder
+
+
+def test_parse_latency_specs():
+    assert fault_proxy.parse_latency(None) is None
+    assert fault_proxy.parse_latency(200) == ('fixed', [200.0])
+    assert fault_proxy.parse_latency('lognormal:150:0.5') == ('lognormal', [150.0, 0.5])
+    with pytest.raises(ValueError):
+        fault_proxy.parse_latency('uniform:100')
+    with pytest.raises(ValueError):
+        fault_proxy.parse_latency('pareto:1')
+
+
+def test_sample_latency_is_in_seconds_and_never_negative():
+    rng = random.Random(1)
+    assert fault_proxy.sample_latency(('fixed', [250.0]), rng) == 0.25
+    assert fault_proxy.sample_latency(None, rng) == 0.0
+    assert all(0.1 <= fault_proxy.sample_latency(('uniform', [100.0, 200.0]), rng) <= 0.2 for _ in range(50))
+    assert all(fault_proxy.sample_latency(('normal', [0.0, 100.0]), rng) >= 0 for _ in range(50))
+
+
+def test_first_matching_rule_wins(tmp_path):
+    path = tmp_path / 'faults.json'
+    path.write_text(json.dumps({
+        'default': {'latency': 'fixed:10'},
+        'rules': [
+            {'name': 'approve', 'method': 'POST', 'path': '^/approvals/', 'error_rate': 1, 'error_status': 503},
+            {'path': '^/approvals/'},
+        ],
+    }), encoding='utf-8')
+    rules, default = fault_proxy.load_rules(str(path))
+    proxy = FaultProxy('http://app', rules=rules, default=default, seed=1)
+
+    assert proxy.rule_for('POST', '/approvals/1/approve').name == 'approve'
+    assert proxy.rule_for('GET', '/approvals/1').name == 'rule1'
+    assert proxy.rule_for('GET', '/dashboard') is default
+    assert fault_proxy.load_rules('1')[0] == []
+
+
+@pytest.fixture
+def app():
+    app = MockApp(port=0, approvers=('approver@example.com',)).start()
+    yield app
+    app.stop()
+
+
+def test_proxy_forwards_and_rewrites_redirects(app):
+    proxy = FaultProxy(app.base_url, seed=1).start()
+    try:
+        client = AppClient(proxy.base_url)
+        assert client.login('approver@example.com')
+        assert client.last_response.url.startswith(proxy.base_url)
+    finally:
+        proxy.stop()
+
+    records = list(proxy.records)
+    assert [(r['method'], r['path'], r['status']) for r in records] == [
+        ('GET', '/login', 200), ('POST', '/login', 302), ('GET', '/dashboard', 200)]
+    assert all(r['upstream_ms'] is not None and not r['injected_error'] for r in records)
+
+
+def test_injected_errors_use_laravel_error_titles(app):
+    rules = [Rule('approve', method='POST', path='^/approvals/', error_rate=1.0, error_status=503)]
+    proxy = FaultProxy(app.base_url, rules=rules, seed=1).start()
+    try:
+        client = AppClient(proxy.base_url)
+        client.login('approver@example.com')
+        response = client.approve_all()
+    finally:
+        proxy.stop()
+
+    assert response.status_code == 503
+    assert '<title>Service Unavailable</title>' in response.text
+    [injected] = [r for r in proxy.records if r['injected_error']]
+    assert injected['rule'] == 'approve' and injected['upstream_ms'] is None
+    # 注入したエラーはアプリに届かない
+    assert not any(r['path'].startswith('/approvals/') for r in app.requests)
+
+
+def test_top_level_steps_get_a_proxy_summary():
+    recorder = StepRecorder()
+    proxy = FaultProxy('http://app', seed=1)
+    recorder.add_listener(proxy)
+    with recorder.step('approve_all') as step:
+        now = step.started_at
+        proxy.records.append({'method': 'POST', 'path': '/approvals/approve-all', 'rule': 'default',
+                              'injected_ms': 100.0, 'throttled_ms': 0.0, 'injected_error': False,
+                              'upstream_ms': 40.0, 'started_at': now})
+        with recorder.step('inner') as inner:
+            pass
+
+    assert step.data['proxy']['requests'] == 1
+    assert step.data['proxy']['upstream_ms']['p50'] == 40.0
+    assert step.data['proxy']['injected_ms_total'] == 100.0
+    assert 'proxy' not in inner.data
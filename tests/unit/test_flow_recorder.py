@@ -0,0 +1,117 @@
+import json
+
+from harness import network
+from harness.flow_recorder import FlowRecorder, _find_source, build_flow
+from harness.steps import StepRecorder
+
+
+def _request(method, path, url=None, status=200, form=None, body=None):
+    entry = {'method': method, 'path': path, 'url': url or f'http://localhost:8080{path}', 'status': status}
+    if form is not None:
+        entry['form'] = form
+    if body is not None:
+        entry['body'] = body
+    return entry
+
+
+def test_find_source_in_a_redirect_url():
+    requests = [
+        _request('POST', '/applications', url='http://localhost:8080/applications/41', status=302),
+        _request('POST', '/applications/41/submit'),
+    ]
+    assert _find_source(requests, 1, '41') == (0, {'from': 'url', 'pattern': r'/applications/(\d+)'})
+
+
+def test_find_source_in_a_response_body():
+    body = '<a href="/approvals/7">A</a> <input id="approval_9" value="9"> <input id="approval_12" value="12">'
+    requests = [_request('GET', '/applications/my-approvals', body=body), _request('POST', '/approvals/12/approve')]
+    source, capture = _find_source(requests, 1, '12')
+    assert source == 0
+    assert capture['from'] == 'body'
+    # 同じ文脈の2件目
+    assert capture['pattern'] == r'id="approval_(\d+)"'
+    assert capture['index'] == 1
+
+
+def test_find_source_ignores_later_responses_and_partial_numbers():
+    requests = [_request('GET', '/dashboard', body='total 120'), _request('POST', '/approvals/12/approve'),
+                _request('GET', '/approvals/12')]
+    assert _find_source(requests, 1, '12') == (None, None)
+
+
+def test_build_flow_parameterizes_login_ids_and_lists():
+    requests = [
+        _request('POST', '/login', url='http://localhost:8080/dashboard', status=302,
+                 form=[['email', 'approver0_0@wf.nrkk.technology'], ['password', 'password']]),
+        _request('GET', '/applications/my-approvals',
+                 body='<input name="approval_ids[]" value="5"> <input name="approval_ids[]" value="6">'),
+        _request('POST', '/approvals/bulk-approve', status=302,
+                 form=[['approval_ids[]', '5'], ['approval_ids[]', '6'], ['comment', 'ok'], ['amount', '3000']]),
+        _request('POST', '/applications', url='http://localhost:8080/applications/41', status=302,
+                 form=[['title', 'x']]),
+        _request('GET', '/applications/41'),
+    ]
+    flow = build_flow('approver', requests)
+    steps = flow['steps']
+
+    assert flow['params'] == {'email': 'approver0_0@wf.nrkk.technology', 'password': 'password'}
+    assert steps[0]['form'] == [['email', '{email}'], ['password', '{password}']]
+    assert steps[0]['expect_status'] == 302
+    # 複数値は出どころの全件として capture する
+    assert ['approval_ids[]', '{approval_ids}'] in steps[2]['form']
+    assert steps[1]['capture']['approval_ids']['all'] is True
+    # ID ではない数値はそのまま
+    assert ['amount', '3000'] in steps[2]['form']
+    # パスの ID はリダイレクト先 URL から
+    assert steps[4]['path'] == '/applications/{application_id}'
+    assert steps[3]['capture'] == {'application_id': {'from': 'url', 'pattern': r'/applications/(\d+)'}}
+
+
+def test_build_flow_keeps_unresolved_values(capsys):
+    flow = build_flow('x', [_request('GET', '/applications/99')])
+    assert flow['steps'][0]['path'] == '/applications/99'
+    assert 'source not found' in capsys.readouterr().out
+
+
+class _LogDriver:
+    """get_log で読んだ分がバッファから消える。CDP コマンドは使えない"""
+
+    def __init__(self, messages):
+        self.buffer = [{'message': json.dumps({'message': m})} for m in messages]
+
+    def get_log(self, name):
+        logs, self.buffer = self.buffer, []
+        return logs
+
+    def execute_cdp_cmd(self, cmd, params):
+        raise RuntimeError("no CDP")
+
+
+def test_flow_and_network_recorders_share_the_performance_log():
+    driver = _LogDriver([
+        {'method': 'Network.requestWillBeSent',
+         'params': {'requestId': '1', 'timestamp': 1.0, 'type': 'Document',
+                    'request': {'url': 'http://app/login', 'method': 'GET'}}},
+        {'method': 'Network.responseReceived',
+         'params': {'requestId': '1', 'response': {'status': 200, 'url': 'http://app/login'}}},
+        {'method': 'Network.loadingFinished', 'params': {'requestId': '1', 'timestamp': 1.1}},
+    ])
+    capture = network.NetworkRecorder(driver, steps=StepRecorder())
+    flow = FlowRecorder(driver, 'applicant')
+
+    # どちらが先に読んでも、もう一方の分は残っている
+    flow.poll()
+    completed = capture.poll()
+
+    assert [(r['method'], r['path'], r['status']) for r in flow.requests] == [('GET', '/login', 200)]
+    assert [r['path'] for r in completed] == ['/login']
+
+
+def test_detached_flow_recorder_stops_receiving_messages():
+    driver = _LogDriver([{'method': 'Network.requestWillBeSent',
+                          'params': {'requestId': '1', 'type': 'Document',
+                                     'request': {'url': 'http://app/dashboard', 'method': 'GET'}}}])
+    flow = FlowRecorder(driver, 'applicant')
+    flow.detach()
+    network.performance_log(driver).pump()
+    assert flow._messages == []
@@ -0,0 +1,38 @@
+import types
+
+import pytest
+
+from harness import launch
+
+
+@pytest.fixture(autouse=True)
+def no_override(monkeypatch):
+    monkeypatch.delenv('HARNESS_LAUNCH_PROFILE', raising=False)
+
+
+def test_profile_name_prefers_the_environment(monkeypatch):
+    assert launch.profile_name('debug-visible') == 'debug-visible'
+    monkeypatch.setenv('HARNESS_LAUNCH_PROFILE', 'low-memory')
+    assert launch.profile_name('debug-visible') == 'low-memory'
+    monkeypatch.setenv('HARNESS_LAUNCH_PROFILE', 'turbo')
+    with pytest.raises(ValueError, match='turbo'):
+        launch.profile_name()
+
+
+@pytest.mark.parametrize('name', list(launch.PROFILES))
+def test_chrome_options_for_each_profile(name):
+    profile = launch.PROFILES[name]
+    arguments = launch.chrome_options(name).arguments
+    assert arguments == launch.COMMON_ARGUMENTS + profile['arguments'] + [f"--window-size={profile['window_size']}"]
+    assert ('--headless=new' in arguments) == (name != 'debug-visible')
+
+
+def test_script_specific_window_and_extra_arguments():
+    options = launch.chrome_options('debug-visible', window_size='1200,800', extra=['--window-position=10,20'])
+    assert options.arguments[-2:] == ['--window-position=10,20', '--window-size=1200,800']
+    assert options.experimental_options['excludeSwitches'] == ['enable-automation']
+
+
+def test_browser_rss_without_a_local_process():
+    assert launch.browser_rss(types.SimpleNamespace()) is None
+    assert launch.browser_rss(types.SimpleNamespace(service=types.SimpleNamespace(process=None))) is None
@@ -0,0 +1,63 @@
+import pytest
+
+from harness import load
+
+
+def test_substitute_and_missing_values():
+    assert load.substitute('/applications/{application_id}/submit', {'application_id': 12}) == \
+        '/applications/12/submit'
+    with pytest.raises(load.ReplayError):
+        load.substitute('/approvals/{approval_id}', {})
+
+
+def test_form_expands_list_values():
+    step = {'form': [['email', '{email}'], ['approval_ids[]', '{approval_ids}'], ['comment', 'ok']]}
+    assert load._form(step, {'email': 'a@example.com', 'approval_ids': ['3', '4']}) == [
+        ('email', 'a@example.com'), ('approval_ids[]', '3'), ('approval_ids[]', '4'), ('comment', 'ok'),
+    ]
+
+
+class _Response:
+    def __init__(self, url='', text=''):
+        self.url = url
+        self.text = text
+
+
+def test_capture_from_url_and_body():
+    values = {}
+    step = {'path': '/applications', 'capture': {
+        'application_id': {'from': 'url', 'pattern': r'/applications/(\d+)'},
+        'approval_ids': {'from': 'body', 'pattern': r'id="approval_(\d+)"', 'all': True},
+    }}
+    load._capture(step, _Response('http://app/applications/41', 'id="approval_7" id="approval_8"'), values)
+    assert values == {'application_id': '41', 'approval_ids': ['7', '8']}
+
+    with pytest.raises(load.ReplayError):
+        load._capture({'path': '/x', 'capture': {'id': {'from': 'body', 'pattern': r'(\d+)'}}},
+                      _Response(text='no digits'), {})
+
+
+FLOW = {'name': 'approver', 'steps': [
+    {'method': 'POST', 'path': '/login'},
+    {'method': 'GET', 'path': '/applications/my-approvals'},
+    {'method': 'POST', 'path': '/approvals/bulk-approve'},
+]}
+
+
+def test_failed_steps_are_kept_out_of_latency_and_throughput(monkeypatch):
+    def fake_run_once(flow, params, base_url=None, timeout=30):
+        if params['email'] == 'slow@example.com':
+            return [('POST /login', 300.0, None), ('GET /applications/my-approvals', 200.0, None),
+                    ('POST /approvals/bulk-approve', 400.0, None)]
+        # 419 で即座に失敗し、以降は打ち切られる
+        return [('POST /login', 300.0, None), ('GET /applications/my-approvals', 2.0, 'ReplayError: HTTP 419')]
+
+    monkeypatch.setattr(load, 'run_once', fake_run_once)
+    report = load.run(FLOW, ['slow@example.com', 'fail@example.com'], concurrency=2)
+
+    assert report['requests'] == 4
+    assert report['failed_requests'] == 1
+    assert report['steps']['GET /applications/my-approvals']['count'] == 1
+    assert report['steps']['GET /applications/my-approvals']['p50'] == 200.0
+    assert report['errors'][0]['step'] == 'GET /applications/my-approvals'
+    assert report['throughput_rps'] == pytest.approx(4 / report['wall_seconds'])
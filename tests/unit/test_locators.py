@@ -0,0 +1,77 @@
+from selenium.webdriver.common.by import By
+
+from harness.locators import LOCATORS, LocatorRegistry
+
+STRATEGIES = [
+    (By.CSS_SELECTOR, '#new'),
+    (By.CSS_SELECTOR, '.old'),
+    (By.XPATH, ".//button[normalize-space(.)='承認']"),
+]
+
+
+class _Page:
+    """find_elements だけを持つドライバーの代わり。present にあるセレクターだけ要素を返す"""
+
+    def __init__(self, *present):
+        self.present = set(present)
+        self.calls = []
+
+    def find_elements(self, by, value):
+        self.calls.append(value)
+        return [f'<{value}>'] if value in self.present else []
+
+
+def _registry(tmp_path):
+    return LocatorRegistry(str(tmp_path / 'locators.json'), locators={'approve': STRATEGIES})
+
+
+def test_learns_the_fallback_and_tries_it_first(tmp_path):
+    registry = _registry(tmp_path)
+    page = _Page('.old')
+    assert registry.find(page, 'approve') == '<.old>'
+    assert page.calls == ['#new', '.old']
+
+    page.calls.clear()
+    assert registry.find(page, 'approve') == '<.old>'
+    assert page.calls == ['.old']
+
+    report = registry.report()['approve']
+    assert report['preferred'] == 'css selector=.old'
+    assert (report['lookups'], report['fallback']) == (2, 1)
+    assert report['hit_rate'] == 0.5
+
+
+def test_a_miss_keeps_the_learned_strategy(tmp_path):
+    registry = _registry(tmp_path)
+    registry.find(_Page('.old'), 'approve')
+    assert registry.find_all(_Page(), 'approve') == []
+    assert registry.report()['approve']['preferred'] == 'css selector=.old'
+    assert registry.report()['approve']['miss'] == 1
+
+
+def test_state_survives_a_restart(tmp_path):
+    registry = _registry(tmp_path)
+    registry.find(_Page('.old'), 'approve')
+    registry.save()
+
+    restarted = _registry(tmp_path).load()
+    page = _Page('.old')
+    restarted.find(page, 'approve')
+    assert page.calls == ['.old']
+
+
+def test_changing_the_selectors_discards_what_was_learned(tmp_path):
+    registry = _registry(tmp_path)
+    registry.find(_Page('.old'), 'approve')
+    registry.save()
+
+    changed = LocatorRegistry(str(tmp_path / 'locators.json'), locators={'approve': STRATEGIES[1:]}).load()
+    assert changed.ordered('approve') == STRATEGIES[1:]
+    assert changed.report()['approve']['lookups'] == 0
+
+
+def test_approve_button_does_not_match_approve_all():
+    # my-approvals.blade.php の「全て承認」ボタンは onclick="approveAll()"
+    selectors = [value for by, value in LOCATORS['approve_button'] if by == By.CSS_SELECTOR]
+    assert "button[onclick*='approve']" not in selectors
+    assert "button[id^='approveBtn_']" in selectors
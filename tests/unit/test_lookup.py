@@ -0,0 +1,52 @@
+from selenium.webdriver.common.by import By
+
+from harness import lookup
+
+
+class _FakeDriver:
+    current_url = 'http://localhost:8080/my-approvals'
+
+    def __init__(self, elements=None):
+        self.elements = elements or {}
+        self.implicit = None
+        self.lookups = 0
+
+    def implicitly_wait(self, seconds):
+        self.implicit = seconds
+
+    def find_elements(self, by, value):
+        self.lookups += 1
+        return list(self.elements.get((by, value), []))
+
+    def execute_script(self, script, *args):
+        return {'status': 200, 'title': '承認待ち', 'markers': []}
+
+
+def test_explicit_only_disables_implicit_wait():
+    driver = _FakeDriver()
+    assert lookup.explicit_only(driver) is driver
+    assert driver.implicit == 0
+
+
+def test_non_blocking_lookups():
+    driver = _FakeDriver({(By.CSS_SELECTOR, '.card'): ['a', 'b']})
+    assert lookup.all_now(driver, By.CSS_SELECTOR, '.card') == ['a', 'b']
+    assert lookup.first(driver, By.CSS_SELECTOR, '.card') == 'a'
+    assert lookup.present(driver, By.CSS_SELECTOR, '.card')
+
+    assert lookup.all_now(driver, By.NAME, 'type') == []
+    assert lookup.first(driver, By.NAME, 'type') is None
+    assert not lookup.present(driver, By.NAME, 'type')
+
+
+def test_wait_for_any_returns_the_first_matching_locator():
+    driver = _FakeDriver({(By.CSS_SELECTOR, '.empty'): ['empty']})
+    locators = [(By.CSS_SELECTOR, '.card'), (By.CSS_SELECTOR, '.empty')]
+    assert lookup.wait_for_any(driver, locators, timeout=1) == (1, 'empty')
+
+
+def test_wait_for_any_gives_up_with_none(monkeypatch):
+    monkeypatch.delenv('HARNESS_ADAPTIVE_TIMEOUTS', raising=False)
+    driver = _FakeDriver()
+    assert lookup.wait_for_any(driver, [(By.CSS_SELECTOR, '.card')], timeout=0.2) == (None, None)
+    assert driver.lookups >= 1
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from harness import memory
+
+
+def _sample(heap, rss=None):
+    return {'at': 0.0, 'heap_mb': heap, 'rss_mb': rss}
+
+
+def test_no_verdict_until_the_baseline_is_complete():
+    watch = memory.MemoryWatch(heap_growth_mb=10, rss_growth_mb=50, baseline_samples=3)
+    assert watch.observe(_sample(100, 400)) is None
+    assert watch.observe(_sample(500, 900)) is None
+    assert watch.baseline() is None
+
+
+def test_baseline_is_the_median_of_the_first_samples():
+    watch = memory.MemoryWatch(heap_growth_mb=10, rss_growth_mb=50, baseline_samples=3)
+    for heap, rss in [(100, 400), (160, 420), (110, 410)]:
+        watch.observe(_sample(heap, rss))
+    assert watch.baseline() == {'heap_mb': 110, 'rss_mb': 410}
+
+    assert watch.observe(_sample(120, 460)) is None
+    assert watch.observe(_sample(121, 460)) == "heap_mb +11 MB (limit 10)"
+    assert watch.observe(_sample(130, 470)) == "heap_mb +20 MB (limit 10), rss_mb +60 MB (limit 50)"
+
+
+def test_missing_metrics_are_ignored():
+    watch = memory.MemoryWatch(heap_growth_mb=10, rss_growth_mb=50, baseline_samples=1)
+    watch.observe(_sample(100, None))
+    assert watch.growth(_sample(300, 900)) == {'heap_mb': 200}
+    assert watch.observe(_sample(None, 900)) is None
+
+
+class _FakeDriver:
+    def __init__(self, index):
+        self.index = index
+        self.capabilities = {}
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_managed_browser_recycles_over_the_limit(monkeypatch, tmp_path):
+    heaps = iter([100, 100, 100, 250])
+    monkeypatch.setattr(memory, 'sample', lambda driver: _sample(next(heaps)))
+    drivers, started = [], []
+
+    def factory():
+        drivers.append(_FakeDriver(len(drivers)))
+        return drivers[-1]
+
+    log = tmp_path / 'recycles.jsonl'
+    browser = memory.ManagedBrowser(factory, on_start=started.append, log_path=str(log), enabled=True,
+                                    watch_factory=lambda: memory.MemoryWatch(heap_growth_mb=100))
+    first = browser.checkpoint()
+    for _ in range(3):
+        assert browser.checkpoint() is first
+    assert browser.checkpoint() is drivers[1]
+
+    assert first.quit_called
+    assert started == drivers
+    assert browser.session == 2
+    entry = json.loads(log.read_text())
+    assert entry['reason'] == "heap_mb +150 MB (limit 100)"
+    assert entry['baseline']['heap_mb'] == 100
+    assert browser.recycles == [entry]
+
+
+def test_managed_browser_close_removes_a_cloned_profile(monkeypatch):
+    quit_through = []
+    monkeypatch.setattr(memory.browser_profile, 'quit_driver', quit_through.append)
+    browser = memory.ManagedBrowser(lambda: _FakeDriver(0), enabled=False)
+    driver = browser.checkpoint()
+    assert browser.checkpoint() is driver
+    browser.close()
+    assert quit_through == [driver]
+    assert browser.driver is None
+
+
+@pytest.mark.parametrize('value, expected', [('1', True), ('yes', True), ('0', False), ('', False)])
+def test_is_enabled(monkeypatch, value, expected):
+    monkeypatch.setenv('HARNESS_MEMORY_WATCH', value)
+    assert memory.is_enabled() == expected
@@ -0,0 +1,71 @@
+import pytest
+
+from harness import mock_app
+from harness.http_client import AppClient
+from harness.mock_app import MockApp
+
+
+@pytest.fixture
+def app():
+    app = MockApp(port=0, pending=3, approvers=('approver@example.com',)).start()
+    yield app
+    app.stop()
+
+
+def test_applicant_flow_against_the_mock(app):
+    client = AppClient(app.base_url)
+    assert client.login('applicant@example.com')
+    dashboard = client.get('/dashboard').text
+    assert 'id="newApplicationBtn"' in dashboard
+    assert '>applicant<' in dashboard and 'id="applicationsBtn"' not in dashboard
+
+    application_id = client.create_application('モック申請')
+    response = client.submit_application(application_id)
+    assert response.url.endswith(f"/applications/{application_id}")
+    assert '申請を提出しました。' in response.text
+
+
+def test_approver_sees_pending_approvals(app):
+    client = AppClient(app.base_url)
+    assert client.login('approver@example.com')
+    assert 'id="applicationsBtn"' in client.get('/dashboard').text
+    assert client.pending_approval_ids() == ['500', '501', '502']
+    assert client.approve_all().url.endswith('/my-approvals')
+
+
+def test_post_without_the_session_token_is_rejected(app):
+    client = AppClient(app.base_url)
+    client.get('/login')
+    client.csrf_token = 'stale'
+    assert client.post('/applications', {'title': 'x'}).status_code == 419
+    assert client.get('/missing').status_code == 404
+
+
+def test_requests_are_logged_with_timestamps(app):
+    AppClient(app.base_url).get('/login')
+    [request] = app.requests
+    assert (request['method'], request['path'], request['status']) == ('GET', '/login', 200)
+    assert request['ended_at'] >= request['started_at']
+
+
+def test_server_time_merges_overlapping_requests_within_the_step():
+    requests = [
+        {'started_at': 0.5, 'ended_at': 1.5},   # ステップ開始前から
+        {'started_at': 1.2, 'ended_at': 1.4},   # 重なり
+        {'started_at': 2.0, 'ended_at': 2.5},
+        {'started_at': 4.0, 'ended_at': 5.0},   # ステップ外
+    ]
+    assert mock_app._server_time(requests, 1.0, 3.0) == pytest.approx(1.0)
+
+
+def test_overhead_report_subtracts_server_time_and_skips_warmup():
+    steps = [
+        {'name': 'create_application', 'started_at': 0.0, 'ended_at': 1.0},
+        {'name': 'warmup', 'started_at': 1.0, 'ended_at': 2.0, 'warmup': True},
+        {'name': 'login', 'started_at': 2.0, 'ended_at': None},
+    ]
+    requests = [{'started_at': 0.2, 'ended_at': 0.5}]
+    report = mock_app.overhead_report(steps, requests)
+    assert list(report) == ['create_application']
+    assert report['create_application']['requests'] == 1
+    assert report['create_application']['client_ms']['p50'] == pytest.approx(700)
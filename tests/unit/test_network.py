@@ -0,0 +1,89 @@
+import json
+
+from harness import network
+from harness.steps import StepRecorder
+
+
+class _NoLogDriver:
+    def get_log(self, name):
+        return []
+
+
+def _requests(n):
+    return [{'url': f'http://app/{i}', 'path': f'/{i}'} for i in range(n)]
+
+
+def test_each_step_keeps_at_most_max_per_step(monkeypatch):
+    monkeypatch.setattr(network, 'MAX_PER_STEP', 3)
+    steps = StepRecorder()
+    capture = network.NetworkRecorder(_NoLogDriver(), steps=steps)
+    with steps.step('login') as step:
+        capture._attach(step, _requests(5))
+
+    assert len(step.data['network']) == 3
+    assert step.data['network_dropped'] == 2
+
+
+def test_the_run_wide_cap_applies_across_steps_and_drivers(monkeypatch):
+    monkeypatch.setenv('HARNESS_NETWORK_MAX_ENTRIES', '4')
+    steps = StepRecorder()
+    first = network.NetworkRecorder(_NoLogDriver(), steps=steps)
+    with steps.step('login') as login:
+        first._attach(login, _requests(3))
+    first.detach()
+
+    # ドライバーを作り直しても実行全体の件数は引き継ぐ
+    second = network.NetworkRecorder(_NoLogDriver(), steps=steps)
+    with steps.step('approve') as approve:
+        second._attach(approve, _requests(3))
+
+    assert len(login.data['network']) == 3
+    assert len(approve.data['network']) == 1
+    assert approve.data['network_dropped'] == 2
+    assert steps.meta['network'] == {'max_entries': 4, 'attached': 4, 'dropped': 2}
+
+
+class _LogDriver:
+    """get_log で読んだ分がバッファから消える（Chrome と同じ）"""
+
+    def __init__(self, messages):
+        self.buffer = [{'message': json.dumps({'message': m})} for m in messages]
+
+    def get_log(self, name):
+        logs, self.buffer = self.buffer, []
+        return logs
+
+
+def _request_messages(request_id, url):
+    return [
+        {'method': 'Network.requestWillBeSent',
+         'params': {'requestId': request_id, 'timestamp': 1.0, 'type': 'Document',
+                    'request': {'url': url, 'method': 'GET'}}},
+        {'method': 'Network.responseReceived',
+         'params': {'requestId': request_id, 'response': {'status': 200}}},
+        {'method': 'Network.loadingFinished',
+         'params': {'requestId': request_id, 'timestamp': 1.25, 'encodedDataLength': 10}},
+    ]
+
+
+def test_recorders_on_one_driver_share_the_performance_log():
+    driver = _LogDriver(_request_messages('1', 'http://app/login'))
+    capture = network.NetworkRecorder(driver, steps=StepRecorder())
+    seen = []
+    network.performance_log(driver).subscribe(seen.extend)
+
+    # 別の記録器が先にログを読んでも、NetworkRecorder の分は残っている
+    network.performance_log(driver).pump()
+    completed = capture.poll()
+
+    assert len(seen) == 3
+    assert [(r['path'], r['status'], r['total_ms']) for r in completed] == [('/login', 200, 250.0)]
+    assert capture.poll() == []
+
+
+def test_detach_stops_receiving_messages():
+    driver = _LogDriver(_request_messages('1', 'http://app/login'))
+    capture = network.NetworkRecorder(driver, steps=StepRecorder())
+    capture.detach()
+    network.performance_log(driver).pump()
+    assert capture._messages == []
@@ -0,0 +1,83 @@
+import pytest
+
+from harness import preflight
+
+PAGES = {
+    'applicant': '<span class="dropdown-item-text"> applicant </span>',
+    'approver': '<span class="dropdown-item-text">approver</span><a id="applicationsBtn">承認待ち</a>',
+    'approver_without_menu': '<span class="dropdown-item-text">approver</span>',
+}
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeClient:
+    """AppClient の代わり。メールアドレスのローカル部で返すページを決める"""
+
+    def __init__(self, base_url=None, timeout=30):
+        self.last_response = None
+
+    def login(self, email, password='password'):
+        page = email.split('@')[0]
+        if page == 'down':
+            raise ConnectionError("refused")
+        if page not in PAGES:
+            return False
+        self.last_response = FakeResponse(PAGES[page])
+        return True
+
+
+@pytest.fixture(autouse=True)
+def fake_client(monkeypatch):
+    monkeypatch.setattr(preflight, 'AppClient', FakeClient)
+    monkeypatch.setattr(preflight, 'fetch_organizations', lambda emails: None)
+    monkeypatch.delenv('HARNESS_PREFLIGHT', raising=False)
+
+
+def problems(email, kind):
+    return preflight.check_user({'email': email}, kind)['problems']
+
+
+def test_check_user_classifies_problems():
+    assert problems('applicant@example.com', 'applicant') == []
+    assert problems('approver@example.com', 'approver') == []
+    assert problems('not-an-email', 'applicant') == ['invalid_email']
+    assert problems('unknown@example.com', 'applicant') == ['login_failed']
+    assert problems('down@example.com', 'applicant') == ['login_error']
+
+
+def test_role_must_match_the_roster():
+    assert problems('approver@example.com', 'applicant') == ['role_mismatch']
+    assert problems('applicant@example.com', 'approver') == ['role_mismatch']
+    # 承認者なのに承認待ちメニューが出ない
+    assert problems('approver_without_menu@example.com', 'approver') == ['role_mismatch']
+
+
+def test_missing_organization_is_only_reported_for_users_who_logged_in(monkeypatch):
+    monkeypatch.setattr(preflight, 'fetch_organizations', lambda emails: {
+        'applicant@example.com': (None, None),
+        'unknown@example.com': (None, None),
+    })
+    results = preflight.run([{'email': 'applicant@example.com'}, {'email': 'unknown@example.com'}], 'applicant')
+    assert [r['problems'] for r in results] == [['missing_organization'], ['login_failed']]
+
+
+def test_filter_users_drops_users_with_problems(tmp_path):
+    users = [{'email': 'applicant@example.com'}, {'email': 'unknown@example.com'}]
+    path = tmp_path / 'preflight.json'
+    assert preflight.filter_users(users, 'applicant', path=str(path)) == users[:1]
+    assert path.exists()
+
+
+def test_filter_users_is_a_no_op_when_disabled(monkeypatch):
+    monkeypatch.setenv('HARNESS_PREFLIGHT', '0')
+    users = [{'email': 'unknown@example.com'}]
+    assert preflight.filter_users(users, 'applicant') == users
+
+
+def test_filter_users_stops_when_the_application_is_unreachable():
+    with pytest.raises(SystemExit, match='could not reach'):
+        preflight.filter_users([{'email': 'down@example.com'}], 'applicant')
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from harness import procfs
+
+pytestmark = pytest.mark.skipif(not os.path.isdir('/proc'), reason="/proc がない環境")
+
+
+def test_process_tree_cpu_reads_this_process():
+    times = procfs.process_tree_cpu(os.getpid(), include_root=True)
+    assert os.getpid() in times
+    assert times[os.getpid()] >= 0
+
+
+def test_descendants_include_child_processes():
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(5)'])
+    try:
+        assert child.pid in procfs.descendants(os.getpid())
+        assert os.getpid() not in procfs.descendants(os.getpid())
+        assert child.pid in procfs.process_tree_cpu(os.getpid())
+    finally:
+        child.kill()
+        child.wait()
+
+
+def test_missing_pid_returns_none():
+    assert procfs.process_tree_cpu(None) is None
+    assert procfs._cpu_seconds(-1) is None
+
+
+def test_process_tree_rss_sums_children():
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(5)'])
+    try:
+        own = procfs.process_tree_rss(os.getpid(), include_root=True)
+        children = procfs.process_tree_rss(os.getpid())
+        assert children > 0
+        assert own > children
+    finally:
+        child.kill()
+        child.wait()
+    assert procfs.process_tree_rss(None) is None
+    assert procfs._rss_kb(-1) == 0
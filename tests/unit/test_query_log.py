@@ -0,0 +1,162 @@
+import datetime
+
+from harness import query_log
+from harness.query_log import attribute, normalize, step_report
+from harness.steps import StepRecorder
+
+
+def test_normalize_replaces_literals():
+    assert normalize("select * from `users` where `email` = 'a@example.com' and `id` = 12 limit 1") == \
+        "select * from `users` where `email` = ? and `id` = ? limit ?"
+    assert normalize('select * from `t` where `name` = "it\\"s"') == "select * from `t` where `name` = ?"
+
+
+def test_normalize_collapses_in_lists_and_whitespace():
+    a = normalize("select * from `approvals` where `application_id` in (1, 2, 3)")
+    b = normalize("select *\n  from `approvals`   where `application_id` in (4,5)")
+    assert a == b == "select * from `approvals` where `application_id` in (...)"
+
+
+def test_normalize_keeps_digits_inside_identifiers():
+    assert normalize("select `t1`.`col2` from `t1`") == "select `t1`.`col2` from `t1`"
+
+
+T0 = datetime.datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _at(seconds):
+    return T0 + datetime.timedelta(seconds=seconds)
+
+
+def _entry(seconds, sql, thread_id=7, query_time=0.001):
+    return {'start_time': _at(seconds), 'query_time': query_time, 'rows_examined': 1, 'thread_id': thread_id,
+            'sql': sql}
+
+
+def test_attribute_assigns_queries_to_the_innermost_step():
+    recorder = StepRecorder()
+    with recorder.step('approve_all') as phase:
+        with recorder.step('login') as login:
+            pass
+    phase.data['query_marker'] = 'aaa'
+    login.data['query_marker'] = 'bbb'
+    own = 1
+    entries = [
+        _entry(0, "SELECT 'harness-step:start:aaa'", own),
+        _entry(1, "SELECT 'harness-step:start:bbb'", own),
+        _entry(2, "select * from `users` where `id` = 1"),
+        _entry(3, "SELECT 'harness-step:end:bbb'", own),
+        _entry(4, "select * from `approvals` where `id` = 2"),
+        _entry(5, "SELECT 'harness-step:end:aaa'", own),
+        # どのステップの区間にも入らないクエリ
+        _entry(9, "select 1"),
+    ]
+
+    attributed = attribute(entries, recorder.steps, {own})
+    assert [e['sql'] for e in attributed[id(login)]] == ["select * from `users` where `id` = 1"]
+    assert [e['sql'] for e in attributed[id(phase)]] == ["select * from `approvals` where `id` = 2"]
+
+    report = step_report(recorder.steps, attributed)
+    assert [(r['step'], r['queries']) for r in report] == [('approve_all', 1), ('login', 1)]
+    assert report[1]['top_statements'][0]['statement'] == "select * from `users` where `id` = ?"
+
+
+def test_step_report_groups_n_plus_one_queries():
+    recorder = StepRecorder()
+    with recorder.step('dashboard') as step:
+        pass
+    queries = [_entry(i, f"select * from `users` where `id` = {i}") for i in range(5)]
+    queries.append(_entry(6, "select count(*) from `applications`", query_time=0.01))
+
+    report = step_report(recorder.steps, {id(step): queries})
+    top = report[0]['top_statements'][0]
+    assert top['statement'] == "select * from `users` where `id` = ?"
+    assert top['count'] == 5
+    assert report[0]['total_ms'] == 15.0
+
+
+def test_attribute_skips_queries_from_other_harness_connections():
+    recorder = StepRecorder()
+    with recorder.step('approve_all') as phase:
+        pass
+    phase.data['query_marker'] = 'aaa'
+    capture, sampler = 1, 2
+    entries = [
+        _entry(0, "SELECT 'harness-step:start:aaa'", capture),
+        _entry(1, "SHOW GLOBAL STATUS", sampler),
+        _entry(2, "select * from `users` where `id` = 1"),
+        _entry(3, "SELECT 'harness-step:end:aaa'", capture),
+    ]
+
+    attributed = attribute(entries, recorder.steps, {capture, sampler})
+    assert [e['sql'] for e in attributed[id(phase)]] == ["select * from `users` where `id` = 1"]
+
+
+class _Cursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, args=None):
+        self.connection.executed.append((sql, args))
+
+    def fetchall(self):
+        return [('1',)]
+
+
+class FakeConnection:
+    def __init__(self):
+        self.executed = []
+        self.close_calls = 0
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def close(self):
+        self.close_calls += 1
+
+
+def test_close_restores_the_log_settings_once():
+    connection = FakeConnection()
+    capture = query_log.QueryLogCapture(connection)
+    capture.enable()
+    capture.close()
+    capture.close()
+
+    restored = [sql for sql, args in connection.executed if args is not None]
+    assert restored == ["SET GLOBAL slow_query_log = %s", "SET GLOBAL long_query_time = %s",
+                        "SET GLOBAL log_output = %s"]
+    assert connection.close_calls == 1
+
+
+def test_attach_restores_settings_when_enabling_fails(monkeypatch):
+    connection = FakeConnection()
+    capture = query_log.QueryLogCapture(connection)
+
+    def failing_enable():
+        capture._saved = {'slow_query_log': 0, 'long_query_time': 10, 'log_output': 'FILE'}
+        raise RuntimeError('denied')
+
+    monkeypatch.setenv('HARNESS_QUERY_LOG', '1')
+    monkeypatch.setattr(query_log.QueryLogCapture, 'from_env', classmethod(lambda cls: capture))
+    monkeypatch.setattr(capture, 'enable', failing_enable)
+
+    assert query_log.attach(StepRecorder()) is None
+    assert [args for sql, args in connection.executed] == [(0,), (10,), ('FILE',)]
+    assert connection.close_calls == 1
+
+
+def test_attach_registers_the_restore_for_abnormal_exits(monkeypatch):
+    capture = query_log.QueryLogCapture(FakeConnection())
+    registered = []
+    monkeypatch.setenv('HARNESS_QUERY_LOG', '1')
+    monkeypatch.setattr(query_log.QueryLogCapture, 'from_env', classmethod(lambda cls: capture))
+    monkeypatch.setattr(query_log.atexit, 'register', registered.append)
+
+    assert query_log.attach(StepRecorder()) is capture
+    assert registered == [capture.close]
@@ -0,0 +1,94 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from harness import ready
+from harness.ready import NotReady
+
+
+@pytest.fixture
+def server():
+    """パスごとに (ステータス, 本文) を返す HTTP サーバー"""
+    routes = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, body = routes.get(self.path, (404, ''))
+            self.send_response(status)
+            self.end_headers()
+            self.wfile.write(body.encode('utf-8'))
+
+        def log_message(self, *args):
+            pass
+
+    httpd = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.routes = routes
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_check_app_requires_the_login_form(server):
+    server.routes['/login'] = (200, '<form><input name="email"><input name="password"></form>')
+    ready.check_app(server.url)
+
+    server.routes['/login'] = (200, '<p>Starting…</p>')
+    with pytest.raises(NotReady, match='login form'):
+        ready.check_app(server.url)
+
+    server.routes['/login'] = (502, '')
+    with pytest.raises(NotReady, match='HTTP 502'):
+        ready.check_app(server.url)
+
+
+def test_check_app_reports_a_refused_connection():
+    with pytest.raises(NotReady):
+        ready.check_app('http://127.0.0.1:9')
+
+
+def test_check_hub_reads_ready_from_status(server):
+    server.routes['/status'] = (200, json.dumps({'value': {'ready': True}}))
+    ready.check_hub(f"{server.url}/wd/hub")
+
+    server.routes['/status'] = (200, json.dumps({'value': {'ready': False, 'message': 'no nodes'}}))
+    with pytest.raises(NotReady, match='no nodes'):
+        ready.check_hub(server.url)
+
+
+def test_xvfb_socket_follows_the_display_number(tmp_path):
+    assert ready.xvfb_socket(':99') == '/tmp/.X11-unix/X99'
+    assert ready.xvfb_socket('localhost:1.0') == '/tmp/.X11-unix/X1'
+
+
+def test_wait_until_ready_retries_until_every_check_passes():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise NotReady("not yet")
+
+    failed = ready.wait_until_ready({'flaky': flaky, 'ok': lambda: None},
+                                    timeout=5, initial_delay=0.01, verbose=False)
+    assert failed == {}
+    assert len(attempts) == 3
+
+
+def test_wait_until_ready_returns_the_last_error_on_timeout():
+    def never():
+        raise NotReady("still down")
+
+    failed = ready.wait_until_ready({'app': never}, timeout=0.05, initial_delay=0.01, verbose=False)
+    assert failed == {'app': 'still down'}
+
+
+def test_main_exits_with_status_1_when_not_ready(server, capsys):
+    with pytest.raises(SystemExit) as exc:
+        ready.main(['--check', 'app', '--app-url', server.url, '--timeout', '0'])
+    assert exc.value.code == 1
+    assert '/login returned HTTP 404' in capsys.readouterr().out
@@ -0,0 +1,74 @@
+import smtplib
+import time
+from email.message import EmailMessage
+
+import pytest
+
+from harness import bench_mail, smtp_sink
+from harness.smtp_sink import SmtpSink
+
+
+@pytest.fixture
+def sink():
+    sink = SmtpSink(host='127.0.0.1', port=0).start()
+    yield sink
+    sink.stop()
+
+
+def test_address_is_taken_from_the_command_argument():
+    assert smtp_sink._address('MAIL FROM:<app@example.com> SIZE=100') == 'app@example.com'
+    assert smtp_sink._address('RCPT TO: <a@example.com>') == 'a@example.com'
+    assert smtp_sink._address('MAIL FROM:') == ''
+
+
+def test_received_mail_is_recorded(sink):
+    message = EmailMessage()
+    message['Subject'] = '承認依頼'
+    message['From'] = 'app@example.com'
+    message['To'] = 'a@example.com, b@example.com'
+    message.set_content("line\n.leading dot\n")
+    with smtplib.SMTP('127.0.0.1', sink.port, timeout=5) as client:
+        client.send_message(message)
+
+    [mail] = sink.since(0)
+    assert mail['mail_from'] == 'app@example.com'
+    assert mail['recipients'] == ['a@example.com', 'b@example.com']
+    assert mail['subject'] == '承認依頼'
+    assert mail['size'] > 0
+
+
+def test_since_and_wait_for_quiet_filter_by_arrival_time():
+    sink = SmtpSink()
+    sink.messages.extend([{'received_at': 1.0}, {'received_at': 5.0}])
+    assert sink.since(2.0) == [{'received_at': 5.0}]
+    started = time.time()
+    assert sink.wait_for_quiet(2.0, quiet_seconds=0.1, timeout=5) == [{'received_at': 5.0}]
+    assert time.time() - started < 1
+
+
+class _Approver:
+    def bulk_approve(self, ids, comment):
+        self.approved = ids
+
+
+def test_run_scenario_counts_mails_per_item(monkeypatch):
+    sink = SmtpSink()
+
+    def fake_prepare(applicant, approver, count, label):
+        return list(range(count))
+
+    def fake_wait(start, **kwargs):
+        return [{'received_at': start + 0.1}, {'received_at': start + 0.2}]
+
+    monkeypatch.setattr(bench_mail, 'prepare_pending', fake_prepare)
+    monkeypatch.setattr(sink, 'wait_for_quiet', fake_wait)
+    approver = _Approver()
+
+    result = bench_mail.run_scenario(sink, None, approver, 100, 2)
+
+    assert approver.approved == [0, 1]
+    assert sink.delay_ms == 100
+    assert result['bulk_items'] == 2
+    assert result['mails'] == 2
+    assert result['mails_per_item'] == 1
+    assert result['arrival_delay_ms']['count'] == 2
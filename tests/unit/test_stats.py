@@ -0,0 +1,69 @@
+import math
+
+import pytest
+
+from harness import stats
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [1, 2, 3, 4]
+    assert stats.percentile(values, 0) == 1
+    assert stats.percentile(values, 50) == 2.5
+    assert stats.percentile(values, 100) == 4
+    assert stats.percentile([4, 1, 3, 2], 50) == 2.5
+
+
+def test_percentile_of_empty_and_single_values():
+    assert stats.percentile([], 99) is None
+    assert stats.percentile([7.0], 99) == 7.0
+
+
+def test_summarize_empty_values():
+    summary = stats.summarize([])
+    assert summary['count'] == 0
+    assert summary['p50'] is None and summary['max'] is None
+
+
+def test_stdev_is_the_sample_standard_deviation():
+    assert stats.stdev([2, 4, 4, 4, 5, 5, 7, 9]) == pytest.approx(2.138, abs=1e-3)
+    assert stats.stdev([3]) == 0.0
+
+
+def test_t_critical_table_and_normal_approximation():
+    assert stats.t_critical(1) == 12.706
+    assert stats.t_critical(9.8) == stats.t_critical(9)
+    assert stats.t_critical(1000) == 1.96
+    assert stats.t_critical(0) is None
+
+
+def test_confidence_interval_uses_the_t_distribution():
+    m, low, high = stats.confidence_interval([10, 12, 14])
+    half = 4.303 * 2 / math.sqrt(3)
+    assert m == 12
+    assert low == pytest.approx(12 - half)
+    assert high == pytest.approx(12 + half)
+    assert stats.confidence_interval([5]) == (5, None, None)
+
+
+def test_diff_interval_welch():
+    a = [10, 11, 12, 13]
+    b = [20, 22, 24, 26, 28]
+    diff, low, high = stats.diff_interval(a, b)
+    va, vb = stats.stdev(a) ** 2 / 4, stats.stdev(b) ** 2 / 5
+    df = (va + vb) ** 2 / (va ** 2 / 3 + vb ** 2 / 4)
+    half = stats.t_critical(df) * math.sqrt(va + vb)
+    assert diff == pytest.approx(12.5)
+    assert (low, high) == (pytest.approx(12.5 - half), pytest.approx(12.5 + half))
+    assert low > 0
+
+
+def test_diff_interval_without_variance_or_samples():
+    assert stats.diff_interval([1, 1], [3, 3]) == (2, 2, 2)
+    assert stats.diff_interval([1], [3, 4]) == (2.5, None, None)
+    assert stats.diff_interval([], [3]) == (None, None, None)
+
+
+def test_coefficient_of_variation():
+    assert stats.coefficient_of_variation([10, 10, 10]) == 0
+    assert stats.coefficient_of_variation([1]) is None
+    assert stats.coefficient_of_variation([0, 0]) is None
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from harness import timeouts
+from harness.steps import StepRecorder
+from harness.timeouts import TimeoutModel, key_for, route_of
+
+
+def test_route_of_groups_ids():
+    assert route_of('http://localhost:8080/applications/12/edit?x=1') == '/applications/{id}/edit'
+    assert route_of('http://localhost:8080') == '/'
+    assert route_of(None) == '/'
+
+
+def test_key_for_uses_the_step_name():
+    recorder = StepRecorder()
+    with recorder.step('login') as step:
+        assert key_for(step, 'http://app/dashboard') == 'login /dashboard'
+    assert key_for(None, 'http://app/approvals/3') == '- /approvals/{id}'
+
+
+def test_default_is_used_until_enough_samples(tmp_path):
+    model = TimeoutModel(str(tmp_path / 't.json'), min_samples=5)
+    for _ in range(4):
+        model.observe('login /login', 0.2)
+    assert model.timeout('login /login', 15) == 15
+    model.observe('login /login', 0.2)
+    # p99 0.2s × 3 は下限の 2 秒に収める
+    assert model.timeout('login /login', 15) == 2.0
+
+
+def test_learned_value_is_clamped_to_the_maximum(tmp_path):
+    model = TimeoutModel(str(tmp_path / 't.json'), min_samples=1, max_seconds=60)
+    model.observe('approve /approvals', 45.0)
+    assert model.learned('approve /approvals') == 60
+
+
+def test_timeouts_widen_the_learned_value(tmp_path):
+    """下限まで縮んだあと、負荷で遅くなった応答がタイムアウトし続けても広がる"""
+    model = TimeoutModel(str(tmp_path / 't.json'), min_samples=20)
+    key = 'create_application /applications/create'
+    for _ in range(50):
+        model.observe(key, 0.3)
+    tight = model.timeout(key, 15)
+    assert tight == 2.0
+
+    # 負荷で 3 秒かかるようになり、2 秒の待ちが続けてタイムアウトする
+    for _ in range(3):
+        model.observe_timeout(key, tight)
+    assert model.timeouts[key] == 3
+    assert model.timeout(key, 15) > tight
+    # 広がったあとは 3 秒の応答を待てる
+    assert model.timeout(key, 15) >= 3.0
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / 'state' / 't.json')
+    model = TimeoutModel(path, min_samples=1)
+    model.observe('login /login', 0.5)
+    model.observe_timeout('login /login', 2.0)
+    model.save()
+
+    loaded = TimeoutModel(path, min_samples=1).load()
+    assert list(loaded.samples['login /login']) == [0.5, 2.0]
+    assert loaded.timeouts['login /login'] == 1
+    assert json.load(open(path))['learned']['login /login'] == pytest.approx(1.985 * 3)
+
+
+def test_main_prints_keys_without_samples(tmp_path, capsys):
+    path = tmp_path / 't.json'
+    path.write_text(json.dumps({'samples': {'login /login': [], 'approve /approvals': [0.4]},
+                                'timeouts': {'login /login': 2}}), encoding='utf-8')
+    timeouts.main(['--path', str(path)])
+    out = capsys.readouterr().out
+    assert 'login /login' in out
+    assert '0.4s' in out
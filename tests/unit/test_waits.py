@@ -0,0 +1,52 @@
+import pytest
+
+from harness.waits import classify, detect_server_error
+
+
+@pytest.mark.parametrize('status, title, kind', [
+    (500, 'Server Error', 'server_error'),
+    (419, 'Page Expired', 'csrf_expired'),
+    (404, 'Not Found', 'not_found'),
+    (503, 'Service Unavailable', 'unavailable'),
+    # タイトルが変わっていてもステータスで判定する
+    (419, '', 'csrf_expired'),
+    (502, '', 'server_error'),
+    (403, '', 'forbidden'),
+    (429, '', 'rate_limited'),
+])
+def test_error_pages_are_classified(status, title, kind):
+    assert classify(status, title, []) == kind
+
+
+def test_exception_markers_win_over_status():
+    # APP_DEBUG の例外画面は 200 で返ることもある
+    assert classify(200, '承認ワークフロー', ['SQLSTATE[']) == 'exception_page'
+    assert classify(500, 'Server Error', ['laravel-ignition']) == 'exception_page'
+
+
+@pytest.mark.parametrize('status', [0, 200, 302])
+def test_normal_pages_are_not_errors(status):
+    assert classify(status, '承認ワークフロー', []) is None
+
+
+class _ProbeDriver:
+    current_url = 'http://localhost:8080/applications'
+
+    def __init__(self, probe):
+        self.probe = probe
+
+    def execute_script(self, script, *args):
+        if isinstance(self.probe, Exception):
+            raise self.probe
+        return self.probe
+
+
+def test_detect_server_error_builds_the_exception():
+    error = detect_server_error(_ProbeDriver({'status': 419, 'title': 'Page Expired', 'markers': []}))
+    assert error.kind == 'csrf_expired'
+    assert error.to_dict()['url'] == 'http://localhost:8080/applications'
+
+
+def test_detect_server_error_ignores_probe_failures():
+    assert detect_server_error(_ProbeDriver(RuntimeError('no such window'))) is None
+    assert detect_server_error(_ProbeDriver({'status': 200, 'title': 'ダッシュボード', 'markers': []})) is None
@@ -0,0 +1,108 @@
+import argparse
+import time
+import types
+
+import pytest
+
+from harness import warmup
+from harness.steps import StepRecorder
+
+
+class FakeResponse:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+
+
+class FakeClient:
+    """AppClient の代わり。呼び出したルートを記録して 200 を返す"""
+
+    instances = []
+
+    def __init__(self, base_url=None):
+        self.base_url = base_url
+        self.calls = []
+        FakeClient.instances.append(self)
+
+    def get(self, path):
+        self.calls.append(path)
+        return FakeResponse()
+
+    def login(self, email):
+        self.email = email
+        return True
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    FakeClient.instances = []
+    monkeypatch.setattr(warmup, 'AppClient', FakeClient)
+    monkeypatch.setattr(warmup, 'wait_for_app', lambda client, timeout=120: True)
+    return FakeClient
+
+
+def test_route_cv_needs_a_full_window():
+    samples = [{'route': '/a', 'ms': ms} for ms in (100, 10, 10, 10)]
+    assert warmup.route_cv(samples, '/a', 5) is None
+    assert warmup.route_cv(samples, '/a', 3) == 0
+    assert warmup.route_cv(samples, '/b', 1) is None
+
+
+def test_warm_up_hits_each_route_and_stops_once_stable(fake_client, monkeypatch):
+    # 最初の1回だけ遅く、その後は一定の応答時間になるよう perf_counter を進める
+    clock = iter(x for n in range(1000) for x in (n, n + (5.0 if n == 0 else 0.01)))
+    monkeypatch.setattr(warmup, 'time', types.SimpleNamespace(
+        time=time.time, sleep=time.sleep, perf_counter=lambda: next(clock)))
+
+    result = warmup.warm_up('http://app', requests_per_route=3, cv_threshold=0.15, window=3,
+                            routes=('/login', '/dashboard'))
+
+    anonymous, client = fake_client.instances
+    assert result['stable'] is True
+    assert result['requests'] == 7
+    assert anonymous.calls == ['/login'] * 4
+    assert client.calls == ['/dashboard'] * 3
+    assert client.email == warmup.DEFAULT_USER
+    assert result['routes']['/login']['first_ms'] == pytest.approx(5000)
+    assert result['routes']['/login']['cv'] == pytest.approx(0)
+    assert all(s['tag'] == 'warmup' for s in result['samples'])
+
+
+def test_warm_up_gives_up_at_the_time_limit(fake_client):
+    result = warmup.warm_up(requests_per_route=1, window=5, max_seconds=0, routes=('/dashboard',))
+    assert result['stable'] is False
+    assert result['routes']['/dashboard']['cv'] is None
+
+
+def test_run_is_a_no_op_unless_enabled(monkeypatch):
+    monkeypatch.delenv('HARNESS_WARMUP', raising=False)
+    recorder = StepRecorder()
+    assert warmup.run(recorder) is None
+    assert recorder.steps == []
+
+
+def test_run_records_a_warmup_step(fake_client, monkeypatch, tmp_path):
+    monkeypatch.setenv('HARNESS_WARMUP', '1')
+    monkeypatch.setenv('HARNESS_WARMUP_REQUESTS', '1')
+    monkeypatch.setenv('HARNESS_WARMUP_MAX_SECONDS', '0')
+    recorder = StepRecorder()
+
+    result = warmup.run(recorder, path=str(tmp_path / 'warmup.json'))
+
+    [step] = recorder.steps
+    assert step.name == 'warmup' and step.warmup
+    assert 'samples' not in step.data['warmup']
+    assert step.data['warmup']['requests'] == result['requests']
+    assert (tmp_path / 'warmup.json').exists()
+
+
+def test_run_from_args_honours_no_warmup(fake_client):
+    parser = argparse.ArgumentParser()
+    warmup.add_arguments(parser)
+    assert warmup.run_from_args(parser.parse_args(['--no-warmup'])) is None
+    assert fake_client.instances == []
+
+
+def test_zero_cv_counts_as_stable():
+    assert warmup.is_stable(0.0, 0.15)
+    assert not warmup.is_stable(None, 0.15)
+    assert not warmup.is_stable(0.15, 0.15)